@@ -42,6 +42,50 @@ class Settings(BaseSettings):
         "http://localhost:3000,http://127.0.0.1:3000"
     )
     
+    # Memoria RAG: si es False no se indexan eventos ni se consulta el
+    # contexto histórico (simulaciones headless, pruebas de carga)
+    RAG_ENABLED: bool = os.getenv("RAG_ENABLED", "True").lower() == "true"
+    # Carga del modelo de embeddings y del vector store al arrancar la API:
+    # "eager" (bloquea el arranque), "background" (en un hilo) o "lazy" (primer uso)
+    RAG_WARMUP_MODE: str = os.getenv("RAG_WARMUP_MODE", "background")
+    # Indexación de eventos: "async" (cola en segundo plano por lotes) o
+    # "sync" (embedding e inserción dentro del turno, como antes)
+    RAG_INDEX_MODE: str = os.getenv("RAG_INDEX_MODE", "async")
+    RAG_INDEX_QUEUE_SIZE: int = int(os.getenv("RAG_INDEX_QUEUE_SIZE", "1000"))
+    RAG_INDEX_BATCH_SIZE: int = int(os.getenv("RAG_INDEX_BATCH_SIZE", "32"))
+    RAG_INDEX_FLUSH_SECONDS: float = float(os.getenv("RAG_INDEX_FLUSH_SECONDS", "0.5"))
+    # Backend de embeddings: "torch" (sentence-transformers), "onnx" (ONNX
+    # Runtime, sin torch) u "onnx-int8" (ONNX cuantizado, el más rápido en CPU)
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")
+    # Fichero ONNX alternativo dentro del repo del modelo (p. ej. onnx/model_qint8_arm64.onnx)
+    EMBEDDING_ONNX_FILE: str = os.getenv("EMBEDDING_ONNX_FILE", "")
+    # Hilos de ONNX Runtime (0 = los que decida ONNX Runtime)
+    EMBEDDING_THREADS: int = int(os.getenv("EMBEDDING_THREADS", "0"))
+    # Ranking del contexto de los agentes: se piden RAG_RERANK_OVERFETCH veces
+    # más candidatos y se reordenan por similitud, importancia y recencia
+    RAG_RERANK_OVERFETCH: int = int(os.getenv("RAG_RERANK_OVERFETCH", "3"))
+    RAG_RANK_WEIGHT_SIMILARITY: float = float(os.getenv("RAG_RANK_WEIGHT_SIMILARITY", "0.6"))
+    RAG_RANK_WEIGHT_IMPORTANCE: float = float(os.getenv("RAG_RANK_WEIGHT_IMPORTANCE", "0.25"))
+    RAG_RANK_WEIGHT_RECENCY: float = float(os.getenv("RAG_RANK_WEIGHT_RECENCY", "0.15"))
+    # Turnos en los que la recencia de un evento cae a la mitad
+    RAG_RANK_RECENCY_HALF_LIFE: float = float(os.getenv("RAG_RANK_RECENCY_HALF_LIFE", "10"))
+    # Compactación de la memoria: cada K turnos (0 = nunca) los eventos con
+    # importancia < RAG_COMPACTION_MAX_IMPORTANCE de las eras cerradas se
+    # resumen por nación y se retiran del vector store
+    RAG_COMPACTION_EVERY_TURNS: int = int(os.getenv("RAG_COMPACTION_EVERY_TURNS", "10"))
+    RAG_COMPACTION_MAX_IMPORTANCE: int = int(os.getenv("RAG_COMPACTION_MAX_IMPORTANCE", "5"))
+    # Turnos recientes que nunca se compactan
+    RAG_COMPACTION_KEEP_TURNS: int = int(os.getenv("RAG_COMPACTION_KEEP_TURNS", "10"))
+    # Contextos RAG de agentes en caché (LRU); se invalidan al indexar eventos. 0 = sin caché
+    RAG_CONTEXT_CACHE_SIZE: int = int(os.getenv("RAG_CONTEXT_CACHE_SIZE", "1024"))
+    # Cursor del reindexado de /api/memory/reindex (para reanudarlo tras un fallo)
+    RAG_REINDEX_CHECKPOINT_FILE: str = os.getenv("RAG_REINDEX_CHECKPOINT_FILE", "./rag_reindex_checkpoint.json")
+    # Caché de embeddings (clave = sha256 de modelo + texto). 0 entradas = sin
+    # caché en memoria; EMBEDDING_CACHE_DIR vacío = sin nivel en disco (memmap)
+    EMBEDDING_CACHE_SIZE: int = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+    EMBEDDING_CACHE_DIR: str = os.getenv("EMBEDDING_CACHE_DIR", "")
+    EMBEDDING_CACHE_DISK_ROWS: int = int(os.getenv("EMBEDDING_CACHE_DISK_ROWS", "100000"))
+
     # ChromaDB (RAG)
     CHROMA_PERSIST_DIR: str = os.getenv("CHROMA_PERSIST_DIR", "./chroma_db")
     CHROMADB_HOST: str = os.getenv("CHROMADB_HOST", "localhost")
@@ -53,11 +97,60 @@ class Settings(BaseSettings):
     VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "chroma")
     VECTOR_TABLE_NAME: str = os.getenv("VECTOR_TABLE_NAME", "event_embeddings")
     VECTOR_EMBEDDING_DIM: int = int(os.getenv("VECTOR_EMBEDDING_DIM", "384"))
+    # VECTOR_BACKEND=supabase: el store crea al arrancar los índices que falten
+    # (B-tree de los filtros y HNSW del embedding). m/ef_construction fijan
+    # calidad y coste de construcción; ef_search (por consulta) recall/latencia.
+    # Con filtros, pgvector >= 0.8 puede seguir buscando hasta completar
+    # resultados: off | strict_order | relaxed_order
+    VECTOR_MANAGE_INDEXES: bool = os.getenv("VECTOR_MANAGE_INDEXES", "True").lower() == "true"
+    VECTOR_HNSW_M: int = int(os.getenv("VECTOR_HNSW_M", "16"))
+    VECTOR_HNSW_EF_CONSTRUCTION: int = int(os.getenv("VECTOR_HNSW_EF_CONSTRUCTION", "64"))
+    VECTOR_HNSW_EF_SEARCH: int = int(os.getenv("VECTOR_HNSW_EF_SEARCH", "40"))
+    VECTOR_HNSW_ITERATIVE_SCAN: str = os.getenv("VECTOR_HNSW_ITERATIVE_SCAN", "relaxed_order")
+    # Cuantización del HNSW (pgvector >= 0.7): none | halfvec (índice a la mitad,
+    # hasta 4000 dimensiones) | binary (1/32, hasta 64000). La tabla guarda el
+    # vector completo: la búsqueda gruesa usa el índice cuantizado y los
+    # n_results * VECTOR_RERANK_FACTOR candidatos se reordenan con precisión
+    # completa (con binary conviene un factor mayor, p. ej. 10)
+    VECTOR_QUANTIZATION: str = os.getenv("VECTOR_QUANTIZATION", "none")
+    VECTOR_RERANK_FACTOR: int = int(os.getenv("VECTOR_RERANK_FACTOR", "4"))
+    # VECTOR_BACKEND=numpy: índice en proceso (memmap) en esta carpeta;
+    # float16 reduce a la mitad disco y memoria a costa de algo de precisión
+    NUMPY_VECTOR_DIR: str = os.getenv("NUMPY_VECTOR_DIR", "./numpy_vectors")
+    NUMPY_VECTOR_DTYPE: str = os.getenv("NUMPY_VECTOR_DTYPE", "float32")
     
     # LLM Configuration
     LLM_MODEL: str = os.getenv("LLM_MODEL", "llama-3.1-70b-versatile")
     LLM_TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", "0.7"))
     LLM_MAX_TOKENS: int = int(os.getenv("LLM_MAX_TOKENS", "1024"))
+    # Proveedor: "groq" o "fake" (LLM local por reglas, sin red ni API key).
+    # Vacío = se deduce de LLM_MODEL ("fake*" usa el LLM falso)
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "")
+    LLM_FAKE_SEED: int = int(os.getenv("LLM_FAKE_SEED", "42"))
+    LLM_FAKE_LATENCY_MS: float = float(os.getenv("LLM_FAKE_LATENCY_MS", "0"))
+    LLM_FAKE_LATENCY_JITTER_MS: float = float(os.getenv("LLM_FAKE_LATENCY_JITTER_MS", "0"))
+
+    # Resiliencia de llamadas al LLM
+    # Deadline por llamada y presupuesto total por decisión (segundos)
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+    LLM_DECISION_BUDGET_SECONDS: float = float(os.getenv("LLM_DECISION_BUDGET_SECONDS", "45"))
+    # Reintentos con backoff exponencial + jitter
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    LLM_BACKOFF_BASE_SECONDS: float = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+    LLM_BACKOFF_MAX_SECONDS: float = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "8"))
+    # Peticiones hedged: duplicar la llamada si tarda más que el umbral
+    # (LLM_HEDGE_AFTER_SECONDS=0 usa el p95 observado tras LLM_HEDGE_MIN_SAMPLES llamadas)
+    LLM_HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "False").lower() == "true"
+    LLM_HEDGE_AFTER_SECONDS: float = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "0"))
+    LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+    # Agentes IA
+    # Si AGENT_CONCURRENT_DECISIONS es True, las fases gather_info/think de todas
+    # las naciones se ejecutan en paralelo y las acciones se aplican después en orden
+    AGENT_CONCURRENT_DECISIONS: bool = os.getenv("AGENT_CONCURRENT_DECISIONS", "True").lower() == "true"
+    AGENT_MAX_CONCURRENCY: int = int(os.getenv("AGENT_MAX_CONCURRENCY", "4"))
+    # En modo concurrente, usar la ruta async (ainvoke) en lugar de un pool de hilos
+    AGENT_ASYNC_DECISIONS: bool = os.getenv("AGENT_ASYNC_DECISIONS", "True").lower() == "true"
     
     class Config:
         env_file = ".env"
@@ -2,80 +2,177 @@
 Controller para Agentes IA
 Rutas: /api/agents/*
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response, Request, Header
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+import asyncio
 import logging
 
 from ..models.database import get_db
 from ..config.security import require_api_key
 from ..services.agent_service import get_agent_service
 from ..services.turn_service import TurnService
+from ..services.job_service import (
+    get_job_service,
+    GameReservedError,
+    TurnJobConflictError,
+    TERMINAL_EVENTS,
+    format_sse_event
+)
+from ..config import settings
+from .game_scope import ensure_game_in_progress, get_game_id
 
 router = APIRouter(prefix="/api/agents", tags=["AI Agents"])
 logger = logging.getLogger(__name__)
 
+# Segundos sin eventos antes de enviar un comentario keep-alive por el stream
+SSE_KEEPALIVE_SECONDS = 10
 
-@router.post("/process-turn")
+
+@router.post("/process-turn", status_code=202)
 def process_ai_turn(
+    response: Response,
+    include_timings: bool = False,
+    wait: bool = False,
+    game_id: Optional[int] = Depends(get_game_id),
     db: Session = Depends(get_db),
     _: None = Depends(require_api_key)
 ) -> Dict[str, Any]:
     """
-    Procesar el turno de todas las naciones IA.
+    Encolar el procesamiento del turno de todas las naciones IA de la partida
+    (?game_id=, por defecto la partida activa más reciente).
+    
+    El turno se ejecuta en segundo plano:
+    1. Cada agente IA analiza la situación
+    2. Consulta su memoria histórica (RAG)
+    3. Decide qué acción tomar
+    4. Ejecuta la acción
+    5. Se crea el siguiente turno
     
-    Este endpoint:
-    1. Obtiene el turno actual
-    2. Cada agente IA analiza la situación
-    3. Consulta su memoria histórica (RAG)
-    4. Decide qué acción tomar
-    5. Ejecuta la acción
-    6. Crea el siguiente turno
+    Devuelve 202 con un job_id; el progreso por fase y los agents_results se
+    consultan en GET /api/agents/jobs/{job_id}. Solo puede haber un turno en
+    curso por partida (409 si ya hay uno).
+    
+    Con include_timings=true el resultado incluye un bloque `timings` con la
+    duración de cada fase y de cada paso (gather/think/act) por agente. Con
+    wait=true la petición espera al final del turno y devuelve el resultado
+    directamente (comportamiento anterior, para scripts).
     
     Returns:
-        dict: Resultados de las decisiones de cada agente
+        dict: Estado del job (o resultado del turno si wait=true)
     """
+    # Obtener turno actual
+    current_turn = TurnService.get_current(db, game_id)
+    if not current_turn:
+        raise HTTPException(
+            status_code=400,
+            detail="No hay turno activo. Inicializa el juego primero."
+        )
+    ensure_game_in_progress(db, game_id)
+    
     try:
-        # Obtener turno actual
-        current_turn = TurnService.get_current(db)
-        if not current_turn:
-            raise HTTPException(
-                status_code=400,
-                detail="No hay turno activo. Inicializa el juego primero."
-            )
-        
-        logger.info("Procesando turno IA %s", current_turn.turn_number)
-        
-        # Obtener servicio de agentes
-        agent_service = get_agent_service()
-        
-        # Procesar turno de todos los agentes
-        results = agent_service.process_ai_turn(db, current_turn.turn_number)
-        
-        # Obtener el nuevo turno creado
-        new_turn = TurnService.get_current(db)
-        
-        # Contar éxitos
-        successes = sum(1 for r in results if r.get("success", False))
-        
-        logger.info("Turno IA procesado. Nuevo turno: %s", new_turn.turn_number if new_turn else "ERROR")
-        
-        return {
-            "message": "Turno procesado exitosamente",
-            "previous_turn": current_turn.turn_number,
-            "current_turn": new_turn.turn_number if new_turn else current_turn.turn_number,
-            "total_agents": len(results),
-            "successful_actions": successes,
-            "failed_actions": len(results) - successes,
-            "agents_results": results
-        }
-        
-    except Exception as e:
-        logger.exception("Error en process_ai_turn")
+        job = get_job_service().submit_turn(game_id=game_id, include_timings=include_timings)
+    except TurnJobConflictError as e:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "message": "Ya hay un turno en curso",
+                "job_id": e.job.id,
+                "status_url": f"/api/agents/jobs/{e.job.id}"
+            }
+        )
+    except GameReservedError:
         raise HTTPException(
-            status_code=500,
-            detail="Error procesando turno de IA"
+            status_code=409,
+            detail={"message": "La partida se está eliminando"}
         )
+    
+    logger.info("Turno IA %s de la partida %s encolado (job %s)", current_turn.turn_number, game_id, job.id)
+    
+    if wait:
+        job.wait()
+        if job.status == "failed":
+            raise HTTPException(status_code=500, detail=job.error)
+        response.status_code = 200
+        return job.result
+    
+    response.headers["Location"] = f"/api/agents/jobs/{job.id}"
+    return {
+        "message": "Turno encolado",
+        "job_id": job.id,
+        "status": job.status,
+        "game_id": game_id,
+        "turn_number": current_turn.turn_number,
+        "status_url": f"/api/agents/jobs/{job.id}"
+    }
+
+
+@router.get("/jobs/{job_id}")
+def get_turn_job(job_id: str) -> Dict[str, Any]:
+    """
+    Consultar el estado de un turno en segundo plano.
+    
+    Incluye el estado de cada fase (economy, agents, battles, victory,
+    next_turn), los resultados de los agentes a medida que terminan y, al
+    completarse, el resultado final del turno en `result`.
+    """
+    job = get_job_service().get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} no encontrado")
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_turn_job(
+    job_id: str,
+    request: Request,
+    last_event_id: Optional[str] = Header(None)
+) -> StreamingResponse:
+    """
+    Stream Server-Sent Events con el progreso en vivo de un turno.
+    
+    Eventos: turn_started, phase_started, phase_completed, phase_skipped,
+    agents_planned, agent_completed (decisión y resultado de cada agente),
+    battle_resolved, victory_checked y, al final, turn_completed (resultado
+    completo) o turn_failed. Los eventos ya emitidos se reenvían al conectar, así que se
+    puede abrir el stream en cualquier momento; al reconectar el navegador
+    envía Last-Event-ID y se continúa desde ahí.
+    """
+    job = get_job_service().get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} no encontrado")
+    
+    sent_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    
+    async def event_stream():
+        nonlocal sent_id
+        while True:
+            # La espera es bloqueante (Condition): fuera del event loop
+            events = await asyncio.to_thread(job.wait_for_events, sent_id, SSE_KEEPALIVE_SECONDS)
+            if await request.is_disconnected():
+                return
+            
+            if not events:
+                if job.is_finished:
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            
+            for event in events:
+                sent_id = event["id"]
+                yield format_sse_event(event)
+                if event["event"] in TERMINAL_EVENTS:
+                    return
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Evitar buffering en proxies (nginx)
+        }
+    )
 
 
 @router.get("/status")
@@ -90,8 +187,8 @@ def get_ai_status() -> Dict[str, Any]:
         agent_service = get_agent_service()
         return {
             "status": "active",
-            "model": "llama-3.3-70b-versatile",
-            "provider": "Groq",
+            "model": settings.LLM_MODEL,
+            "provider": agent_service.llm_provider,
             "features": [
                 "Multi-agent coordination",
                 "RAG memory integration",
@@ -9,6 +9,7 @@ from typing import List, Optional
 from ..models.database import get_db
 from ..services.battle_service import BattleService
 from ..schemas.battle_schema import BattleResponse, BattleSimulation, BattleSimulationResult
+from .game_scope import get_game_id
 
 
 router = APIRouter(prefix="/api/battles", tags=["battles"])
@@ -70,15 +71,16 @@ def simulate_battle(
 @router.get("/history", response_model=List[BattleResponse])
 def get_battle_history(
     limit: int = Query(20, ge=1, le=100, description="Número máximo de batallas a retornar"),
+    game_id: Optional[int] = Depends(get_game_id),
     db: Session = Depends(get_db)
 ):
     """
-    Obtener historial de batallas recientes.
+    Obtener historial de batallas recientes de la partida.
     
     - **limit**: Número de batallas a retornar (1-100)
     """
     try:
-        battles = BattleService.get_battle_history(db, limit)
+        battles = BattleService.get_battle_history(db, limit, game_id)
         return battles
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error obteniendo historial: {str(e)}")
@@ -104,14 +106,14 @@ def get_nation_battles(
 
 
 @router.get("/active-wars")
-def get_active_wars(db: Session = Depends(get_db)):
+def get_active_wars(game_id: Optional[int] = Depends(get_game_id), db: Session = Depends(get_db)):
     """
-    Obtener todas las guerras activas en el mundo.
+    Obtener todas las guerras activas en la partida.
     
     Retorna lista de parejas de naciones en estado de guerra.
     """
     try:
-        wars = BattleService.get_active_wars(db)
+        wars = BattleService.get_active_wars(db, game_id)
         return {
             "active_wars": wars,
             "total": len(wars)
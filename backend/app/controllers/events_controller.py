@@ -4,11 +4,12 @@ Rutas: /api/events/*
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from ..models.database import get_db
 from ..services.event_service import EventService
 from ..schemas.event_schema import EventCreate, EventResponse, EventSummary
+from .game_scope import get_game_id
 
 router = APIRouter(prefix="/api/events", tags=["Events"])
 
@@ -17,21 +18,26 @@ router = APIRouter(prefix="/api/events", tags=["Events"])
 def get_all_events(
     skip: int = 0,
     limit: int = 100,
+    game_id: Optional[int] = Depends(get_game_id),
     db: Session = Depends(get_db)
 ):
     """
-    Obtener todos los eventos (ordenados por fecha descendente)
+    Obtener todos los eventos de la partida (ordenados por fecha descendente)
     """
-    events = EventService.get_all(db, skip, limit)
+    events = EventService.get_all(db, skip, limit, game_id)
     return events
 
 
 @router.get("/recent", response_model=List[EventSummary])
-def get_recent_events(limit: int = 20, db: Session = Depends(get_db)):
+def get_recent_events(
+    limit: int = 20,
+    game_id: Optional[int] = Depends(get_game_id),
+    db: Session = Depends(get_db)
+):
     """
-    Obtener los eventos más recientes (para feed de noticias)
+    Obtener los eventos más recientes de la partida (para feed de noticias)
     """
-    events = EventService.get_recent_events(db, limit)
+    events = EventService.get_recent_events(db, limit, game_id)
     return events
 
 
@@ -39,15 +45,16 @@ def get_recent_events(limit: int = 20, db: Session = Depends(get_db)):
 def get_important_events(
     min_importance: int = 7,
     limit: int = 30,
+    game_id: Optional[int] = Depends(get_game_id),
     db: Session = Depends(get_db)
 ):
     """
-    Obtener eventos importantes (usados por el sistema RAG)
+    Obtener eventos importantes de la partida (usados por el sistema RAG)
     
     - **min_importance**: Importancia mínima (1-10)
     - **limit**: Máximo de eventos a devolver
     """
-    events = EventService.get_important_events(db, min_importance, limit)
+    events = EventService.get_important_events(db, min_importance, limit, game_id)
     return events
 
 
@@ -77,14 +84,15 @@ def get_events_by_nation(
 def get_events_by_type(
     event_type: str,
     limit: int = 50,
+    game_id: Optional[int] = Depends(get_game_id),
     db: Session = Depends(get_db)
 ):
     """
-    Obtener eventos filtrados por tipo
+    Obtener eventos de la partida filtrados por tipo
     
     Tipos comunes: attack, alliance, trade, recruit, declaration
     """
-    events = EventService.get_by_type(db, event_type, limit)
+    events = EventService.get_by_type(db, event_type, limit, game_id)
     return events
 
 
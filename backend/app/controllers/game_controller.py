@@ -10,13 +10,41 @@ import logging
 from ..models.database import get_db
 from ..config.security import require_api_key
 from ..services.game_service import GameService
+from ..services.job_service import GameReservedError, TurnJobConflictError, get_job_service
 from ..services.nation_service import NationService
 from ..schemas.game_schema import ActionRequest, GameStateResponse, MessageResponse
+from .game_scope import ensure_game_in_progress, get_game_id
 
 router = APIRouter(prefix="/api/game", tags=["Game"])
 logger = logging.getLogger(__name__)
 
 
+def _delete_game_exclusive(db: Session, game_id: int) -> Dict[str, int]:
+    """
+    Eliminar la partida con ella reservada en el JobService: la comprobación de
+    turnos activos y el borrado son atómicos frente a process-turn.
+
+    Raises:
+        HTTPException 409: Si la partida tiene un turno en cola o en curso, o ya se está eliminando
+    """
+    try:
+        return get_job_service().run_exclusive(game_id, lambda: GameService.delete_game(db, game_id))
+    except TurnJobConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Hay un turno en curso para esta partida",
+                "job_id": e.job.id,
+                "status_url": f"/api/agents/jobs/{e.job.id}"
+            }
+        )
+    except GameReservedError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "La partida ya se está eliminando"}
+        )
+
+
 @router.get("/nations")
 def get_available_nations():
     """
@@ -34,47 +62,35 @@ def get_available_nations():
 @router.post("/initialize", response_model=MessageResponse)
 def initialize_game(
     player_nation: str = Query("ESP", description="Código de la nación del jugador (USA, CHN, RUS, DEU, GBR, FRA, JPN, ESP)"),
-    force_reset: bool = Query(False, description="Si es True, elimina el juego existente antes de inicializar uno nuevo"),
+    name: Optional[str] = Query(None, max_length=100, description="Nombre de la partida"),
+    force_reset: bool = Query(False, description="Si es True, elimina la partida activa más reciente antes de crear la nueva"),
     db: Session = Depends(get_db),
     _: None = Depends(require_api_key)
 ):
     """
-    Inicializar un nuevo juego
+    Inicializar una nueva partida
     
     - **player_nation**: Código de la nación que controlará el jugador (default: ESP - España)
-    - **force_reset**: Si es True, elimina cualquier juego existente automáticamente
+    - **name**: Nombre de la partida (opcional)
+    - **force_reset**: Si es True, elimina la partida activa más reciente (el resto no se toca)
     
-    Crea las 8 naciones, el primer turno y las relaciones base.
+    Crea las 8 naciones, el primer turno y las relaciones base en una partida
+    nueva; las partidas existentes siguen activas. El game_id devuelto se pasa
+    como ?game_id= al resto de endpoints.
     La nación seleccionada será controlada por el jugador, las demás por IA.
     """
-    logger.info("Inicializando juego con nación %s", player_nation)
-    
-    # Verificar que no haya ya un juego iniciado
-    existing_nations = NationService.get_all(db, limit=1)
-    if existing_nations:
-        if force_reset:
-            logger.warning("Juego existente detectado. Eliminando por force_reset")
-            # Eliminar todas las naciones (por CASCADE se eliminarán eventos, relaciones, etc.)
-            from sqlalchemy import text
-            db.execute(text("DELETE FROM battles"))
-            db.execute(text("DELETE FROM events"))
-            db.execute(text("DELETE FROM relations"))
-            db.execute(text("DELETE FROM nations"))
-            db.execute(text("DELETE FROM turns"))
-            db.commit()
-            logger.info("Juego anterior eliminado")
-        else:
-            logger.warning("Intento de inicialización con juego activo")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Ya existe un juego iniciado. Usa force_reset=true para eliminarlo automáticamente o ejecuta reset_game.py"
-            )
-    
-    logger.info("No hay juego previo, iniciando")
+    logger.info("Inicializando partida con nación %s", player_nation)
+    
+    if force_reset:
+        previous_game = GameService.resolve_game(db)
+        if previous_game:
+            logger.warning("Eliminando la partida %s por force_reset", previous_game.id)
+            _delete_game_exclusive(db, previous_game.id)
+            logger.info("Partida anterior eliminada")
     
     try:
-        result = GameService.initialize_game(db, player_nation_code=player_nation)
-        logger.info("Juego inicializado exitosamente. Turno: %s", result.get("turn_number", "N/A"))
+        result = GameService.initialize_game(db, player_nation_code=player_nation, name=name)
+        logger.info("Partida %s inicializada. Turno: %s", result["game_id"], result.get("turn_number", "N/A"))
         return MessageResponse(
             message=result["message"],
             success=True,
@@ -94,6 +110,43 @@ def initialize_game(
         )
 
 
+@router.get("/games")
+def list_games(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Listar las partidas de la base de datos (más recientes primero)
+    """
+    games = GameService.list_games(db, skip=skip, limit=limit)
+    return {
+        "games": games,
+        "total": len(games)
+    }
+
+
+@router.delete("/games/{game_id}")
+def delete_game(game_id: int, db: Session = Depends(get_db), _: None = Depends(require_api_key)):
+    """
+    ⚠️ Eliminar una partida con todas sus naciones, turnos, eventos,
+    relaciones y batallas. Las demás partidas no se modifican.
+    
+    Responde 409 si la partida tiene un turno en cola o en curso.
+    """
+    if not GameService.get_game(db, game_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Partida {game_id} no encontrada"
+        )
+    
+    deleted = _delete_game_exclusive(db, game_id)
+    return {
+        "message": f"Partida {game_id} eliminada",
+        "deleted": deleted
+    }
+
+
 @router.get("/available-nations")
 def get_available_nations():
     """
@@ -128,31 +181,30 @@ def get_available_nations():
 
 
 @router.get("/status")
-def get_game_status(db: Session = Depends(get_db)):
+def get_game_status(game_id: Optional[int] = Depends(get_game_id), db: Session = Depends(get_db)):
     """
     Verificar si hay un juego activo.
     
-    Retorna información básica sobre el estado del juego sin detalles completos.
+    Retorna información básica sobre el estado de la partida sin detalles completos.
     """
-    from ..services.nation_service import NationService
     from ..services.turn_service import TurnService
     
-    nations = NationService.get_all(db, limit=1)
-    has_game = len(nations) > 0
-    
-    if has_game:
-        current_turn = TurnService.get_current_turn(db)
-        player_nations = [n for n in NationService.get_all(db) if n.is_player]
+    if game_id is not None:
+        nations = NationService.get_all(db, game_id=game_id)
+        current_turn = TurnService.get_current(db, game_id)
+        player_nation = NationService.get_player_nation(db, game_id)
         
         return {
             "has_active_game": True,
+            "game_id": game_id,
             "current_turn": current_turn.turn_number if current_turn else 0,
-            "player_nation": player_nations[0].name if player_nations else None,
-            "total_nations": len(NationService.get_all(db))
+            "player_nation": player_nation.name if player_nation else None,
+            "total_nations": len(nations)
         }
     
     return {
         "has_active_game": False,
+        "game_id": None,
         "current_turn": 0,
         "player_nation": None,
         "total_nations": 0
@@ -161,7 +213,7 @@ def get_game_status(db: Session = Depends(get_db)):
 
 
 @router.get("/state", response_model=GameStateResponse)
-def get_game_state(db: Session = Depends(get_db)):
+def get_game_state(game_id: Optional[int] = Depends(get_game_id), db: Session = Depends(get_db)):
     """
     Obtener el estado actual completo del juego
     
@@ -173,7 +225,7 @@ def get_game_state(db: Session = Depends(get_db)):
     """
     from ..schemas.nation_schema import NationSummary
     
-    state = GameService.get_game_state(db)
+    state = GameService.get_game_state(db, game_id)
     
     print(f"📊 Estado del juego - Turno: {state['current_turn']}, Naciones: {len(state['nations'])}")
     
@@ -193,7 +245,8 @@ def get_game_state(db: Session = Depends(get_db)):
             economic_power=n['economic_power'],
             diplomatic_influence=n['diplomatic_influence'],
             ai_controlled=n['ai_controlled'],
-            is_active=n['is_active']
+            is_active=n['is_active'],
+            game_id=n['game_id']
         ))
         
         if not n['ai_controlled']:
@@ -223,10 +276,10 @@ def get_game_state(db: Session = Depends(get_db)):
     from ..services.victory_service import VictoryService
     from ..services.turn_service import TurnService
     
-    current_turn_obj = TurnService.get_current(db)
+    current_turn_obj = TurnService.get_current(db, game_id)
     turn_number = current_turn_obj.turn_number if current_turn_obj else state["current_turn"]
     
-    victory_check = VictoryService.check_victory_conditions(db, turn_number)
+    victory_check = VictoryService.check_victory_conditions(db, turn_number, game_id)
     
     # Obtener progreso de victoria del jugador
     player_nation_obj = None
@@ -237,6 +290,7 @@ def get_game_state(db: Session = Depends(get_db)):
             victory_progress = VictoryService.get_victory_progress(db, player_nation_obj, turn_number)
     
     return GameStateResponse(
+        game_id=game_id,
         current_turn=state["current_turn"],
         nations=nations_summary,
         recent_events=events_summary,
@@ -259,7 +313,17 @@ def process_action(
     
     - **nation_id**: ID de la nación que realiza la acción
     - **action**: Datos de la acción a realizar
+    
+    Devuelve 409 si la partida de la nación ya terminó.
     """
+    nation = NationService.get_by_id(db, nation_id)
+    if not nation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Nación no encontrada"
+        )
+    ensure_game_in_progress(db, nation.game_id)
+    
     result = GameService.process_action(db, nation_id, action)
     
     if not result.get("success", False):
@@ -276,26 +340,30 @@ def process_action(
 
 
 @router.get("/leaderboard", response_model=List[Dict[str, Any]])
-def get_leaderboard(db: Session = Depends(get_db)):
+def get_leaderboard(game_id: Optional[int] = Depends(get_game_id), db: Session = Depends(get_db)):
     """
-    Obtener tabla de clasificación de todas las naciones.
+    Obtener tabla de clasificación de las naciones de la partida.
     
     Returns:
         Lista ordenada por puntuación total (oro, tropas, territorios, poderes)
     """
     from ..services.victory_service import VictoryService
     
-    leaderboard = VictoryService.get_leaderboard(db)
+    leaderboard = VictoryService.get_leaderboard(db, game_id)
     return leaderboard
 
 
 @router.get("/victory-progress", response_model=Dict[str, Any])
-def get_victory_progress(nation_id: Optional[int] = None, db: Session = Depends(get_db)):
+def get_victory_progress(
+    nation_id: Optional[int] = None,
+    game_id: Optional[int] = Depends(get_game_id),
+    db: Session = Depends(get_db)
+):
     """
     Obtener progreso hacia todas las condiciones de victoria.
     
     Args:
-        nation_id: ID de la nación (opcional, por defecto la nación del jugador)
+        nation_id: ID de la nación (opcional, por defecto la nación del jugador de la partida)
     
     Returns:
         Progreso de cada tipo de victoria (domination, economic, military, etc.)
@@ -305,7 +373,7 @@ def get_victory_progress(nation_id: Optional[int] = None, db: Session = Depends(
     
     # Obtener nación
     if nation_id is None:
-        nation = NationService.get_player_nation(db)
+        nation = NationService.get_player_nation(db, game_id)
     else:
         nation = NationService.get_by_id(db, nation_id)
     
@@ -315,8 +383,8 @@ def get_victory_progress(nation_id: Optional[int] = None, db: Session = Depends(
             detail="Nación no encontrada"
         )
     
-    # Obtener turno actual
-    current_turn = TurnService.get_current(db)
+    # Obtener turno actual de la partida de la nación
+    current_turn = TurnService.get_current(db, nation.game_id)
     turn_number = current_turn.turn_number if current_turn else 1
     
     # Calcular progreso
@@ -331,7 +399,7 @@ def get_victory_progress(nation_id: Optional[int] = None, db: Session = Depends(
 
 
 @router.post("/next-turn", response_model=MessageResponse)
-def advance_turn(db: Session = Depends(get_db)):
+def advance_turn(game_id: Optional[int] = Depends(get_game_id), db: Session = Depends(get_db)):
     """
     Avanzar al siguiente turno
     
@@ -344,17 +412,18 @@ def advance_turn(db: Session = Depends(get_db)):
     """
     from ..services.turn_service import TurnService
     
-    current_turn = TurnService.get_current(db)
+    current_turn = TurnService.get_current(db, game_id)
     if not current_turn:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No hay turno actual. Inicializa el juego primero."
         )
+    ensure_game_in_progress(db, game_id)
     
     # Por ahora, solo crear el siguiente turno
     # TODO: Aquí se llamará al sistema de agentes (LangGraph)
     
-    nations = NationService.get_all(db)
+    nations = NationService.get_all(db, game_id=game_id)
     world_state = {
         "nations": [n.to_dict() for n in nations],
         "turn": current_turn.turn_number + 1
@@ -363,11 +432,12 @@ def advance_turn(db: Session = Depends(get_db)):
     new_turn = TurnService.create_next_turn(
         db,
         world_state=world_state,
-        summary="Turno avanzado (agentes IA pendientes de implementar)"
+        summary="Turno avanzado (agentes IA pendientes de implementar)",
+        game_id=game_id
     )
     
     return MessageResponse(
         message=f"Turno {new_turn.turn_number} iniciado",
         success=True,
-        data={"turn_number": new_turn.turn_number}
+        data={"game_id": game_id, "turn_number": new_turn.turn_number}
     )
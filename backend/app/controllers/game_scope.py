@@ -0,0 +1,50 @@
+"""
+Dependencia común para elegir la partida de cada petición
+"""
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from ..models.database import get_db
+from ..services.game_service import GameService
+
+
+def get_game_id(
+    game_id: Optional[int] = Query(None, description="ID de la partida (por defecto, la partida activa más reciente)"),
+    db: Session = Depends(get_db)
+) -> Optional[int]:
+    """
+    Resolver la partida de la petición.
+
+    Sin game_id se usa la partida activa más reciente (o la última terminada
+    si no queda ninguna activa), así los clientes de una sola partida siguen
+    funcionando igual. Devuelve None si aún no hay ninguna partida.
+
+    Raises:
+        HTTPException 404: Si se indica un game_id que no existe
+    """
+    game = GameService.resolve_game(db, game_id)
+    if game is None:
+        if game_id is not None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Partida {game_id} no encontrada"
+            )
+        return None
+    return game.id
+
+
+def ensure_game_in_progress(db: Session, game_id: Optional[int]) -> None:
+    """
+    Rechazar turnos y acciones nuevos en una partida terminada.
+
+    Raises:
+        HTTPException 409: Si la partida ya terminó
+    """
+    game = GameService.get_game(db, game_id) if game_id is not None else None
+    if game and game.status == "finished":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"La partida {game_id} ya ha terminado. Inicializa una nueva partida."
+        )
@@ -2,13 +2,22 @@
 Controller para endpoints RAG (Sistema de Memoria)
 Rutas: /api/memory/*
 """
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Response, status, Depends
+from sqlalchemy.orm import Session
+from typing import Dict, Optional
 from pydantic import BaseModel
 import logging
 
+from ..models.database import get_db
+from ..services.nation_service import NationService
+from ..services.rag_compaction import RAGCompactionService
+from ..services.turn_service import TurnService
 from ..services.rag_service import get_rag_service
+from ..services.rag_indexer import get_rag_indexer
+from ..services.rag_maintenance import ReindexConflictError, get_reindex_service
+from ..services.job_service import get_job_service
 from ..config.security import require_api_key
+from .game_scope import get_game_id
 
 router = APIRouter(prefix="/api/memory", tags=["Memory (RAG)"])
 logger = logging.getLogger(__name__)
@@ -32,6 +41,12 @@ class AgentContextRequest(BaseModel):
     max_events: int = 5
 
 
+class AgentContextsRequest(BaseModel):
+    """Request para obtener el contexto de varios agentes a la vez"""
+    situations: Dict[int, str]
+    max_events: int = 5
+
+
 # ==================== ENDPOINTS ====================
 
 @router.get("/stats")
@@ -44,17 +59,21 @@ def get_memory_stats():
         - persist_directory: Ubicación de ChromaDB
         - collection_name: Nombre de la colección
         - embedding_model: Modelo usado para vectorizar
+        - indexer: Estado de la cola de indexación (pendientes, lag, fallos)
     """
     rag = get_rag_service()
-    return rag.get_stats()
+    stats = rag.get_stats()
+    stats["indexer"] = get_rag_indexer().get_stats()
+    return stats
 
 
 @router.post("/search")
-def search_memory(request: SearchMemoryRequest):
+def search_memory(request: SearchMemoryRequest, game_id: Optional[int] = Depends(get_game_id)):
     """
     Buscar eventos relevantes en la memoria usando búsqueda semántica
     
-    Permite buscar eventos similares a una query en lenguaje natural.
+    Permite buscar eventos similares a una query en lenguaje natural,
+    solo entre los de la partida (?game_id=, por defecto la más reciente).
     
     Ejemplo:
     ```json
@@ -73,7 +92,8 @@ def search_memory(request: SearchMemoryRequest):
         n_results=request.n_results,
         nation_id=request.nation_id,
         event_type=request.event_type,
-        min_importance=request.min_importance
+        min_importance=request.min_importance,
+        game_id=game_id
     )
     
     return {
@@ -103,7 +123,7 @@ def get_nation_memory(nation_id: int, limit: int = 10):
 
 
 @router.post("/agent/context")
-def get_agent_context(request: AgentContextRequest):
+def get_agent_context(request: AgentContextRequest, db: Session = Depends(get_db)):
     """
     Obtener contexto formateado para un agente IA
     
@@ -125,10 +145,14 @@ def get_agent_context(request: AgentContextRequest):
     """
     rag = get_rag_service()
     
+    # La memoria se busca en la partida de la nación
+    nation = NationService.get_by_id(db, request.nation_id)
+    
     context = rag.get_context_for_agent(
         nation_id=request.nation_id,
         current_situation=request.current_situation,
-        max_events=request.max_events
+        max_events=request.max_events,
+        game_id=nation.game_id if nation else None
     )
     
     # Contar eventos en el contexto (aproximado)
@@ -141,6 +165,37 @@ def get_agent_context(request: AgentContextRequest):
     }
 
 
+@router.post("/agent/contexts")
+def get_agent_contexts(request: AgentContextsRequest, game_id: Optional[int] = Depends(get_game_id)):
+    """
+    Obtener el contexto de varios agentes en una sola llamada
+    
+    Mismo resultado que /agent/context por nación, pero codifica todas las
+    situaciones de una vez y hace una única búsqueda vectorizada.
+    
+    Ejemplo:
+    ```json
+    {
+        "situations": {
+            "1": "Estados Unidos evalúa atacar a China",
+            "2": "China busca aliados"
+        },
+        "max_events": 5
+    }
+    ```
+    """
+    rag = get_rag_service()
+    
+    contexts = rag.get_contexts_for_agents(request.situations, max_events=request.max_events, game_id=game_id)
+    
+    return {
+        "contexts": [
+            {"nation_id": nation_id, "context": context, "events_used": context.count("- ")}
+            for nation_id, context in contexts.items()
+        ]
+    }
+
+
 @router.delete("/clear")
 def clear_memory(_: None = Depends(require_api_key)):
     """
@@ -166,42 +221,138 @@ def clear_memory(_: None = Depends(require_api_key)):
 
 
 @router.post("/reindex")
-def reindex_events_from_db(_: None = Depends(require_api_key)):
+def reindex_events_from_db(
+    response: Response,
+    resume: bool = True,
+    batch_size: int = 256,
+    wait: bool = False,
+    _: None = Depends(require_api_key)
+):
     """
-    Reindexar todos los eventos desde PostgreSQL a ChromaDB
+    Reindexar todos los eventos desde PostgreSQL a la memoria RAG
     
     Útil si ChromaDB se perdió o se quiere reconstruir la memoria.
-    """
-    from sqlalchemy.orm import Session
-    from ..models.database import SessionLocal
-    from ..services.event_service import EventService
+    Recorre los eventos por páginas (sin límite de tamaño) y guarda un
+    checkpoint tras cada lote.
     
-    rag = get_rag_service()
-    db = SessionLocal()
+    - **resume**: Continuar desde el último checkpoint si el anterior se interrumpió
+    - **batch_size**: Eventos embebidos e insertados por lote
+    - **wait**: Si es True, responde al terminar; si no, se ejecuta en segundo
+      plano y el progreso se consulta en GET /api/memory/reindex/status
+    """
+    reindex = get_reindex_service()
     
     try:
-        # Obtener todos los eventos de la DB
-        events = EventService.get_all(db, limit=1000)
-        
-        if not events:
+        if not wait:
+            response.status_code = status.HTTP_202_ACCEPTED
             return {
-                "message": "No hay eventos para reindexar",
-                "events_added": 0
+                "message": "Reindexado iniciado",
+                **reindex.start(resume=resume, batch_size=batch_size)
             }
         
-        # Añadir en batch
-        count = rag.add_events_batch(events)
-        
-        return {
-            "message": "Eventos reindexados exitosamente",
-            "events_added": count
-        }
-        
-    except Exception as e:
+        summary = reindex.run(resume=resume, batch_size=batch_size)
+        if summary["events_added"] == 0:
+            return {"message": "No hay eventos para reindexar", **summary}
+        return {"message": "Eventos reindexados exitosamente", **summary}
+    
+    except ReindexConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception:
         logger.exception("Error al reindexar memoria desde DB")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error al reindexar memoria"
+            detail="Error al reindexar memoria (se puede reanudar con resume=true)"
+        )
+
+
+@router.post("/sync")
+def sync_events_from_db(
+    response: Response,
+    batch_size: int = 256,
+    wait: bool = False,
+    _: None = Depends(require_api_key)
+):
+    """
+    Sincronización incremental de la memoria RAG con la BD
+
+    Solo embebe los eventos que faltan en el vector store o cuyo texto
+    indexado cambió (content_hash distinto) y elimina los vectores de eventos
+    que ya no existen. Mucho más barato que /reindex cuando casi todo está
+    al día.
+
+    - **batch_size**: Eventos leídos de la BD por página
+    - **wait**: Si es True, responde al terminar; si no, se ejecuta en segundo
+      plano y el progreso se consulta en GET /api/memory/reindex/status
+    """
+    reindex = get_reindex_service()
+
+    try:
+        if not wait:
+            response.status_code = status.HTTP_202_ACCEPTED
+            return {"message": "Sincronización iniciada", **reindex.start_sync(batch_size=batch_size)}
+
+        summary = reindex.sync(batch_size=batch_size)
+        if summary["indexed"] == 0 and summary["orphans_deleted"] == 0:
+            return {"message": "La memoria ya estaba sincronizada", **summary}
+        return {"message": "Memoria sincronizada exitosamente", **summary}
+
+    except ReindexConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception:
+        logger.exception("Error al sincronizar memoria desde DB")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al sincronizar memoria"
         )
-    finally:
-        db.close()
+
+
+@router.post("/compact")
+def compact_memory(
+    game_id: Optional[int] = Depends(get_game_id),
+    db: Session = Depends(get_db),
+    _: None = Depends(require_api_key)
+):
+    """
+    Compactar ahora la memoria RAG de una partida
+    
+    Resume por nación los eventos poco importantes de las eras ya cerradas
+    (lo mismo que hace el turno cada RAG_COMPACTION_EVERY_TURNS turnos) y
+    los retira del vector store. Responde 409 si hay un turno de la partida
+    en curso, que podría estar compactando lo mismo.
+    """
+    active_job = get_job_service().get_active_job(game_id)
+    if active_job:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Hay un turno en curso para esta partida",
+                "job_id": active_job.id,
+                "status_url": f"/api/agents/jobs/{active_job.id}"
+            }
+        )
+    
+    # El turno activo aún no se ha jugado
+    last_played_turn = TurnService.get_current_turn_number(db, game_id) - 1
+    
+    try:
+        summary = RAGCompactionService.compact(db, last_played_turn, game_id)
+    except Exception:
+        logger.exception("Error al compactar la memoria RAG")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al compactar la memoria RAG"
+        )
+    
+    if summary["events_compacted"] == 0:
+        return {"message": "No hay eventos que compactar", **summary}
+    return {"message": "Memoria compactada exitosamente", **summary}
+
+
+@router.get("/reindex/status")
+def get_reindex_status():
+    """
+    Progreso del reindexado o de la sincronización en curso: estado,
+    eventos procesados/total, eventos/s y checkpoint pendiente (si el último
+    reindexado se interrumpió)
+    """
+    return get_reindex_service().get_status()
@@ -4,10 +4,12 @@ Rutas: /api/nations/*
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from ..models.database import get_db
+from ..services.game_service import GameService
 from ..services.nation_service import NationService
+from .game_scope import get_game_id
 from ..schemas.nation_schema import (
     NationCreate,
     NationUpdate,
@@ -23,34 +25,36 @@ def get_all_nations(
     skip: int = 0,
     limit: int = 100,
     active_only: bool = True,
+    game_id: Optional[int] = Depends(get_game_id),
     db: Session = Depends(get_db)
 ):
     """
-    Obtener todas las naciones
+    Obtener todas las naciones de la partida
     
     - **skip**: Número de registros a saltar (paginación)
     - **limit**: Máximo de registros a devolver
     - **active_only**: Solo naciones activas (por defecto True)
+    - **game_id**: Partida (por defecto, la activa más reciente)
     """
-    nations = NationService.get_all(db, skip, limit, active_only)
+    nations = NationService.get_all(db, skip, limit, active_only, game_id)
     return nations
 
 
 @router.get("/summary", response_model=List[NationSummary])
-def get_nations_summary(db: Session = Depends(get_db)):
+def get_nations_summary(game_id: Optional[int] = Depends(get_game_id), db: Session = Depends(get_db)):
     """
-    Obtener resumen de todas las naciones (más ligero)
+    Obtener resumen de todas las naciones de la partida (más ligero)
     """
-    nations = NationService.get_all(db)
+    nations = NationService.get_all(db, game_id=game_id)
     return nations
 
 
 @router.get("/player", response_model=NationResponse)
-def get_player_nation(db: Session = Depends(get_db)):
+def get_player_nation(game_id: Optional[int] = Depends(get_game_id), db: Session = Depends(get_db)):
     """
-    Obtener la nación controlada por el jugador
+    Obtener la nación controlada por el jugador en la partida
     """
-    nation = NationService.get_player_nation(db)
+    nation = NationService.get_player_nation(db, game_id)
     if not nation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -60,11 +64,11 @@ def get_player_nation(db: Session = Depends(get_db)):
 
 
 @router.get("/ai", response_model=List[NationResponse])
-def get_ai_nations(db: Session = Depends(get_db)):
+def get_ai_nations(game_id: Optional[int] = Depends(get_game_id), db: Session = Depends(get_db)):
     """
-    Obtener todas las naciones controladas por IA
+    Obtener todas las naciones controladas por IA en la partida
     """
-    nations = NationService.get_ai_nations(db)
+    nations = NationService.get_ai_nations(db, game_id)
     return nations
 
 
@@ -83,12 +87,24 @@ def get_nation(nation_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=NationResponse, status_code=status.HTTP_201_CREATED)
-def create_nation(nation_data: NationCreate, db: Session = Depends(get_db)):
+def create_nation(
+    nation_data: NationCreate,
+    game_id: Optional[int] = Depends(get_game_id),
+    db: Session = Depends(get_db)
+):
     """
-    Crear una nueva nación
+    Crear una nueva nación en la partida (la del cuerpo o la del parámetro game_id)
     """
-    # Verificar que no exista ya una nación con ese nombre
-    existing = NationService.get_by_name(db, nation_data.name)
+    if nation_data.game_id is None:
+        nation_data = nation_data.model_copy(update={"game_id": game_id})
+    elif not GameService.get_game(db, nation_data.game_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Partida {nation_data.game_id} no encontrada"
+        )
+    
+    # Verificar que no exista ya una nación con ese nombre en la partida
+    existing = NationService.get_by_name(db, nation_data.name, nation_data.game_id)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
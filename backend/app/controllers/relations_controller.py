@@ -4,21 +4,22 @@ Rutas: /api/relations/*
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from ..models.database import get_db
 from ..services.relation_service import RelationService
 from ..schemas.relation_schema import RelationCreate, RelationUpdate, RelationResponse
+from .game_scope import get_game_id
 
 router = APIRouter(prefix="/api/relations", tags=["Relations"])
 
 
 @router.get("/", response_model=List[RelationResponse])
-def get_all_relations(db: Session = Depends(get_db)):
+def get_all_relations(game_id: Optional[int] = Depends(get_game_id), db: Session = Depends(get_db)):
     """
-    Obtener todas las relaciones diplomáticas
+    Obtener todas las relaciones diplomáticas de la partida
     """
-    relations = RelationService.get_all(db)
+    relations = RelationService.get_all(db, game_id)
     return relations
 
 
@@ -98,7 +99,10 @@ def create_relation(relation_data: RelationCreate, db: Session = Depends(get_db)
             detail="Ya existe una relación entre estas naciones"
         )
     
-    relation = RelationService.create(db, relation_data)
+    try:
+        relation = RelationService.create(db, relation_data)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return relation
 
 
@@ -133,11 +137,14 @@ def update_or_create_relation(
     
     Útil para cambios dinámicos durante el juego
     """
-    relation = RelationService.update_or_create(
-        db,
-        nation_a_id,
-        nation_b_id,
-        status,
-        relationship_score
-    )
+    try:
+        relation = RelationService.update_or_create(
+            db,
+            nation_a_id,
+            nation_b_id,
+            status,
+            relationship_score
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return relation
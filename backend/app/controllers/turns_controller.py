@@ -4,11 +4,12 @@ Rutas: /api/turns/*
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from ..models.database import get_db
 from ..services.turn_service import TurnService
 from ..schemas.turn_schema import TurnResponse, TurnSummary
+from .game_scope import get_game_id
 
 router = APIRouter(prefix="/api/turns", tags=["Turns"])
 
@@ -17,21 +18,22 @@ router = APIRouter(prefix="/api/turns", tags=["Turns"])
 def get_all_turns(
     skip: int = 0,
     limit: int = 100,
+    game_id: Optional[int] = Depends(get_game_id),
     db: Session = Depends(get_db)
 ):
     """
-    Obtener todos los turnos (ordenados por número descendente)
+    Obtener todos los turnos de la partida (ordenados por número descendente)
     """
-    turns = TurnService.get_all(db, skip, limit)
+    turns = TurnService.get_all(db, skip, limit, game_id)
     return turns
 
 
 @router.get("/current", response_model=TurnResponse)
-def get_current_turn(db: Session = Depends(get_db)):
+def get_current_turn(game_id: Optional[int] = Depends(get_game_id), db: Session = Depends(get_db)):
     """
-    Obtener el turno actual (último creado)
+    Obtener el turno actual de la partida (último creado)
     """
-    turn = TurnService.get_current(db)
+    turn = TurnService.get_current(db, game_id)
     if not turn:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -55,11 +57,15 @@ def get_turn(turn_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/number/{turn_number}", response_model=TurnResponse)
-def get_turn_by_number(turn_number: int, db: Session = Depends(get_db)):
+def get_turn_by_number(
+    turn_number: int,
+    game_id: Optional[int] = Depends(get_game_id),
+    db: Session = Depends(get_db)
+):
     """
-    Obtener un turno específico por su número
+    Obtener un turno específico de la partida por su número
     """
-    turn = TurnService.get_by_number(db, turn_number)
+    turn = TurnService.get_by_number(db, turn_number, game_id)
     if not turn:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -34,6 +34,10 @@ from .models import create_tables, Base, engine
 from .config.settings import settings
 
 
+# Tiempo máximo esperando a vaciar la cola de indexación RAG al cerrar
+RAG_INDEX_SHUTDOWN_TIMEOUT_SECONDS = 30
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -49,10 +53,19 @@ async def lifespan(app: FastAPI):
     create_tables()
     print("✅ Tablas creadas/verificadas")
     
+    # Warmup del modelo de embeddings y del vector store (ver RAG_WARMUP_MODE)
+    from .services.rag_service import warmup_rag_service
+    print(f"🧠 Warmup RAG: {settings.RAG_WARMUP_MODE}")
+    warmup_rag_service(settings.RAG_WARMUP_MODE)
+    
     yield  # Aplicación corriendo
     
     # Shutdown
     print("🛑 Cerrando Nation-Mind AI Backend...")
+    # Indexar en RAG los eventos que aún estén en cola
+    from .services.rag_indexer import flush_rag_indexer
+    if not flush_rag_indexer(timeout=RAG_INDEX_SHUTDOWN_TIMEOUT_SECONDS):
+        print("⚠️ Quedaron eventos sin indexar en RAG al cerrar")
 
 
 # Crear aplicación FastAPI
@@ -68,6 +81,8 @@ RATE_LIMIT_PATHS = {
     "/api/agents/process-turn",
     "/api/memory/clear",
     "/api/memory/reindex",
+    "/api/memory/sync",
+    "/api/memory/compact",
     "/api/game/initialize",
 }
 RATE_LIMIT_STORE: Dict[str, Deque[float]] = {}
@@ -169,13 +184,35 @@ def read_root():
 
 @app.get("/api/health")
 def health_check():
-    """Health check - Verificar que la API está funcionando"""
+    """
+    Health check - Verificar que la API está funcionando
+    
+    `status` indica que el proceso responde; `ready` que además la memoria RAG
+    está cargada (o desactivada) y las peticiones no esperarán a su warmup.
+    """
+    from .services.rag_service import get_rag_readiness
+
+    rag = get_rag_readiness()
     return {
         "status": "ok",
-        "message": "Backend funcionando correctamente"
+        "message": "Backend funcionando correctamente",
+        "ready": rag["status"] in ("ready", "disabled"),
+        "components": {"rag": rag}
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Métricas en formato de texto de Prometheus (fases del turno, agentes, LLM y RAG)"""
+    from fastapi.responses import PlainTextResponse
+    from .services.metrics_service import get_metrics_service
+
+    return PlainTextResponse(
+        get_metrics_service().render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # ==================== REGISTRAR ROUTERS ====================
 
 # Nations (Naciones)
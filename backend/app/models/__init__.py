@@ -2,6 +2,7 @@
 Modelos SQLAlchemy para la base de datos
 """
 from .database import Base, get_db, create_tables, drop_tables, engine
+from .game import Game
 from .nation import Nation
 from .turn import Turn
 from .event import Event
@@ -14,6 +15,7 @@ __all__ = [
     "create_tables",
     "drop_tables",
     "engine",
+    "Game",
     "Nation",
     "Turn",
     "Event",
@@ -15,6 +15,9 @@ class Battle(Base):
     id = Column(Integer, primary_key=True, index=True)
     turn_number = Column(Integer, nullable=False, index=True)
     
+    # Partida a la que pertenece
+    game_id = Column(Integer, ForeignKey("games.id"), index=True)
+    
     # Participantes
     attacker_id = Column(Integer, ForeignKey("nations.id"), nullable=False)
     defender_id = Column(Integer, ForeignKey("nations.id"), nullable=False)
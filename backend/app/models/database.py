@@ -1,9 +1,12 @@
 """
 Configuración de base de datos PostgreSQL con SQLAlchemy
 """
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 import os
 from dotenv import load_dotenv
 
@@ -55,3 +58,97 @@ def drop_tables():
     """
     Base.metadata.drop_all(bind=engine)
     print("⚠️ Todas las tablas eliminadas")
+
+
+# ==================== UNIDAD DE TRABAJO ====================
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[Session]:
+    """
+    Agrupar todas las escrituras de un bloque en una sola transacción.
+
+    Dentro del bloque los servicios solo hacen flush (commit_or_flush); al
+    salir del bloque más externo se hace un único commit, o rollback si hubo
+    una excepción. Los bloques anidados se integran en el externo.
+
+    Los callbacks registrados con after_commit (p. ej. indexar en RAG) solo
+    se ejecutan si el commit tiene éxito.
+
+    Uso:
+        with unit_of_work(db):
+            NationService.update(db, nation_id, {"gold": 100})
+            EventService.create(db, event_data)
+    """
+    depth = db.info.get("uow_depth", 0)
+    db.info["uow_depth"] = depth + 1
+    if depth == 0:
+        db.info["uow_after_commit"] = []
+
+    try:
+        yield db
+        if depth == 0:
+            db.commit()
+    except BaseException:
+        if depth == 0:
+            db.rollback()
+            db.info.pop("uow_after_commit", None)
+        raise
+    finally:
+        db.info["uow_depth"] = depth
+
+    if depth == 0:
+        for callback in db.info.pop("uow_after_commit", []):
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Warning: Falló un callback post-commit: {e}")
+
+
+def in_unit_of_work(db: Session) -> bool:
+    """True si la sesión está dentro de un bloque unit_of_work"""
+    return db.info.get("uow_depth", 0) > 0
+
+
+def commit_or_flush(db: Session, *instances) -> None:
+    """
+    Confirmar los cambios de un servicio.
+
+    - Fuera de unit_of_work: commit y refresh de las instancias (comportamiento clásico)
+    - Dentro de unit_of_work: solo flush (asigna IDs y envía el SQL); el commit
+      lo hace el bloque externo
+    """
+    if in_unit_of_work(db):
+        db.flush()
+        return
+    db.commit()
+    for instance in instances:
+        db.refresh(instance)
+
+
+def after_commit(db: Session, callback: Callable[[], None]) -> None:
+    """Ejecutar callback tras el commit de la unidad de trabajo (o ya, si no hay ninguna)"""
+    if in_unit_of_work(db):
+        db.info["uow_after_commit"].append(callback)
+    else:
+        callback()
+
+
+@contextmanager
+def savepoint(db: Session) -> Iterator[Session]:
+    """
+    Aislar un paso dentro de una unidad de trabajo: si falla, se deshacen solo
+    sus cambios (SAVEPOINT) y el resto del turno sigue adelante.
+    Fuera de unit_of_work no hace nada especial.
+    """
+    if not in_unit_of_work(db):
+        yield db
+        return
+    callbacks = db.info["uow_after_commit"]
+    pending = len(callbacks)
+    try:
+        with db.begin_nested():
+            yield db
+    except BaseException:
+        # Los callbacks del paso deshecho ya no deben ejecutarse
+        del callbacks[pending:]
+        raise
@@ -13,6 +13,9 @@ class Event(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     
+    # Partida a la que pertenece
+    game_id = Column(Integer, ForeignKey("games.id"), index=True)
+    
     # Turno en el que ocurrió
     turn_id = Column(Integer, ForeignKey("turns.id"), index=True)
     
@@ -34,6 +37,11 @@ class Event(Base):
     # Timestamp
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     
+    # Número del turno dentro de la partida (turn_id es global a todas las
+    # partidas). No es columna: EventService.attach_turn_numbers lo rellena
+    # antes de indexar el evento en la memoria RAG
+    turn_number = None
+    
     def __repr__(self):
         return f"<Event(type='{self.event_type}', nation_id={self.nation_id}, turn={self.turn_id})>"
     
@@ -41,6 +49,7 @@ class Event(Base):
         """Convertir a diccionario para JSON"""
         return {
             "id": self.id,
+            "game_id": self.game_id,
             "turn_id": self.turn_id,
             "nation_id": self.nation_id,
             "event_type": self.event_type,
@@ -0,0 +1,32 @@
+"""
+Modelo de Partida (Game)
+Agrupa naciones, turnos, eventos, relaciones y batallas de una misma partida
+"""
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from .database import Base
+
+
+class Game(Base):
+    __tablename__ = "games"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=True)
+    
+    # Estado de la partida ("finished" al cumplirse una condición de victoria)
+    status = Column(String(20), default="active", index=True)  # "active", "finished"
+    
+    # Timestamp
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<Game(id={self.id}, name='{self.name}', status='{self.status}')>"
+    
+    def to_dict(self):
+        """Convertir a diccionario para JSON"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
@@ -2,7 +2,7 @@
 Modelo de Nación (Nation)
 Representa a cada país/estado en el simulador
 """
-from sqlalchemy import Column, Integer, String, Boolean, JSON, Float
+from sqlalchemy import Column, Integer, String, Boolean, JSON, Float, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -12,7 +12,10 @@ class Nation(Base):
 
     # Campos básicos
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(100), unique=True, index=True, nullable=False)
+    name = Column(String(100), index=True, nullable=False)
+    
+    # Partida a la que pertenece
+    game_id = Column(Integer, ForeignKey("games.id"), index=True)
     
     # Personalidad del agente IA
     personality = Column(String(50), default="neutral")  # aggressive, diplomatic, defensive, expansionist
@@ -41,6 +44,11 @@ class Nation(Base):
     battles_as_defender = relationship("Battle", foreign_keys="Battle.defender_id", back_populates="defender")
     battles_won = relationship("Battle", foreign_keys="Battle.winner_id", back_populates="winner")
     
+    # El nombre es único dentro de cada partida
+    __table_args__ = (
+        UniqueConstraint('game_id', 'name', name='_game_nation_name_uc'),
+    )
+    
     def __repr__(self):
         return f"<Nation(name='{self.name}', personality='{self.personality}', ai={self.ai_controlled})>"
     
@@ -49,6 +57,7 @@ class Nation(Base):
         return {
             "id": self.id,
             "name": self.name,
+            "game_id": self.game_id,
             "personality": self.personality,
             "gold": self.gold,
             "troops": self.troops,
@@ -11,6 +11,9 @@ class Relation(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     
+    # Partida a la que pertenece
+    game_id = Column(Integer, ForeignKey("games.id"), index=True)
+    
     # Naciones involucradas
     nation_a_id = Column(Integer, ForeignKey("nations.id"), nullable=False, index=True)
     nation_b_id = Column(Integer, ForeignKey("nations.id"), nullable=False, index=True)
@@ -33,6 +36,7 @@ class Relation(Base):
         """Convertir a diccionario para JSON"""
         return {
             "id": self.id,
+            "game_id": self.game_id,
             "nation_a_id": self.nation_a_id,
             "nation_b_id": self.nation_b_id,
             "status": self.status,
@@ -2,7 +2,7 @@
 Modelo de Turno (Turn)
 Representa cada turno del juego
 """
-from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey
 from datetime import datetime
 from .database import Base
 
@@ -13,6 +13,9 @@ class Turn(Base):
     id = Column(Integer, primary_key=True, index=True)
     turn_number = Column(Integer, index=True, nullable=False)
     
+    # Partida a la que pertenece
+    game_id = Column(Integer, ForeignKey("games.id"), index=True)
+    
     # Estado del mundo en este turno (snapshot)
     world_state = Column(JSON, default=dict)  # {"nations": {...}, "alliances": [...], etc.}
     
@@ -30,6 +33,7 @@ class Turn(Base):
         return {
             "id": self.id,
             "turn_number": self.turn_number,
+            "game_id": self.game_id,
             "world_state": self.world_state,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "summary": self.summary
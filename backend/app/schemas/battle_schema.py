@@ -22,6 +22,7 @@ class BattleResponse(BattleBase):
     """Schema de respuesta con todos los datos de Battle"""
     id: int
     turn_number: int
+    game_id: Optional[int] = None
     winner_id: Optional[int] = None
     
     # Fuerzas iniciales
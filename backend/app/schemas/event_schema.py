@@ -14,6 +14,7 @@ class EventBase(BaseModel):
     description: str = Field(..., min_length=10, max_length=500)
     data: Dict[str, Any] = Field(default_factory=dict)
     importance: int = Field(default=5, ge=1, le=10)
+    game_id: Optional[int] = None  # Si falta, la de la nación
 
 
 class EventCreate(EventBase):
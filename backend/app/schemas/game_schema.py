@@ -16,6 +16,7 @@ class ActionRequest(BaseModel):
 
 class GameStateResponse(BaseModel):
     """Schema para el estado completo del juego"""
+    game_id: Optional[int] = None
     current_turn: int
     nations: List[NationSummary]
     recent_events: List[EventSummary] = Field(default_factory=list)
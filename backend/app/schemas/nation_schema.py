@@ -18,6 +18,7 @@ class NationBase(BaseModel):
     diplomatic_influence: float = Field(default=50.0, ge=0, le=100)
     objectives: List[str] = Field(default_factory=list)
     ai_controlled: bool = True
+    game_id: Optional[int] = None  # Partida (la asigna el servicio si falta)
 
 
 class NationCreate(NationBase):
@@ -52,6 +53,7 @@ class NationResponse(NationBase):
 class NationSummary(BaseModel):
     """Schema resumido de nación (para listas)"""
     id: int
+    game_id: Optional[int] = None
     name: str
     personality: str
     gold: int
@@ -11,6 +11,7 @@ class RelationBase(BaseModel):
     nation_b_id: int = Field(..., ge=1)
     status: str = Field(default="neutral", pattern="^(allied|war|neutral|trade_agreement)$")
     relationship_score: int = Field(default=0, ge=-100, le=100)
+    game_id: Optional[int] = None  # Si falta, la de nation_a
     
     @field_validator('nation_b_id')
     @classmethod
@@ -11,6 +11,7 @@ class TurnBase(BaseModel):
     turn_number: int = Field(..., ge=1)
     world_state: Dict[str, Any] = Field(default_factory=dict)
     summary: Optional[str] = Field(None, max_length=500)
+    game_id: Optional[int] = None
 
 
 class TurnCreate(TurnBase):
@@ -30,6 +31,7 @@ class TurnResponse(TurnBase):
 class TurnSummary(BaseModel):
     """Schema resumido de turno (para listas)"""
     id: int
+    game_id: Optional[int] = None
     turn_number: int
     summary: Optional[str]
     created_at: datetime
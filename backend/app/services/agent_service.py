@@ -2,16 +2,26 @@
 Servicio de Agentes IA con LangGraph
 Gestiona la toma de decisiones de las naciones controladas por IA
 """
-from typing import TypedDict, List, Dict, Any, Optional
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypedDict, List, Dict, Any, Optional, Callable
 from sqlalchemy.orm import Session
-from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
 
 from ..config import settings
+from ..models.database import savepoint, unit_of_work
 from .nation_service import NationService
 from .rag_service import get_rag_service
+from .rag_compaction import RAGCompactionService
+from .turn_snapshot import TurnSnapshot
+from .llm_client import ResilientLLMClient
+from .llm_provider import create_chat_model, get_llm_provider_name
+from .metrics_service import get_metrics_service
 from .agent_tools import (
     get_my_nation_status,
     get_all_nations_status,
@@ -38,6 +48,49 @@ class AgentState(TypedDict):
     messages: List
     decision: Optional[Dict[str, Any]]
     turn_number: int
+    game_id: Optional[int]
+    timings: Dict[str, float]
+
+
+# Callback de progreso del turno: (evento, datos). Eventos emitidos:
+# phase_started, phase_completed, phase_skipped, agents_planned, agent_completed,
+# battle_resolved, victory_checked
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
+# Eventos relevantes del mundo en el contexto RAG de cada agente
+AGENT_CONTEXT_MAX_EVENTS = 5
+
+
+# ==================== GRAFO DEL AGENTE ====================
+
+def compile_agent_graph(gather_node, think_node, act_node=None):
+    """
+    Compilar el grafo de decisión de un agente.
+    
+    Flujo: gather_info → think → act → END. Si act_node es None se compila
+    solo la parte de decisión (gather_info → think → END), la que usa el
+    turno: las acciones se aplican fuera del grafo, en su propia transacción.
+    
+    Los nodos no capturan la sesión de BD: la reciben en
+    config["configurable"], así que el grafo compilado es reutilizable entre
+    naciones y turnos.
+    """
+    workflow = StateGraph(AgentState)
+    
+    workflow.add_node("gather_info", gather_node)
+    workflow.add_node("think", think_node)
+    
+    workflow.set_entry_point("gather_info")
+    workflow.add_edge("gather_info", "think")
+    
+    if act_node is None:
+        workflow.add_edge("think", END)
+    else:
+        workflow.add_node("act", act_node)
+        workflow.add_edge("think", "act")
+        workflow.add_edge("act", END)
+    
+    return workflow.compile()
 
 
 # ==================== SERVICIO DE AGENTES ====================
@@ -55,88 +108,213 @@ class AgentService:
     
     def __init__(self):
         """Inicializar el servicio de agentes"""
-        # LLM para los agentes (Groq con Llama)
-        self.llm = ChatGroq(
-            model=settings.LLM_MODEL,
-            temperature=settings.LLM_TEMPERATURE,
-            max_tokens=settings.LLM_MAX_TOKENS,
-            api_key=settings.GROQ_API_KEY
-        )
+        # LLM para los agentes (Groq o LLM falso local según LLM_PROVIDER)
+        self.llm_provider = get_llm_provider_name()
+        self.llm = create_chat_model()
+        self.llm_client = ResilientLLMClient(self.llm)
+        
+        # Métricas (spans por fase y por paso de agente)
+        self.metrics = get_metrics_service()
+        
+        # Duración (segundos) de cada fase, de cada paso por agente y
+        # resultado de victoria del último turno
+        self.last_turn_timings: Dict[str, float] = {}
+        self.last_agent_timings: Dict[str, Dict[str, float]] = {}
+        self.last_victory_check: Optional[Dict[str, Any]] = None
         
-        # Servicio RAG para memoria
-        self.rag = get_rag_service()
+        # Grafos compilados una sola vez y reutilizados por todas las naciones
+        self.decision_graph = compile_agent_graph(self._gather_node, self._think_node)
+        self.async_decision_graph = compile_agent_graph(self._agather_node, self._athink_node)
+        
+        # Event loop de la ruta async: uno solo y de larga vida, porque el
+        # cliente HTTP async del chat model queda ligado al loop donde se usó
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event_loop_lock = threading.Lock()
         
         print("✅ Agent Service inicializado")
-        print(f"🤖 Modelo: {settings.LLM_MODEL}")
+        print(f"🤖 Modelo: {settings.LLM_MODEL} ({self.llm_provider})")
+    
+    
+    @property
+    def rag(self):
+        """Servicio RAG para memoria (None si RAG_ENABLED=False); se carga en el primer uso"""
+        return get_rag_service() if settings.RAG_ENABLED else None
+    
+    
+    def _gather_node(self, state: AgentState, config: RunnableConfig) -> AgentState:
+        """Nodo gather_info: toma db y snapshot de config["configurable"]"""
+        configurable = config.get("configurable", {})
+        start = time.perf_counter()
+        state = self._gather_information(state, configurable.get("db"), configurable.get("snapshot"))
+        self._end_step(state, "gather", start)
+        return state
+    
+    
+    def _think_node(self, state: AgentState, config: RunnableConfig) -> AgentState:
+        """Nodo think: toma db de config["configurable"]"""
+        start = time.perf_counter()
+        state = self._think_and_decide(state, config.get("configurable", {}).get("db"))
+        self._end_step(state, "think", start)
+        return state
+    
+    
+    async def _agather_node(self, state: AgentState, config: RunnableConfig) -> AgentState:
+        """Nodo gather_info async: la consulta RAG es bloqueante, se ejecuta en un hilo"""
+        configurable = config.get("configurable", {})
+        start = time.perf_counter()
+        state = await asyncio.to_thread(
+            self._gather_information, state, configurable.get("db"), configurable.get("snapshot")
+        )
+        self._end_step(state, "gather", start)
+        return state
+    
+    
+    async def _athink_node(self, state: AgentState, config: RunnableConfig) -> AgentState:
+        """Nodo think async (ainvoke con deadline, reintentos y hedging)"""
+        start = time.perf_counter()
+        state = await self._athink_and_decide(state)
+        self._end_step(state, "think", start)
+        return state
+    
+    
+    def _end_step(self, state: AgentState, step: str, start: float) -> None:
+        """Registrar la duración de un paso del agente (gather/think/act)"""
+        seconds = time.perf_counter() - start
+        state.setdefault("timings", {})[step] = seconds
+        self.metrics.observe("nationmind_agent_step_seconds", seconds, step=step)
     
     
-    def create_agent_for_nation(self, nation_id: int, db: Session) -> StateGraph:
+    @staticmethod
+    def _notify(progress_callback: Optional[ProgressCallback], event: str, data: Dict[str, Any]) -> None:
+        """Avisar del progreso del turno; un fallo del callback nunca rompe el turno"""
+        if progress_callback is None:
+            return
+        try:
+            progress_callback(event, data)
+        except Exception as e:
+            print(f"⚠️ Warning: error en callback de progreso ({event}): {e}")
+    
+    
+    def _start_phase(self, phase: str, progress_callback: Optional[ProgressCallback] = None) -> float:
+        """Marcar el inicio de una fase del turno"""
+        self._notify(progress_callback, "phase_started", {"phase": phase})
+        return time.perf_counter()
+    
+    
+    def _end_phase(
+        self,
+        timings: Dict[str, float],
+        phase: str,
+        start: float,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> None:
+        """Registrar la duración de una fase del turno"""
+        timings[phase] = time.perf_counter() - start
+        self.metrics.observe("nationmind_turn_phase_seconds", timings[phase], phase=phase)
+        self._notify(progress_callback, "phase_completed", {
+            "phase": phase,
+            "duration_ms": round(timings[phase] * 1000, 2)
+        })
+    
+    
+    def get_last_turn_timings(self) -> Dict[str, Any]:
+        """Tiempos del último turno en milisegundos (bloque `timings` de la API)"""
+        return {
+            "phases_ms": {
+                phase: round(seconds * 1000, 2)
+                for phase, seconds in self.last_turn_timings.items()
+            },
+            "agents_ms": {
+                nation_name: {step: round(seconds * 1000, 2) for step, seconds in steps.items()}
+                for nation_name, steps in self.last_agent_timings.items()
+            }
+        }
+    
+    
+    @staticmethod
+    def _agent_config(db: Optional[Session], snapshot: Optional[TurnSnapshot]) -> RunnableConfig:
+        """Config de ejecución del grafo: la sesión y el snapshot viajan aquí, no en closures"""
+        return {"configurable": {"db": db, "snapshot": snapshot}}
+    
+    
+    @staticmethod
+    def _situation_query(nation_name: str) -> str:
+        """Consulta RAG con la que cada agente busca su contexto histórico"""
+        return f"Situación de {nation_name}: evaluando opciones estratégicas"
+    
+    
+    def _precompute_historical_contexts(self, snapshot: TurnSnapshot, ai_nations: List) -> None:
         """
-        Crear un grafo de decisión (agente) para una nación específica.
+        Calcular el contexto RAG de todos los agentes del turno de una vez.
         
-        Args:
-            nation_id: ID de la nación
-            db: Sesión de base de datos
-            
-        Returns:
-            StateGraph: Grafo compilado del agente
+        Una sola codificación de las consultas y una búsqueda vectorizada en
+        lugar de una por agente. Si falla, cada agente lo pide por su cuenta
+        en gather_info (mismo comportamiento que antes).
         """
-        nation = NationService.get_by_id(db, nation_id)
-        if not nation:
-            raise ValueError(f"Nación {nation_id} no encontrada")
-        
-        # Definir el grafo de estados
-        workflow = StateGraph(AgentState)
-        
-        # Nodos del grafo
-        workflow.add_node("gather_info", lambda state: self._gather_information(state, db))
-        workflow.add_node("think", lambda state: self._think_and_decide(state, db))
-        workflow.add_node("act", lambda state: self._execute_action(state, db))
-        
-        # Flujo: gather_info → think → act → END
-        workflow.set_entry_point("gather_info")
-        workflow.add_edge("gather_info", "think")
-        workflow.add_edge("think", "act")
-        workflow.add_edge("act", END)
-        
-        return workflow.compile()
+        if not settings.RAG_ENABLED:
+            return
+        try:
+            snapshot.set_historical_contexts(self.rag.get_contexts_for_agents(
+                {n.id: self._situation_query(n.name) for n in ai_nations},
+                max_events=AGENT_CONTEXT_MAX_EVENTS,
+                game_id=snapshot.game_id
+            ))
+        except Exception as e:
+            print(f"⚠️ No se pudo precalcular el contexto RAG del turno: {e}")
     
     
-    def _gather_information(self, state: AgentState, db: Session) -> AgentState:
+    def _gather_information(
+        self,
+        state: AgentState,
+        db: Optional[Session],
+        snapshot: Optional[TurnSnapshot] = None
+    ) -> AgentState:
         """
         Paso 1: Recopilar información del mundo y memoria histórica.
         
         Args:
             state: Estado actual del agente
-            db: Sesión de base de datos
+            db: Sesión de base de datos (solo se usa si no hay snapshot)
+            snapshot: Estado del mundo compartido por todos los agentes del turno
             
         Returns:
             AgentState: Estado actualizado con información
         """
         nation_id = state["nation_id"]
         
-        # Obtener estado de mi nación
-        my_status = get_my_nation_status.invoke({
-            "nation_id": nation_id,
-            "db": db
-        })
-        
-        # Obtener estado de todas las naciones
-        world_status = get_all_nations_status.invoke({"db": db})
-        
-        # Obtener relaciones diplomáticas
-        relations = get_relations_status.invoke({
-            "nation_id": nation_id,
-            "db": db
-        })
+        if snapshot is not None:
+            # Leer del snapshot del turno (sin consultas a la BD)
+            my_status = snapshot.get_my_nation_status(nation_id)
+            world_status = snapshot.get_all_nations_status()
+            relations = snapshot.get_relations_status(nation_id)
+        else:
+            # Obtener estado de mi nación
+            my_status = get_my_nation_status.invoke({
+                "nation_id": nation_id,
+                "db": db
+            })
+            
+            # Obtener estado de todas las naciones
+            world_status = get_all_nations_status.invoke({"db": db, "game_id": state.get("game_id")})
+            
+            # Obtener relaciones diplomáticas
+            relations = get_relations_status.invoke({
+                "nation_id": nation_id,
+                "db": db
+            })
         
-        # Obtener contexto histórico desde RAG
-        situation_query = f"Situación de {state['nation_name']}: evaluando opciones estratégicas"
-        historical_context = self.rag.get_context_for_agent(
-            nation_id=nation_id,
-            current_situation=situation_query,
-            max_events=5
-        )
+        # Obtener contexto histórico desde RAG (precalculado en el snapshot si lo hay)
+        historical_context = snapshot.get_historical_context(nation_id) if snapshot is not None else None
+        if historical_context is None:
+            if self.rag is not None:
+                historical_context = self.rag.get_context_for_agent(
+                    nation_id=nation_id,
+                    current_situation=self._situation_query(state["nation_name"]),
+                    max_events=AGENT_CONTEXT_MAX_EVENTS,
+                    game_id=state.get("game_id")
+                )
+            else:
+                historical_context = "Memoria histórica desactivada."
         
         # Actualizar estado
         state["current_status"] = my_status
@@ -158,6 +336,44 @@ class AgentService:
         Returns:
             AgentState: Estado con decisión tomada
         """
+        messages = self._build_decision_messages(state)
+        
+        try:
+            response = self.llm_client.invoke(messages)
+            state["decision"] = self._parse_decision(response.content)
+            state["messages"] = messages + [response]
+            
+        except Exception as e:
+            print(f"❌ Error en decisión del agente: {e}")
+            # Acción por defecto en caso de error
+            state["decision"] = self._fallback_decision(f"Error: {str(e)}")
+        
+        return state
+    
+    
+    async def _athink_and_decide(self, state: AgentState) -> AgentState:
+        """
+        Paso 2 (ruta async): igual que _think_and_decide pero con ainvoke.
+        
+        Si la llamada agota su presupuesto (deadline, reintentos) se usa la
+        decisión de fallback en lugar de bloquear el turno.
+        """
+        messages = self._build_decision_messages(state)
+        
+        try:
+            response = await self.llm_client.ainvoke(messages)
+            state["decision"] = self._parse_decision(response.content)
+            state["messages"] = messages + [response]
+            
+        except Exception as e:
+            print(f"❌ Error en decisión del agente {state['nation_name']}: {e}")
+            state["decision"] = self._fallback_decision(f"Error: {str(e)}")
+        
+        return state
+    
+    
+    def _build_decision_messages(self, state: AgentState) -> List:
+        """Construir los mensajes (system + contexto) para el LLM"""
         # Construir prompt basado en personalidad
         system_prompt = self._get_personality_prompt(state["personality"])
         
@@ -214,45 +430,31 @@ Responde SOLO con un JSON en este formato:
 }}
 """
         
-        # Llamar al LLM
-        messages = [
+        return [
             SystemMessage(content=system_prompt),
             HumanMessage(content=context)
         ]
+    
+    
+    def _parse_decision(self, decision_text: str) -> Dict[str, Any]:
+        """Extraer el JSON de decisión del texto del LLM (puede venir con texto adicional)"""
+        json_start = decision_text.find('{')
+        json_end = decision_text.rfind('}') + 1
+        if json_start >= 0 and json_end > json_start:
+            return json.loads(decision_text[json_start:json_end])
         
-        try:
-            response = self.llm.invoke(messages)
-            decision_text = response.content
-            
-            # Parsear decisión (asumiendo formato JSON)
-            import json
-            # Extraer JSON del texto (puede venir con texto adicional)
-            json_start = decision_text.find('{')
-            json_end = decision_text.rfind('}') + 1
-            if json_start >= 0 and json_end > json_start:
-                decision_json = decision_text[json_start:json_end]
-                decision = json.loads(decision_json)
-            else:
-                # Si no hay JSON, acción por defecto
-                decision = {
-                    "action": "do_nothing",
-                    "params": {},
-                    "reasoning": "No se pudo determinar una acción clara"
-                }
-            
-            state["decision"] = decision
-            state["messages"] = messages + [response]
-            
-        except Exception as e:
-            print(f"❌ Error en decisión del agente: {e}")
-            # Acción por defecto en caso de error
-            state["decision"] = {
-                "action": "do_nothing",
-                "params": {},
-                "reasoning": f"Error: {str(e)}"
-            }
-        
-        return state
+        # Si no hay JSON, acción por defecto
+        return self._fallback_decision("No se pudo determinar una acción clara")
+    
+    
+    @staticmethod
+    def _fallback_decision(reasoning: str) -> Dict[str, Any]:
+        """Decisión segura cuando el LLM falla o no responde a tiempo"""
+        return {
+            "action": "do_nothing",
+            "params": {},
+            "reasoning": reasoning
+        }
     
     
     def _execute_action(self, state: AgentState, db: Session) -> AgentState:
@@ -287,7 +489,9 @@ Responde SOLO con un JSON en este formato:
         action_func = actions_map.get(action_name, do_nothing)
         
         try:
-            result = action_func.invoke(params)
+            # Si la acción falla a mitad, se deshacen solo sus cambios
+            with savepoint(db):
+                result = action_func.invoke(params)
             print(f"✅ {state['nation_name']}: {action_name} - {result.get('message', 'OK')}")
             state["decision"]["result"] = result
         except Exception as e:
@@ -372,9 +576,253 @@ Prioriza el desarrollo integral de tu nación."""
         return "\n".join(lines)
     
     
-    def process_ai_turn(self, db: Session, turn_number: int) -> List[Dict[str, Any]]:
+    def _initial_state(
+        self,
+        nation_id: int,
+        nation_name: str,
+        personality: str,
+        turn_number: int,
+        game_id: Optional[int] = None
+    ) -> AgentState:
+        """Construir el estado inicial de un agente para este turno"""
+        return {
+            "nation_id": nation_id,
+            "nation_name": nation_name,
+            "personality": personality,
+            "current_status": {},
+            "world_status": [],
+            "relations": [],
+            "historical_context": "",
+            "messages": [],
+            "decision": None,
+            "turn_number": turn_number,
+            "game_id": game_id,
+            "timings": {}
+        }
+    
+    
+    def _build_result(self, nation, final_state: AgentState) -> Dict[str, Any]:
+        """Extraer solo los datos serializables del estado final del agente"""
+        decision = final_state.get("decision") or {}
+        return {
+            "nation_id": nation.id,
+            "nation_name": nation.name,
+            "action": decision.get("action"),
+            "reasoning": decision.get("reasoning"),
+            "result": decision.get("result", {}),
+            "success": True
+        }
+    
+    
+    def _build_error_result(self, nation, error: Exception) -> Dict[str, Any]:
+        """Resultado de un agente que falló durante su procesamiento"""
+        print(f"❌ Error procesando {nation.name}: {error}")
+        return {
+            "nation_id": nation.id,
+            "nation_name": nation.name,
+            "error": str(error),
+            "success": False
+        }
+    
+    
+    def _decide_all(
+        self,
+        ai_nations: List,
+        turn_number: int,
+        snapshot: TurnSnapshot
+    ) -> List:
+        """
+        Fase de decisión (gather_info → think) de todos los agentes.
+        
+        No usa la sesión de BD: los agentes solo leen el snapshot del turno,
+        así que todos razonan sobre el mismo estado congelado del mundo y no
+        hay ninguna transacción abierta mientras se espera al LLM.
+        
+        Con AGENT_CONCURRENT_DECISIONS las naciones deciden en paralelo,
+        acotado por AGENT_MAX_CONCURRENCY (ruta async con deadlines si
+        AGENT_ASYNC_DECISIONS, si no un pool de hilos); si no, una tras otra.
+        
+        Returns:
+            list: (estado, error) por nación, en el orden de ai_nations
+        """
+        nation_snapshots = [
+            {"id": n.id, "name": n.name, "personality": n.personality, "game_id": n.game_id}
+            for n in ai_nations
+        ]
+        
+        if not settings.AGENT_CONCURRENT_DECISIONS:
+            print("🧠 Fase de decisión secuencial...")
+            decisions = []
+            for nation_data in nation_snapshots:
+                try:
+                    decisions.append((self._decide_for_nation(nation_data, turn_number, snapshot), None))
+                except Exception as e:
+                    decisions.append((None, e))
+            return decisions
+        
+        max_workers = max(1, min(settings.AGENT_MAX_CONCURRENCY, len(ai_nations)))
+        if settings.AGENT_ASYNC_DECISIONS and not self._event_loop_running():
+            print(f"🧠 Fase de decisión async (máx. {max_workers} concurrentes)...")
+            return self._run_on_event_loop(
+                self._adecide_all(nation_snapshots, turn_number, snapshot, max_workers)
+            )
+        print(f"🧠 Fase de decisión concurrente ({max_workers} workers)...")
+        return self._decide_all_in_threads(nation_snapshots, turn_number, snapshot, max_workers)
+    
+    
+    def _apply_decisions(
+        self,
+        db: Session,
+        ai_nations: List,
+        decisions: List,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fase de acción (act): secuencial y en el orden de ai_nations, sobre la
+        sesión principal, para que el resultado sea determinista.
+        """
+        print("⚙️ Aplicando acciones en orden...")
+        results = []
+        for nation, (state, error) in zip(ai_nations, decisions):
+            print(f"\n--- {nation.name} ({nation.personality}) ---")
+            if error is not None:
+                results.append(self._build_error_result(nation, error))
+                self._notify(progress_callback, "agent_completed", results[-1])
+                continue
+            
+            try:
+                start = time.perf_counter()
+                final_state = self._execute_action(state, db)
+                self._end_step(final_state, "act", start)
+                self.last_agent_timings[nation.name] = dict(final_state.get("timings") or {})
+                results.append(self._build_result(nation, final_state))
+            except Exception as e:
+                results.append(self._build_error_result(nation, e))
+            self._notify(progress_callback, "agent_completed", results[-1])
+        
+        return results
+    
+    
+    def _decide_all_in_threads(
+        self,
+        nation_snapshots: List[Dict[str, Any]],
+        turn_number: int,
+        snapshot: TurnSnapshot,
+        max_workers: int
+    ) -> List:
+        """Fase de decisión en un pool de hilos. Devuelve (estado, error) en el orden original"""
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-decision") as pool:
+            futures = [
+                pool.submit(self._decide_for_nation, nation_data, turn_number, snapshot)
+                for nation_data in nation_snapshots
+            ]
+            # Recoger en el orden original (no en orden de finalización)
+            decisions = []
+            for future in futures:
+                try:
+                    decisions.append((future.result(), None))
+                except Exception as e:
+                    decisions.append((None, e))
+        return decisions
+    
+    
+    async def _adecide_all(
+        self,
+        nation_snapshots: List[Dict[str, Any]],
+        turn_number: int,
+        snapshot: TurnSnapshot,
+        max_concurrency: int
+    ) -> List:
+        """Fase de decisión async. Devuelve (estado, error) en el orden original"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def decide(nation_data: Dict[str, Any]):
+            async with semaphore:
+                return await self._adecide_for_nation(nation_data, turn_number, snapshot)
+        
+        outcomes = await asyncio.gather(
+            *(decide(nation_data) for nation_data in nation_snapshots),
+            return_exceptions=True
+        )
+        return [
+            (None, outcome) if isinstance(outcome, Exception) else (outcome, None)
+            for outcome in outcomes
+        ]
+    
+    
+    async def _adecide_for_nation(
+        self,
+        nation_data: Dict[str, Any],
+        turn_number: int,
+        snapshot: TurnSnapshot
+    ) -> AgentState:
+        """Ejecutar gather_info → think para una nación en la ruta async"""
+        if not snapshot.has_nation(nation_data["id"]):
+            raise ValueError(f"Nación {nation_data['id']} no encontrada")
+        
+        initial_state = self._initial_state(
+            nation_data["id"], nation_data["name"], nation_data["personality"], turn_number,
+            nation_data.get("game_id")
+        )
+        return await self.async_decision_graph.ainvoke(
+            initial_state, config=self._agent_config(None, snapshot)
+        )
+    
+    
+    def _run_on_event_loop(self, coroutine):
+        """
+        Ejecutar una corrutina en el event loop del servicio y esperar su resultado.
+        
+        Con asyncio.run cada turno crearía y cerraría un loop, y las conexiones
+        que el cliente async del LLM mantiene abiertas fallarían a partir del
+        segundo turno ("Event loop is closed"). El loop vive en un hilo daemon
+        que se arranca en el primer uso.
         """
-        Procesar el turno de todas las naciones IA.
+        with self._event_loop_lock:
+            if self._event_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="agent-event-loop", daemon=True).start()
+                self._event_loop = loop
+            loop = self._event_loop
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+    
+    
+    @staticmethod
+    def _event_loop_running() -> bool:
+        """No bloquear un event loop activo en este hilo esperando al del servicio"""
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
+    
+    
+    def _decide_for_nation(
+        self,
+        nation_data: Dict[str, Any],
+        turn_number: int,
+        snapshot: TurnSnapshot
+    ) -> AgentState:
+        """Ejecutar gather_info → think para una nación en un worker"""
+        if not snapshot.has_nation(nation_data["id"]):
+            raise ValueError(f"Nación {nation_data['id']} no encontrada")
+        
+        initial_state = self._initial_state(
+            nation_data["id"], nation_data["name"], nation_data["personality"], turn_number,
+            nation_data.get("game_id")
+        )
+        return self.decision_graph.invoke(initial_state, config=self._agent_config(None, snapshot))
+    
+    
+    def process_ai_turn(
+        self,
+        db: Session,
+        turn_number: int,
+        progress_callback: Optional[ProgressCallback] = None,
+        game_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Procesar el turno de todas las naciones IA de una partida.
         
         Flujo completo de turno:
         1. Generar ingresos económicos para todas las naciones
@@ -383,92 +831,120 @@ Prioriza el desarrollo integral de tu nación."""
         4. Verificar condiciones de victoria
         5. Crear siguiente turno
         
+        Transacciones: la economía se confirma sola; la decisión de los
+        agentes (la espera al LLM) no tiene ninguna transacción de escritura
+        abierta, para no bloquear las filas de las naciones frente a las
+        acciones del jugador; acciones, batallas, victoria, compactación y
+        siguiente turno van en una única transacción atómica.
+        
         Args:
             db: Sesión de base de datos
             turn_number: Número del turno actual
+            progress_callback: Callback opcional que recibe el progreso por fase y por agente
+            game_id: Partida cuyo turno se procesa (None = todas, una sola partida por BD)
             
         Returns:
             list: Lista con las decisiones y resultados de cada agente
         """
         from .turn_service import TurnService
-        from .game_service import GameService
         from .economy_service import EconomyService
-        from .battle_service import BattleService
-        from .victory_service import VictoryService
         
-        current_turn = TurnService.get_current(db)
-        turn_id = current_turn.id if current_turn else 1
+        turn_start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        self.last_turn_timings = timings
+        self.last_agent_timings = {}
+        self.last_victory_check = None
         
-        # ========== FASE 1: ECONOMÍA ==========
+        # ========== FASE 1: ECONOMÍA (transacción propia) ==========
         print(f"\n💰 Generando ingresos del turno {turn_number}...")
-        economy_results = EconomyService.process_turn_income(db, turn_id)
+        phase_start = self._start_phase("economy", progress_callback)
+        with unit_of_work(db):
+            current_turn = TurnService.get_current(db, game_id)
+            turn_id = current_turn.id if current_turn else 1
+            economy_results = EconomyService.process_turn_income(db, turn_id, game_id)
+        self._end_phase(timings, "economy", phase_start, progress_callback)
         
         total_income = sum(r['income'] for r in economy_results)
         total_maintenance = sum(r['maintenance'] for r in economy_results)
         print(f"✅ Ingreso total: {total_income} oro | Mantenimiento: {total_maintenance} oro")
         
-        # ========== FASE 2: AGENTES IA ==========
+        # ========== FASE 2a: DECISIÓN DE LOS AGENTES (sin transacción) ==========
+        phase_start = self._start_phase("agents", progress_callback)
         # Obtener todas las naciones controladas por IA
-        all_nations = NationService.get_all(db)
+        all_nations = NationService.get_all(db, game_id=game_id)
         ai_nations = [n for n in all_nations if n.ai_controlled and n.is_active]
         
         if not ai_nations:
+            self._end_phase(timings, "agents", phase_start, progress_callback)
             return []
         
         print(f"\n🤖 Procesando turn {turn_number} para {len(ai_nations)} agentes IA...")
+        self._notify(progress_callback, "agents_planned", {
+            "total": len(ai_nations),
+            "nations": [n.name for n in ai_nations]
+        })
         
-        results = []
+        # Snapshot del mundo compartido por todos los agentes (una lectura por tabla)
+        snapshot = TurnSnapshot.build(db, turn_number, game_id=game_id)
+        # Cerrar la transacción de lectura antes de esperar al LLM
+        db.commit()
+        self._precompute_historical_contexts(snapshot, ai_nations)
         
-        # Procesar cada agente secuencialmente
-        for nation in ai_nations:
-            print(f"\n--- {nation.name} ({nation.personality}) ---")
-            
-            # Crear agente
-            agent_graph = self.create_agent_for_nation(nation.id, db)
-            
-            # Estado inicial
-            initial_state: AgentState = {
-                "nation_id": nation.id,
-                "nation_name": nation.name,
-                "personality": nation.personality,
-                "current_status": {},
-                "world_status": [],
-                "relations": [],
-                "historical_context": "",
-                "messages": [],
-                "decision": None,
-                "turn_number": turn_number
-            }
-            
-            # Ejecutar agente
-            try:
-                final_state = agent_graph.invoke(initial_state)
-                
-                # Extraer solo los datos serializables
-                decision = final_state.get("decision", {})
-                results.append({
-                    "nation_id": nation.id,
-                    "nation_name": nation.name,
-                    "action": decision.get("action"),
-                    "reasoning": decision.get("reasoning"),
-                    "result": decision.get("result", {}),
-                    "success": True
-                })
-                
-            except Exception as e:
-                print(f"❌ Error procesando {nation.name}: {e}")
-                results.append({
-                    "nation_id": nation.id,
-                    "nation_name": nation.name,
-                    "error": str(e),
-                    "success": False
-                })
+        try:
+            decisions = self._decide_all(ai_nations, turn_number, snapshot)
+        finally:
+            # Tras la fase de decisión las acciones cambian la BD
+            snapshot.invalidate()
+        
+        # ========== FASES 2b-5: ACCIONES → SIGUIENTE TURNO (una transacción) ==========
+        # Si algo falla, el turno no queda a medias
+        with unit_of_work(db):
+            results = self._run_write_phases(
+                db, turn_number, ai_nations, decisions, phase_start, progress_callback, game_id
+            )
+            commit_start = time.perf_counter()
+        
+        self._end_phase(timings, "commit", commit_start)
+        self._end_phase(timings, "total", turn_start)
+        self.metrics.inc("nationmind_turns_processed_total")
+        
+        return results
+    
+    
+    def _run_write_phases(
+        self,
+        db: Session,
+        turn_number: int,
+        ai_nations: List,
+        decisions: List,
+        agents_phase_start: float,
+        progress_callback: Optional[ProgressCallback] = None,
+        game_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Acciones de los agentes y fases 3-5 de process_ai_turn (se ejecuta dentro de unit_of_work)"""
+        from .turn_service import TurnService
+        from .game_service import GameService
+        from .battle_service import BattleService
+        from .victory_service import VictoryService
+        
+        timings = self.last_turn_timings
+        
+        # ========== FASE 2b: ACCIONES DE LOS AGENTES ==========
+        results = self._apply_decisions(db, ai_nations, decisions, progress_callback)
+        self._end_phase(timings, "agents", agents_phase_start, progress_callback)
         
         print(f"\n✅ Turno {turn_number} completado: {len(results)} agentes procesados")
         
         # ========== FASE 3: BATALLAS ==========
         print(f"\n⚔️ Resolviendo batallas activas...")
-        battles_resolved = BattleService.resolve_active_wars(db, turn_number)
+        phase_start = self._start_phase("battles", progress_callback)
+        battles_resolved = BattleService.resolve_active_wars(
+            db,
+            turn_number,
+            on_battle=lambda battle: self._notify(progress_callback, "battle_resolved", battle),
+            game_id=game_id
+        )
+        self._end_phase(timings, "battles", phase_start, progress_callback)
         if battles_resolved:
             print(f"✅ {len(battles_resolved)} batallas resueltas")
             for battle in battles_resolved:
@@ -479,7 +955,18 @@ Prioriza el desarrollo integral de tu nación."""
             print("   ℹ️  No hay guerras activas")
         
         # ========== FASE 4: VERIFICAR VICTORIA ==========
-        victory_check = VictoryService.check_victory_conditions(db, turn_number)
+        phase_start = self._start_phase("victory", progress_callback)
+        victory_check = VictoryService.check_victory_conditions(db, turn_number, game_id)
+        self._end_phase(timings, "victory", phase_start, progress_callback)
+        self.last_victory_check = victory_check
+        winner = victory_check.get("winner")
+        self._notify(progress_callback, "victory_checked", {
+            "game_over": victory_check["game_over"],
+            "victory_type": victory_check.get("victory_type"),
+            "winner_id": winner.id if winner else None,
+            "winner_name": winner.name if winner else None,
+            "details": victory_check.get("details")
+        })
         if victory_check["game_over"]:
             winner = victory_check.get("winner")
             victory_type = victory_check.get("victory_type")
@@ -487,12 +974,27 @@ Prioriza el desarrollo integral de tu nación."""
             if winner:
                 print(f"   👑 Ganador: {winner.name}")
                 print(f"   📝 {victory_check['details']}")
+            if game_id is not None:
+                GameService.finish_game(db, game_id)
+        
+        # ========== COMPACTACIÓN DE LA MEMORIA (cada K turnos) ==========
+        if RAGCompactionService.is_due(turn_number):
+            phase_start = self._start_phase("compaction", progress_callback)
+            try:
+                with savepoint(db):
+                    RAGCompactionService.compact(db, turn_number, game_id)
+            except Exception as e:
+                print(f"⚠️ Error compactando la memoria RAG: {e}")
+            self._end_phase(timings, "compaction", phase_start, progress_callback)
+        else:
+            self._notify(progress_callback, "phase_skipped", {"phase": "compaction"})
         
         # ========== FASE 5: CREAR SIGUIENTE TURNO ==========
         print(f"\n📅 Creando turno {turn_number + 1}...")
+        phase_start = self._start_phase("next_turn", progress_callback)
         try:
             # Obtener estado del mundo actualizado
-            world_state = GameService.get_game_state(db)
+            world_state = GameService.get_game_state(db, game_id)
             
             # Crear resumen del turno
             actions_summary = []
@@ -505,18 +1007,78 @@ Prioriza el desarrollo integral de tu nación."""
                 summary += f" y {len(actions_summary) - 5} acciones más."
             
             # Crear siguiente turno
-            TurnService.create_next_turn(
-                db,
-                world_state=world_state,
-                summary=summary
-            )
+            with savepoint(db):
+                TurnService.create_next_turn(
+                    db,
+                    world_state=world_state,
+                    summary=summary,
+                    game_id=game_id
+                )
             print(f"✅ Turno {turn_number + 1} creado exitosamente")
             
         except Exception as e:
             print(f"❌ Error creando siguiente turno: {e}")
+        self._end_phase(timings, "next_turn", phase_start, progress_callback)
         
         return results
 
+    
+    
+    def process_current_turn(
+        self,
+        db: Session,
+        include_timings: bool = False,
+        progress_callback: Optional[ProgressCallback] = None,
+        game_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Procesar el turno activo de una partida y construir la respuesta de la API.
+        
+        Args:
+            db: Sesión de base de datos
+            include_timings: Añadir el bloque `timings` (ms por fase y por agente)
+            progress_callback: Callback opcional de progreso
+            game_id: Partida a procesar (None = la partida activa más reciente)
+            
+        Returns:
+            dict: Resumen del turno con los resultados de cada agente
+            
+        Raises:
+            ValueError: Si no hay turno activo
+        """
+        from .turn_service import TurnService
+        from .game_service import GameService
+        
+        if game_id is None:
+            game = GameService.resolve_game(db)
+            game_id = game.id if game else None
+        
+        current_turn = TurnService.get_current(db, game_id)
+        if not current_turn:
+            raise ValueError("No hay turno activo. Inicializa el juego primero.")
+        
+        previous_turn_number = current_turn.turn_number
+        results = self.process_ai_turn(db, previous_turn_number, progress_callback, game_id)
+        
+        # Obtener el nuevo turno creado
+        new_turn = TurnService.get_current(db, game_id)
+        successes = sum(1 for r in results if r.get("success", False))
+        
+        response = {
+            "message": "Turno procesado exitosamente",
+            "game_id": game_id,
+            "previous_turn": previous_turn_number,
+            "current_turn": new_turn.turn_number if new_turn else previous_turn_number,
+            "total_agents": len(results),
+            "successful_actions": successes,
+            "failed_actions": len(results) - successes,
+            "agents_results": results
+        }
+        if include_timings:
+            response["timings"] = self.get_last_turn_timings()
+        
+        return response
+
 
 # ==================== INSTANCIA GLOBAL ====================
 
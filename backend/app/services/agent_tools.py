@@ -14,6 +14,12 @@ from ..schemas.event_schema import EventCreate
 from ..schemas.relation_schema import RelationUpdate
 
 
+def _current_turn(db: Session, nation_id: int):
+    """Turno actual de la partida de la nación"""
+    nation = NationService.get_by_id(db, nation_id)
+    return TurnService.get_current(db, nation.game_id if nation else None)
+
+
 # ==================== HERRAMIENTAS DE CONSULTA ====================
 
 @tool
@@ -46,17 +52,18 @@ def get_my_nation_status(nation_id: int, db: Session) -> Dict[str, Any]:
 
 
 @tool
-def get_all_nations_status(db: Session) -> List[Dict[str, Any]]:
+def get_all_nations_status(db: Session, game_id: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Obtener el estado de todas las naciones activas.
     
     Args:
         db: Sesión de base de datos
+        game_id: Partida de las naciones (None = todas)
         
     Returns:
         list: Lista con información de todas las naciones
     """
-    nations = NationService.get_all(db)
+    nations = NationService.get_all(db, game_id=game_id)
     return [
         {
             "id": n.id,
@@ -149,7 +156,7 @@ def propose_alliance(
         target_nation = NationService.get_by_id(db, target_nation_id)
         
         # Obtener turno actual
-        current_turn = TurnService.get_current(db)
+        current_turn = _current_turn(db, nation_id)
         current_turn_id = current_turn.id if current_turn else 1
         
         event_data = EventCreate(
@@ -225,8 +232,7 @@ def declare_war(
         RelationService.update(db, relation.id, update_data)
         
         # Obtener turno actual
-        from .turn_service import TurnService
-        current_turn = TurnService.get_current(db)
+        current_turn = _current_turn(db, nation_id)
         current_turn_id = current_turn.id if current_turn else 1
         current_turn_number = current_turn.turn_number if current_turn else 1
         
@@ -321,7 +327,7 @@ def invest_in_military(
         })
         
         # Crear evento
-        current_turn = TurnService.get_current(db)
+        current_turn = _current_turn(db, nation_id)
         current_turn_id = current_turn.id if current_turn else 1
         
         event_data = EventCreate(
@@ -387,7 +393,7 @@ def invest_in_economy(
         })
         
         # Crear evento
-        current_turn = TurnService.get_current(db)
+        current_turn = _current_turn(db, nation_id)
         current_turn_id = current_turn.id if current_turn else 1
         
         event_data = EventCreate(
@@ -437,7 +443,7 @@ def do_nothing(nation_id: int, db: Session) -> Dict[str, Any]:
         "troops": new_troops
     })
     
-    current_turn = TurnService.get_current(db)
+    current_turn = _current_turn(db, nation_id)
     current_turn_id = current_turn.id if current_turn else 1
     
     event_data = EventCreate(
@@ -534,7 +540,7 @@ def propose_trade_agreement(
             RelationService.update(db, relation.id, RelationUpdate(relationship_score=new_score))
         
         # Crear evento
-        current_turn = TurnService.get_current(db)
+        current_turn = _current_turn(db, nation_id)
         current_turn_id = current_turn.id if current_turn else 1
         
         event_data = EventCreate(
@@ -617,7 +623,7 @@ def request_peace_treaty(
         ))
         
         # Crear evento
-        current_turn = TurnService.get_current(db)
+        current_turn = _current_turn(db, nation_id)
         current_turn_id = current_turn.id if current_turn else 1
         
         event_data = EventCreate(
@@ -681,7 +687,7 @@ def organize_diplomatic_summit(
         })
         
         # Crear evento
-        current_turn = TurnService.get_current(db)
+        current_turn = _current_turn(db, nation_id)
         current_turn_id = current_turn.id if current_turn else 1
         
         event_data = EventCreate(
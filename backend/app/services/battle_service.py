@@ -3,11 +3,12 @@ Servicio de Batallas
 Gestiona el sistema de combate entre naciones, incluyendo aliados
 """
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 import random
 import math
 
 from ..models.battle import Battle
+from ..models.database import commit_or_flush, savepoint
 from ..models.nation import Nation
 from ..models.relation import Relation
 from ..schemas.battle_schema import BattleCreate, BattleSimulation
@@ -170,6 +171,9 @@ class BattleService:
         if not attacker or not defender:
             raise ValueError("Nación atacante o defensora no encontrada")
         
+        if attacker.game_id != defender.game_id:
+            raise ValueError("Las naciones pertenecen a partidas distintas")
+        
         if attacker.troops < 50:
             raise ValueError(f"{attacker.name} no tiene suficientes tropas para atacar (mínimo 50)")
         
@@ -225,6 +229,7 @@ class BattleService:
         
         # Crear registro de batalla
         battle = Battle(
+            game_id=attacker.game_id,
             turn_number=turn_number,
             attacker_id=attacker_id,
             defender_id=defender_id,
@@ -264,8 +269,7 @@ class BattleService:
         # Generar evento
         BattleService._create_battle_event(db, battle, attacker, defender)
         
-        db.commit()
-        db.refresh(battle)
+        commit_or_flush(db, battle)
         
         return battle
     
@@ -285,23 +289,27 @@ class BattleService:
         winner = attacker if winner_id == attacker.id else defender
         loser = defender if winner_id == attacker.id else attacker
         
-        # Actualizar tropas
-        NationService.update(db, attacker.id, {"troops": max(10, attacker.troops - attacker_casualties)})
-        NationService.update(db, defender.id, {"troops": max(10, defender.troops - defender_casualties)})
+        # Acumular los cambios por nación y aplicarlos con un único update cada una
+        changes = {
+            attacker.id: {"troops": max(10, attacker.troops - attacker_casualties)},
+            defender.id: {"troops": max(10, defender.troops - defender_casualties)},
+        }
         
         # Transferir territorios
         if territories_conquered > 0:
-            NationService.update(db, winner.id, {"territories": winner.territories + territories_conquered})
-            NationService.update(db, loser.id, {"territories": max(1, loser.territories - territories_conquered)})
+            changes[winner.id]["territories"] = winner.territories + territories_conquered
+            changes[loser.id]["territories"] = max(1, loser.territories - territories_conquered)
         
         # Transferir oro
         if gold_looted > 0:
-            NationService.update(db, winner.id, {"gold": winner.gold + gold_looted})
-            NationService.update(db, loser.id, {"gold": max(50, loser.gold - gold_looted)})
+            changes[winner.id]["gold"] = winner.gold + gold_looted
+            changes[loser.id]["gold"] = max(50, loser.gold - gold_looted)
         
         # Reducir poder militar del perdedor
-        new_military_power = max(30, loser.military_power - random.uniform(5, 15))
-        NationService.update(db, loser.id, {"military_power": new_military_power})
+        changes[loser.id]["military_power"] = max(30, loser.military_power - random.uniform(5, 15))
+        
+        for nation_id, nation_changes in changes.items():
+            NationService.update(db, nation_id, nation_changes)
     
     
     @staticmethod
@@ -338,7 +346,7 @@ class BattleService:
         winner_name = attacker.name if battle.winner_id == attacker.id else defender.name
         
         # Obtener el turn_id real desde la base de datos
-        current_turn = TurnService.get_by_number(db, battle.turn_number)
+        current_turn = TurnService.get_by_number(db, battle.turn_number, battle.game_id)
         turn_id = current_turn.id if current_turn else 1
         
         event_data = EventCreate(
@@ -375,7 +383,7 @@ class BattleService:
         attacker = NationService.get_by_id(db, attacker_id)
         defender = NationService.get_by_id(db, defender_id)
         
-        if not attacker or not defender:
+        if not attacker or not defender or attacker.game_id != defender.game_id:
             raise ValueError("Nación no encontrada")
         
         # Obtener aliados
@@ -429,9 +437,9 @@ class BattleService:
     
     
     @staticmethod
-    def get_active_wars(db: Session) -> List[Dict[str, Any]]:
+    def get_active_wars(db: Session, game_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """Obtener todas las guerras activas (relaciones en estado war)"""
-        wars = db.query(Relation).filter(Relation.status == "war").all()
+        wars = BattleService._wars_query(db, game_id).all()
         
         result = []
         for war in wars:
@@ -450,9 +458,12 @@ class BattleService:
     
     
     @staticmethod
-    def get_battle_history(db: Session, limit: int = 20) -> List[Battle]:
+    def get_battle_history(db: Session, limit: int = 20, game_id: Optional[int] = None) -> List[Battle]:
         """Obtener historial de batallas"""
-        return db.query(Battle).order_by(Battle.created_at.desc()).limit(limit).all()
+        query = db.query(Battle)
+        if game_id is not None:
+            query = query.filter(Battle.game_id == game_id)
+        return query.order_by(Battle.created_at.desc()).limit(limit).all()
     
     
     @staticmethod
@@ -464,7 +475,12 @@ class BattleService:
     
     
     @staticmethod
-    def resolve_active_wars(db: Session, turn_number: int) -> List[Dict[str, Any]]:
+    def resolve_active_wars(
+        db: Session,
+        turn_number: int,
+        on_battle: Optional[Callable[[Dict[str, Any]], None]] = None,
+        game_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         Resolver automáticamente todas las guerras activas del turno.
         
@@ -474,14 +490,16 @@ class BattleService:
         Args:
             db: Sesión de base de datos
             turn_number: Número del turno actual
+            on_battle: Callback opcional llamado con cada batalla en cuanto se resuelve
+            game_id: Partida cuyas guerras se resuelven (None = todas)
             
         Returns:
             Lista de resultados de batallas con ganadores y efectos
         """
         from .nation_service import NationService
         
-        # Obtener todas las guerras activas
-        wars = db.query(Relation).filter(Relation.status == "war").all()
+        # Obtener todas las guerras activas de la partida
+        wars = BattleService._wars_query(db, game_id).all()
         
         if not wars:
             return []
@@ -511,46 +529,62 @@ class BattleService:
             
             # Resolver batalla usando el sistema existente
             try:
-                battle = BattleService.resolve_battle(
-                    db=db,
-                    attacker_id=attacker.id,
-                    defender_id=defender.id,
-                    turn_number=turn_number
-                )
+                with savepoint(db):
+                    battle = BattleService.resolve_battle(
+                        db=db,
+                        attacker_id=attacker.id,
+                        defender_id=defender.id,
+                        turn_number=turn_number
+                    )
                 
-                # Extraer datos del resultado
-                winner_id = battle.winner_id
-                winner = NationService.get_by_id(db, winner_id) if winner_id else None
-                loser = defender if winner_id == attacker.id else attacker
+                    # Extraer datos del resultado
+                    winner_id = battle.winner_id
+                    winner = NationService.get_by_id(db, winner_id) if winner_id else None
+                    loser = defender if winner_id == attacker.id else attacker
                 
-                territories_gained = battle.territories_captured
-                gold_plundered = battle.gold_plundered
+                    territories_gained = battle.territories_conquered
+                    gold_plundered = battle.gold_looted
                 
-                battles_resolved.append({
-                    "attacker_id": attacker.id,
-                    "attacker_name": attacker.name,
-                    "defender_id": defender.id,
-                    "defender_name": defender.name,
-                    "winner_id": winner_id,
-                    "winner_name": winner.name if winner else "Empate",
-                    "loser_name": loser.name if loser else "N/A",
-                    "territories_gained": territories_gained,
-                    "gold_plundered": gold_plundered,
-                    "attacker_casualties": battle.attacker_casualties,
-                    "defender_casualties": battle.defender_casualties
-                })
+                    battle_result = {
+                        "attacker_id": attacker.id,
+                        "attacker_name": attacker.name,
+                        "defender_id": defender.id,
+                        "defender_name": defender.name,
+                        "winner_id": winner_id,
+                        "winner_name": winner.name if winner else "Empate",
+                        "loser_name": loser.name if loser else "N/A",
+                        "territories_gained": territories_gained,
+                        "gold_plundered": gold_plundered,
+                        "attacker_casualties": battle.attacker_casualties,
+                        "defender_casualties": battle.defender_casualties,
+                        "loser_eliminated": False
+                    }
                 
-                print(f"      👑 Ganador: {winner.name if winner else 'Empate'}")
-                print(f"      💀 Bajas: {battle.attacker_casualties} (atacante), {battle.defender_casualties} (defensor)")
+                    print(f"      👑 Ganador: {winner.name if winner else 'Empate'}")
+                    print(f"      💀 Bajas: {battle.attacker_casualties} (atacante), {battle.defender_casualties} (defensor)")
                 
-                # Si el perdedor se quedó sin territorios, eliminarlo
-                if loser and loser.territories <= 0:
-                    loser.is_active = False
-                    db.commit()
-                    print(f"      ☠️  {loser.name} ha sido eliminado del juego")
+                    # Si el perdedor se quedó sin territorios, eliminarlo
+                    if loser and loser.territories <= 0:
+                        loser.is_active = False
+                        commit_or_flush(db)
+                        battle_result["loser_eliminated"] = True
+                        print(f"      ☠️  {loser.name} ha sido eliminado del juego")
+                
+                battles_resolved.append(battle_result)
+                if on_battle is not None:
+                    on_battle(battle_result)
                     
             except Exception as e:
                 print(f"      ❌ Error resolviendo batalla: {e}")
                 continue
         
         return battles_resolved
+    
+    
+    @staticmethod
+    def _wars_query(db: Session, game_id: Optional[int] = None):
+        """Relaciones en guerra (de una partida si se indica game_id)"""
+        query = db.query(Relation).filter(Relation.status == "war")
+        if game_id is not None:
+            query = query.filter(Relation.game_id == game_id)
+        return query
@@ -3,7 +3,7 @@ Servicio de Economía
 Gestiona generación de ingresos, costos y balance económico
 """
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import random
 
 from ..models.nation import Nation
@@ -74,14 +74,14 @@ class EconomyService:
     
     
     @staticmethod
-    def process_turn_income(db: Session, turn_id: int) -> List[Dict[str, Any]]:
+    def process_turn_income(db: Session, turn_id: int, game_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        Procesar ingresos y gastos de todas las naciones activas.
+        Procesar ingresos y gastos de todas las naciones activas de la partida.
         
         Returns:
             Lista de resultados con gold_gained, gold_spent, net_change por nación
         """
-        nations = NationService.get_all(db)
+        nations = NationService.get_all(db, game_id=game_id)
         results = []
         
         for nation in nations:
@@ -141,14 +141,14 @@ class EconomyService:
     
     
     @staticmethod
-    def get_economic_rank(db: Session) -> List[Dict[str, Any]]:
+    def get_economic_rank(db: Session, game_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        Obtener ranking económico de todas las naciones.
+        Obtener ranking económico de todas las naciones de la partida.
         
         Returns:
             Lista ordenada por riqueza total (gold + economic_power)
         """
-        nations = NationService.get_all(db)
+        nations = NationService.get_all(db, game_id=game_id)
         
         rankings = []
         for nation in nations:
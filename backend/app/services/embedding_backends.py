@@ -0,0 +1,144 @@
+"""
+Backends de embeddings intercambiables
+torch (sentence-transformers), ONNX Runtime y ONNX cuantizado int8, todos
+con la misma interfaz que SentenceTransformer.encode
+"""
+from typing import Any, List, Optional, Protocol, Union
+
+import numpy as np
+
+from ..config import settings
+
+
+SUPPORTED_EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Ficheros ONNX publicados en el repo de Hugging Face de sentence-transformers
+ONNX_MODEL_FILES = {
+    "onnx": "onnx/model.onnx",
+    # Cuantización dinámica int8 (pesos uint8, activaciones en AVX2; la más compatible en x86)
+    "onnx-int8": "onnx/model_quint8_avx2.onnx",
+}
+
+DEFAULT_MAX_SEQ_LENGTH = 256
+
+
+class Encoder(Protocol):
+    """Interfaz común de los modelos de embeddings (la de SentenceTransformer)"""
+
+    def encode(self, texts: Union[str, List[str]], **kwargs: Any) -> np.ndarray: ...
+
+    def get_sentence_embedding_dimension(self) -> int: ...
+
+
+class OnnxEncoder:
+    """
+    Encoder de sentence-transformers sobre ONNX Runtime, sin torch.
+
+    Reproduce el pipeline de all-MiniLM-L6-v2: tokenizer → transformer →
+    mean pooling con la máscara de atención → normalización L2.
+    """
+
+    def __init__(self, repo_id: str, model_file: str, batch_size: int = 32, threads: int = 0):
+        import json
+        import onnxruntime
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+
+        try:
+            with open(hf_hub_download(repo_id, "sentence_bert_config.json")) as f:
+                max_seq_length = json.load(f).get("max_seq_length", DEFAULT_MAX_SEQ_LENGTH)
+        except Exception:
+            max_seq_length = DEFAULT_MAX_SEQ_LENGTH
+
+        self.tokenizer = Tokenizer.from_file(hf_hub_download(repo_id, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        pad_id = self.tokenizer.token_to_id("[PAD]") or 0
+        self.tokenizer.enable_padding(pad_id=pad_id, pad_token="[PAD]")
+
+        options = onnxruntime.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            hf_hub_download(repo_id, model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.batch_size = batch_size
+        self.dimension = self._encode_batch(["warmup"]).shape[1]
+
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling ignorando el padding
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+    def encode(self, texts: Union[str, List[str]], batch_size: Optional[int] = None, **kwargs: Any) -> np.ndarray:
+        single = isinstance(texts, str)
+        text_list = [texts] if single else list(texts)
+        if not text_list:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        # Agrupar textos de longitud parecida para minimizar el padding
+        order = sorted(range(len(text_list)), key=lambda i: len(text_list[i]), reverse=True)
+        size = batch_size or self.batch_size
+        result = np.empty((len(text_list), self.dimension), dtype=np.float32)
+        for start in range(0, len(order), size):
+            indices = order[start:start + size]
+            result[indices] = self._encode_batch([text_list[i] for i in indices])
+
+        return result[0] if single else result
+
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+
+def create_embedding_model(model_name: str, backend: Optional[str] = None) -> Encoder:
+    """
+    Crear el modelo de embeddings según EMBEDDING_BACKEND.
+
+    Args:
+        model_name: Modelo de sentence-transformers (p. ej. "all-MiniLM-L6-v2")
+        backend: "torch", "onnx" u "onnx-int8" (por defecto settings.EMBEDDING_BACKEND)
+
+    Raises:
+        ValueError: Si el backend no existe
+    """
+    backend = (backend or settings.EMBEDDING_BACKEND).strip().lower()
+    if backend not in SUPPORTED_EMBEDDING_BACKENDS:
+        raise ValueError(
+            f"EMBEDDING_BACKEND '{backend}' no soportado. Opciones: {', '.join(SUPPORTED_EMBEDDING_BACKENDS)}"
+        )
+
+    if backend == "torch":
+        # Import diferido: torch solo se carga si se usa este backend
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+
+    repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    model_file = settings.EMBEDDING_ONNX_FILE or ONNX_MODEL_FILES[backend]
+    print(f"⚙️ Embeddings con ONNX Runtime ({backend}): {repo_id}/{model_file}")
+    return OnnxEncoder(repo_id, model_file, threads=settings.EMBEDDING_THREADS)
+
+
+def embedding_cache_name(model_name: str, backend: str) -> str:
+    """
+    Nombre del modelo para la caché de embeddings.
+
+    Los vectores int8 no son idénticos a los de torch, así que cada backend
+    ONNX usa su propio espacio de claves (torch conserva el nombre a secas).
+    """
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
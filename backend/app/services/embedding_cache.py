@@ -0,0 +1,281 @@
+"""
+Caché de embeddings direccionada por contenido
+Evita recalcular el embedding de textos ya vistos (consultas repetidas cada
+turno, eventos con la misma descripción al reindexar)
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+from ..config import settings
+from .embedding_backends import Encoder
+
+
+DIGEST_SIZE = 32  # sha256
+
+
+def embedding_key(model_name: str, text: str) -> bytes:
+    """Clave de caché: sha256 del nombre del modelo + texto"""
+    return hashlib.sha256(f"{model_name}\n{text}".encode("utf-8")).digest()
+
+
+def content_hash(model_name: str, text: str) -> str:
+    """Hash del texto indexado + modelo; si cambia cualquiera, el vector está obsoleto"""
+    return embedding_key(model_name, text).hex()
+
+
+class _DiskTier:
+    """
+    Nivel persistente: matriz float32 memory-mapped + fichero de claves.
+
+    La fila i de <modelo>-<dim>.f32 corresponde a la clave i de
+    <modelo>-<dim>.keys (32 bytes por clave). Solo se añaden filas; cuando se
+    llena (max_rows) deja de crecer y el LRU en memoria sigue funcionando.
+
+    Varios procesos pueden compartir el directorio (workers de uvicorn, el
+    simulador junto a la API): cada append se hace con un flock exclusivo
+    sobre el fichero de claves y la fila de destino sale del tamaño de ese
+    fichero, no del recuento en memoria. Las claves añadidas por otros
+    procesos se leen al fallar una búsqueda.
+    """
+
+    def __init__(self, directory: str, model_name: str, dimension: int, max_rows: int):
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{re.sub(r'[^A-Za-z0-9_.-]', '_', model_name)}-{dimension}")
+        self.dimension = dimension
+        self.max_rows = max_rows
+        self.keys_path = base + ".keys"
+        vectors_path = base + ".f32"
+        size = max_rows * dimension * np.dtype(np.float32).itemsize
+        if os.path.exists(vectors_path) and os.path.getsize(vectors_path) != size:
+            # Cambió EMBEDDING_CACHE_DISK_ROWS: ajustar el fichero (se amplía como disperso)
+            os.truncate(vectors_path, size)
+        self.vectors = np.memmap(
+            vectors_path,
+            dtype=np.float32,
+            mode="r+" if os.path.exists(vectors_path) else "w+",
+            shape=(max_rows, dimension)
+        )
+        self.rows: Dict[bytes, int] = {}
+        # Claves del fichero ya leídas (incluidas las de otros procesos)
+        self._keys_loaded = 0
+        self._load_new_keys()
+
+    def _load_new_keys(self) -> None:
+        """Leer las claves añadidas al fichero desde la última lectura"""
+        try:
+            with open(self.keys_path, "rb") as f:
+                f.seek(self._keys_loaded * DIGEST_SIZE)
+                raw = f.read()
+        except FileNotFoundError:
+            return
+        # Una clave a medio escribir se ignora hasta que esté completa
+        for offset in range(len(raw) // DIGEST_SIZE):
+            row = self._keys_loaded + offset
+            if row < self.max_rows:
+                self.rows[raw[offset * DIGEST_SIZE:(offset + 1) * DIGEST_SIZE]] = row
+        self._keys_loaded += len(raw) // DIGEST_SIZE
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None:
+            self._load_new_keys()
+            row = self.rows.get(key)
+        return None if row is None else np.array(self.vectors[row])
+
+    def put_many(self, items: Sequence) -> None:
+        with open(self.keys_path, "ab") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                self._append_locked(f, items)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _append_locked(self, f, items: Sequence) -> None:
+        """Añadir filas con el fichero de claves bloqueado"""
+        self._load_new_keys()
+        keys_size = os.fstat(f.fileno()).st_size
+        if keys_size % DIGEST_SIZE:
+            # Resto de un append interrumpido: se descarta
+            os.ftruncate(f.fileno(), keys_size - keys_size % DIGEST_SIZE)
+        first_row = keys_size // DIGEST_SIZE
+
+        new_items = []
+        seen = set()
+        for key, vector in items:
+            if key not in self.rows and key not in seen:
+                seen.add(key)
+                new_items.append((key, vector))
+        new_items = new_items[:max(0, self.max_rows - first_row)]
+        if not new_items:
+            return
+
+        for offset, (_, vector) in enumerate(new_items):
+            self.vectors[first_row + offset] = vector
+        # Primero los vectores en disco, después las claves que apuntan a ellos
+        self.vectors.flush()
+        f.write(b"".join(key for key, _ in new_items))
+        f.flush()
+        for offset, (key, _) in enumerate(new_items):
+            self.rows[key] = first_row + offset
+        self._keys_loaded = first_row + len(new_items)
+
+
+class EmbeddingCache:
+    """
+    Caché LRU en memoria con nivel opcional en disco (memmap de NumPy).
+
+    Es compartida por todos los encoders: la clave incluye el nombre del
+    modelo, así que distintos modelos no colisionan. Thread-safe.
+    """
+
+    def __init__(self, max_entries: int = 10000, directory: str = "", disk_rows: int = 100000):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.disk_rows = disk_rows
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._disk: Dict[tuple, _DiskTier] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "disk_hits": 0}
+
+
+    def _disk_tier(self, model_name: str, dimension: int) -> Optional[_DiskTier]:
+        if not self.directory or self.disk_rows <= 0:
+            return None
+        tier = self._disk.get((model_name, dimension))
+        if tier is None:
+            tier = self._disk[(model_name, dimension)] = _DiskTier(
+                self.directory, model_name, dimension, self.disk_rows
+            )
+        return tier
+
+
+    def get_many(self, model_name: str, dimension: int, keys: List[bytes]) -> List[Optional[np.ndarray]]:
+        """Buscar vectores por clave (None = no está en caché)"""
+        found: List[Optional[np.ndarray]] = []
+        with self._lock:
+            disk = self._disk_tier(model_name, dimension)
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                elif disk is not None and (vector := disk.get(key)) is not None:
+                    self._remember(key, vector)
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                else:
+                    self._stats["misses"] += 1
+                found.append(vector)
+        return found
+
+
+    def put_many(self, model_name: str, dimension: int, items: Sequence) -> None:
+        """Guardar (clave, vector) en memoria y, si está activo, en disco"""
+        with self._lock:
+            for key, vector in items:
+                self._remember(key, vector)
+            disk = self._disk_tier(model_name, dimension)
+            if disk is not None:
+                disk.put_many(items)
+
+
+    def _remember(self, key: bytes, vector: np.ndarray) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["disk_entries"] = sum(len(tier.rows) for tier in self._disk.values())
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+class CachedEncoder:
+    """
+    Envoltorio de SentenceTransformer con la caché de embeddings.
+
+    encode() acepta un texto o una lista (como SentenceTransformer.encode) y
+    solo calcula en un único batch los textos que no están en caché.
+    """
+
+    def __init__(self, model: Encoder, model_name: str, cache: Optional[EmbeddingCache] = None):
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache or get_embedding_cache()
+        self.dimension = model.get_sentence_embedding_dimension()
+
+
+    def encode(self, texts: Union[str, List[str]], **kwargs: Any) -> np.ndarray:
+        single = isinstance(texts, str)
+        text_list = [texts] if single else list(texts)
+        if not text_list:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        keys = [embedding_key(self.model_name, text) for text in text_list]
+        vectors = self.cache.get_many(self.model_name, self.dimension, keys)
+
+        # Textos pendientes, sin duplicados (mismo texto → mismo embedding)
+        missing: Dict[bytes, str] = {}
+        for key, text, vector in zip(keys, text_list, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+
+        if missing:
+            computed = np.asarray(
+                self.model.encode(list(missing.values()), **kwargs), dtype=np.float32
+            )
+            new_items = [(key, vector.copy()) for key, vector in zip(missing.keys(), computed)]
+            self.cache.put_many(self.model_name, self.dimension, new_items)
+            by_key = dict(new_items)
+            vectors = [by_key[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+
+        result = np.stack(vectors).astype(np.float32, copy=False)
+        return result[0] if single else result
+
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+
+# ==================== INSTANCIA GLOBAL ====================
+
+_embedding_cache_instance = None
+_embedding_cache_lock = threading.Lock()
+
+def get_embedding_cache() -> EmbeddingCache:
+    """
+    Obtener instancia singleton de la caché de embeddings.
+
+    Returns:
+        EmbeddingCache: Instancia compartida
+    """
+    global _embedding_cache_instance
+    with _embedding_cache_lock:
+        if _embedding_cache_instance is None:
+            _embedding_cache_instance = EmbeddingCache(
+                max_entries=settings.EMBEDDING_CACHE_SIZE,
+                directory=settings.EMBEDDING_CACHE_DIR,
+                disk_rows=settings.EMBEDDING_CACHE_DISK_ROWS
+            )
+    return _embedding_cache_instance
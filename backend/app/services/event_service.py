@@ -4,16 +4,21 @@ Servicio para gestión de Eventos
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..models.event import Event
+from ..models.nation import Nation
+from ..models.turn import Turn
+from ..models.database import after_commit, commit_or_flush
 from ..schemas.event_schema import EventCreate
+from ..config import settings
+from .rag_indexer import detached_event_copy, get_rag_indexer
 
 
 class EventService:
     """Servicio para operaciones de eventos"""
     
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[Event]:
+    def get_all(db: Session, skip: int = 0, limit: int = 100, game_id: Optional[int] = None) -> List[Event]:
         """Obtener todos los eventos (ordenados por fecha)"""
-        return db.query(Event).order_by(Event.created_at.desc()).offset(skip).limit(limit).all()
+        return EventService._in_game(db.query(Event), game_id).order_by(Event.created_at.desc()).offset(skip).limit(limit).all()
     
     @staticmethod
     def get_by_id(db: Session, event_id: int) -> Optional[Event]:
@@ -33,9 +38,9 @@ class EventService:
         ).order_by(Event.created_at.desc()).limit(limit).all()
     
     @staticmethod
-    def get_by_type(db: Session, event_type: str, limit: int = 50) -> List[Event]:
+    def get_by_type(db: Session, event_type: str, limit: int = 50, game_id: Optional[int] = None) -> List[Event]:
         """Obtener eventos por tipo"""
-        return db.query(Event).filter(
+        return EventService._in_game(db.query(Event), game_id).filter(
             Event.event_type == event_type
         ).order_by(Event.created_at.desc()).limit(limit).all()
     
@@ -47,32 +52,67 @@ class EventService:
         Args:
             db: Sesión de base de datos
             event_data: Datos del evento
-            add_to_rag: Si True, añade el evento a ChromaDB para RAG
+            add_to_rag: Si True, encola el evento para indexarlo en la memoria RAG
         """
         event = Event(**event_data.model_dump())
+        if event.game_id is None and event.nation_id is not None:
+            # La partida del evento es la de la nación que lo protagoniza
+            nation = db.get(Nation, event.nation_id)
+            event.game_id = nation.game_id if nation else None
         db.add(event)
-        db.commit()
-        db.refresh(event)
+        commit_or_flush(db, event)
         
-        # Añadir a sistema RAG automáticamente
-        if add_to_rag:
-            try:
-                from .rag_service import get_rag_service
-                rag = get_rag_service()
-                rag.add_event(event)
-            except Exception as e:
-                print(f"⚠️ Warning: No se pudo añadir evento a RAG: {e}")
+        # Añadir a sistema RAG automáticamente (dentro de unit_of_work, solo
+        # cuando el turno se confirma: un evento deshecho no debe indexarse)
+        if add_to_rag and settings.RAG_ENABLED:
+            # Copia tomada ahora: tras el commit la instancia queda expirada
+            rag_event = detached_event_copy(event)
+            after_commit(db, lambda: EventService._add_to_rag(rag_event))
         
         return event
     
     @staticmethod
-    def get_recent_events(db: Session, limit: int = 20) -> List[Event]:
+    def attach_turn_numbers(db: Session, events: List[Event]) -> List[Event]:
+        """
+        Rellenar event.turn_number (turno dentro de la partida) con una sola
+        consulta, para la metadata del vector store y el ranking por recencia.
+        Se llama por lotes al indexar (indexador RAG, reindex y sync), nunca
+        por evento dentro del turno.
+        """
+        turn_ids = {event.turn_id for event in events if event.turn_id is not None}
+        if not turn_ids:
+            return events
+        numbers = dict(db.query(Turn.id, Turn.turn_number).filter(Turn.id.in_(turn_ids)).all())
+        for event in events:
+            event.turn_number = numbers.get(event.turn_id)
+        return events
+    
+    @staticmethod
+    def _add_to_rag(event: Event) -> None:
+        """Encolar un evento ya confirmado para indexarlo en la memoria RAG"""
+        try:
+            get_rag_indexer().enqueue(event)
+        except Exception as e:
+            print(f"⚠️ Warning: No se pudo añadir evento a RAG: {e}")
+    
+    @staticmethod
+    def get_recent_events(db: Session, limit: int = 20, game_id: Optional[int] = None) -> List[Event]:
         """Obtener los eventos más recientes"""
-        return db.query(Event).order_by(Event.created_at.desc()).limit(limit).all()
+        return EventService._in_game(db.query(Event), game_id).order_by(Event.created_at.desc()).limit(limit).all()
     
     @staticmethod
-    def get_important_events(db: Session, min_importance: int = 7, limit: int = 30) -> List[Event]:
+    def get_important_events(
+        db: Session,
+        min_importance: int = 7,
+        limit: int = 30,
+        game_id: Optional[int] = None
+    ) -> List[Event]:
         """Obtener eventos importantes (para el sistema RAG)"""
-        return db.query(Event).filter(
+        return EventService._in_game(db.query(Event), game_id).filter(
             Event.importance >= min_importance
         ).order_by(Event.importance.desc(), Event.created_at.desc()).limit(limit).all()
+    
+    @staticmethod
+    def _in_game(query, game_id: Optional[int]):
+        """Limitar la consulta a una partida (None = todas)"""
+        return query.filter(Event.game_id == game_id) if game_id is not None else query
@@ -8,7 +8,14 @@ from .nation_service import NationService
 from .turn_service import TurnService
 from .event_service import EventService
 from .relation_service import RelationService
+from ..config import settings
+from ..models.battle import Battle
+from ..models.event import Event
+from ..models.game import Game
+from ..models.nation import Nation
 from ..models.relation import Relation
+from ..models.turn import Turn
+from ..models.database import after_commit, commit_or_flush, unit_of_work
 from ..schemas.nation_schema import NationCreate
 from ..schemas.event_schema import EventCreate
 from ..schemas.relation_schema import RelationCreate
@@ -129,18 +136,28 @@ class GameService:
         ]
     
     @staticmethod
-    def initialize_game(db: Session, player_nation_code: str = "ESP") -> Dict[str, Any]:
+    def initialize_game(db: Session, player_nation_code: str = "ESP", name: Optional[str] = None) -> Dict[str, Any]:
         """
-        Inicializar un nuevo juego con naciones predefinidas
+        Inicializar una nueva partida con naciones predefinidas
+        
+        Cada llamada crea una partida independiente (Game); las anteriores
+        siguen en la base de datos y se pueden jugar a la vez.
         
         Args:
             db: Sesión de base de datos
             player_nation_code: Código de la nación que controlará el jugador (default: ESP)
+            name: Nombre opcional de la partida
         
         Returns:
-            Información del juego inicializado
+            Información de la partida inicializada (incluye game_id)
         """
-        
+        # Partida, naciones, turno inicial y relaciones en una sola transacción
+        with unit_of_work(db):
+            return GameService._create_game(db, player_nation_code, name)
+    
+    @staticmethod
+    def _create_game(db: Session, player_nation_code: str, name: Optional[str] = None) -> Dict[str, Any]:
+        """Crear partida, naciones, turno inicial y relaciones (llamar dentro de unit_of_work)"""
         print(f"🔧 GameService.initialize_game llamado con: {player_nation_code}")
         
         # Validar que la nación seleccionada existe
@@ -151,6 +168,11 @@ class GameService:
         
         print(f"✅ Nación válida: {AVAILABLE_NATIONS[player_nation_code]['name']}")
         
+        game = Game(name=name)
+        db.add(game)
+        commit_or_flush(db, game)
+        print(f"🎲 Partida {game.id} creada")
+        
         # Crear todas las naciones
         created_nations = []
         print(f"🏗️  Creando {len(AVAILABLE_NATIONS)} naciones...")
@@ -167,7 +189,8 @@ class GameService:
                 military_power=nation_data["military_power"],
                 economic_power=nation_data["economic_power"],
                 diplomatic_influence=nation_data["diplomatic_influence"],
-                ai_controlled=(code != player_nation_code)  # Solo la elegida es del jugador
+                ai_controlled=(code != player_nation_code),  # Solo la elegida es del jugador
+                game_id=game.id
             )
             nation = NationService.create(db, nation_create)
             created_nations.append(nation)
@@ -185,7 +208,8 @@ class GameService:
         initial_turn = TurnService.create_next_turn(
             db,
             world_state=world_state,
-            summary="Inicio del juego. Todas las naciones comienzan en paz."
+            summary="Inicio del juego. Todas las naciones comienzan en paz.",
+            game_id=game.id
         )
         print(f"✅ Turno {initial_turn.turn_number} creado")
         
@@ -198,7 +222,8 @@ class GameService:
                     nation_a_id=nation_a.id,
                     nation_b_id=nation_b.id,
                     status="neutral",
-                    relationship_score=0
+                    relationship_score=0,
+                    game_id=game.id
                 )
                 RelationService.create(db, relation_data)
                 relations_count += 1
@@ -211,19 +236,88 @@ class GameService:
         
         return {
             "message": "Juego inicializado exitosamente",
+            "game_id": game.id,
             "turn_number": initial_turn.turn_number,
             "nations_created": len(created_nations),
             "player_nation": player_nation.to_dict() if player_nation else None
         }
     
     @staticmethod
-    def get_game_state(db: Session) -> Dict[str, Any]:
-        """Obtener el estado actual del juego"""
-        nations = NationService.get_all(db)
-        current_turn = TurnService.get_current(db)
-        recent_events = EventService.get_recent_events(db, limit=10)
+    def get_game(db: Session, game_id: int) -> Optional[Game]:
+        """Obtener partida por ID"""
+        return db.query(Game).filter(Game.id == game_id).first()
+    
+    @staticmethod
+    def resolve_game(db: Session, game_id: Optional[int] = None) -> Optional[Game]:
+        """
+        Partida sobre la que actuar: la indicada o, si no se indica, la
+        partida activa más reciente (compatibilidad con clientes de una sola
+        partida). Si no queda ninguna activa se devuelve la última terminada,
+        para que esos clientes sigan viendo el resultado final.
+        """
+        if game_id is not None:
+            return GameService.get_game(db, game_id)
+        active = db.query(Game).filter(Game.status == "active").order_by(Game.id.desc()).first()
+        return active or db.query(Game).order_by(Game.id.desc()).first()
+    
+    @staticmethod
+    def finish_game(db: Session, game_id: int) -> None:
+        """Marcar la partida como terminada (en la transacción del turno que la decide)"""
+        game = GameService.get_game(db, game_id)
+        if game and game.status != "finished":
+            game.status = "finished"
+            commit_or_flush(db, game)
+            print(f"🏁 Partida {game_id} terminada")
+    
+    @staticmethod
+    def list_games(db: Session, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Listar partidas (más recientes primero) con su turno actual"""
+        games = db.query(Game).order_by(Game.id.desc()).offset(skip).limit(limit).all()
+        return [
+            dict(game.to_dict(), current_turn=TurnService.get_current_turn_number(db, game.id))
+            for game in games
+        ]
+    
+    @staticmethod
+    def delete_game(db: Session, game_id: int) -> Dict[str, int]:
+        """
+        Eliminar una partida con todos sus datos (el resto de partidas no se toca).
+        Los vectores de sus eventos se retiran de la memoria RAG tras el commit.
+        
+        Returns:
+            dict: Filas eliminadas por tabla
+        """
+        with unit_of_work(db):
+            event_ids = [event_id for event_id, in db.query(Event.id).filter(Event.game_id == game_id)]
+            deleted = {}
+            # Orden inverso a las claves foráneas
+            for name, model in (("battles", Battle), ("events", Event), ("relations", Relation),
+                                ("nations", Nation), ("turns", Turn), ("games", Game)):
+                key = Game.id if model is Game else model.game_id
+                deleted[name] = db.query(model).filter(key == game_id).delete(synchronize_session=False)
+            
+            if event_ids and settings.RAG_ENABLED:
+                after_commit(db, lambda: GameService._forget_events(event_ids))
+        
+        print(f"🗑️ Partida {game_id} eliminada ({deleted['events']} eventos, {deleted['nations']} naciones)")
+        return deleted
+    
+    @staticmethod
+    def _forget_events(event_ids: List[int]) -> None:
+        """Retirar de la memoria RAG los eventos de una partida eliminada (tras las inserciones pendientes)"""
+        from .rag_indexer import get_rag_indexer
+        
+        get_rag_indexer().enqueue_delete(event_ids, reason="partida eliminada")
+    
+    @staticmethod
+    def get_game_state(db: Session, game_id: Optional[int] = None) -> Dict[str, Any]:
+        """Obtener el estado actual de una partida"""
+        nations = NationService.get_all(db, game_id=game_id)
+        current_turn = TurnService.get_current(db, game_id)
+        recent_events = EventService.get_recent_events(db, limit=10, game_id=game_id)
         
         return {
+            "game_id": game_id,
             "current_turn": current_turn.turn_number if current_turn else 0,
             "nations": [n.to_dict() for n in nations],
             "recent_events": [e.to_dict() for e in recent_events],
@@ -238,12 +332,18 @@ class GameService:
     
     @staticmethod
     def process_action(db: Session, nation_id: int, action: ActionRequest) -> Dict[str, Any]:
-        """Procesar una acción del jugador"""
+        """Procesar una acción del jugador (todas sus escrituras en una sola transacción)"""
+        with unit_of_work(db):
+            return GameService._dispatch_action(db, nation_id, action)
+    
+    @staticmethod
+    def _dispatch_action(db: Session, nation_id: int, action: ActionRequest) -> Dict[str, Any]:
+        """Ejecutar la acción según su tipo"""
         nation = NationService.get_by_id(db, nation_id)
         if not nation:
             return {"success": False, "message": "Nación no encontrada"}
         
-        current_turn = TurnService.get_current(db)
+        current_turn = TurnService.get_current(db, nation.game_id)
         
         # Procesar según el tipo de acción
         if action.action_type == "attack":
@@ -260,10 +360,16 @@ class GameService:
         
         return {"success": False, "message": "Tipo de acción no reconocido"}
     
+    @staticmethod
+    def _get_target(db: Session, nation, target_id: Optional[int]):
+        """Nación objetivo, solo si es de la misma partida"""
+        target = NationService.get_by_id(db, target_id) if target_id is not None else None
+        return target if target and target.game_id == nation.game_id else None
+    
     @staticmethod
     def _process_attack(db: Session, attacker, defender_id: int, turn_id: int) -> Dict[str, Any]:
         """Procesar un ataque"""
-        defender = NationService.get_by_id(db, defender_id)
+        defender = GameService._get_target(db, attacker, defender_id)
         if not defender:
             return {"success": False, "message": "Nación objetivo no encontrada"}
         
@@ -290,7 +396,7 @@ class GameService:
     @staticmethod
     def _process_alliance(db: Session, nation, target_id: int, turn_id: int) -> Dict[str, Any]:
         """Procesar propuesta de alianza"""
-        target = NationService.get_by_id(db, target_id)
+        target = GameService._get_target(db, nation, target_id)
         if not target:
             return {"success": False, "message": "Nación objetivo no encontrada"}
         
@@ -351,7 +457,7 @@ class GameService:
         import random
         improvement = random.uniform(20, 40)
         nation.economic_power = min(100.0, nation.economic_power + improvement)
-        db.commit()
+        commit_or_flush(db)
         
         # Crear evento
         event_data = EventCreate(
@@ -369,7 +475,7 @@ class GameService:
     @staticmethod
     def _process_peace_treaty(db: Session, nation, target_id: int, turn_id: int) -> Dict[str, Any]:
         """Procesar solicitud de tratado de paz"""
-        target = NationService.get_by_id(db, target_id)
+        target = GameService._get_target(db, nation, target_id)
         if not target:
             return {"success": False, "message": "Nación objetivo no encontrada"}
         
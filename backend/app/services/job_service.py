@@ -0,0 +1,343 @@
+"""
+Cola de trabajos en segundo plano
+Ejecuta el procesamiento de turnos de IA fuera de la petición HTTP
+"""
+import json
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+
+# Fases de process_ai_turn en orden de ejecución ("compaction" solo cada
+# RAG_COMPACTION_EVERY_TURNS turnos; el resto de turnos queda "skipped")
+TURN_PHASES = ["economy", "agents", "battles", "victory", "compaction", "next_turn"]
+
+# Eventos que cierran el stream de un job
+TERMINAL_EVENTS = ("turn_completed", "turn_failed")
+
+T = TypeVar("T")
+
+
+def format_sse_event(event: Dict[str, Any]) -> str:
+    """Serializar un evento del job en formato Server-Sent Events"""
+    data = json.dumps(event["data"], ensure_ascii=False, default=str)
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n"
+
+
+class TurnJobConflictError(Exception):
+    """Ya hay un turno en curso (o en cola) para esa partida"""
+
+    def __init__(self, job: "TurnJob"):
+        self.job = job
+        super().__init__(f"Ya hay un turno en curso para la partida {job.game_id} (job {job.id})")
+
+
+class GameReservedError(Exception):
+    """La partida está reservada por una operación exclusiva (p. ej. se está eliminando)"""
+
+    def __init__(self, game_id: Optional[int]):
+        self.game_id = game_id
+        super().__init__(f"La partida {game_id} está ocupada por otra operación")
+
+
+class TurnJob:
+    """
+    Trabajo de procesamiento de un turno.
+
+    Estados: queued → running → completed | failed. El progreso se actualiza
+    desde el worker a través de on_progress (callback de process_ai_turn).
+
+    Además guarda el log ordenado de eventos (id secuencial desde 1) para el
+    stream SSE: wait_for_events bloquea hasta que haya eventos nuevos, y un
+    cliente que se reconecta puede continuar desde su Last-Event-ID.
+    """
+
+    def __init__(self, game_id: Optional[int], include_timings: bool = False):
+        self.id = uuid.uuid4().hex
+        self.game_id = game_id
+        self.include_timings = include_timings
+        self.status = "queued"
+        self.current_phase: Optional[str] = None
+        self.phases: Dict[str, Dict[str, Any]] = {
+            phase: {"status": "pending", "duration_ms": None} for phase in TURN_PHASES
+        }
+        self.agents_total = 0
+        self.agents_results: List[Dict[str, Any]] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._events_changed = threading.Condition(self._lock)
+        self._done = threading.Event()
+
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+
+    def _append_event(self, event: str, data: Dict[str, Any]) -> None:
+        """Añadir un evento al log y despertar a los streams (requiere el lock)"""
+        self.events.append({"id": len(self.events) + 1, "event": event, "data": data})
+        self._events_changed.notify_all()
+
+
+    def wait_for_events(self, after_id: int, timeout: float) -> List[Dict[str, Any]]:
+        """Eventos con id > after_id, esperando hasta timeout si aún no hay ninguno"""
+        with self._events_changed:
+            self._events_changed.wait_for(
+                lambda: len(self.events) > after_id or self.is_finished, timeout
+            )
+            return self.events[after_id:]
+
+
+    def on_progress(self, event: str, data: Dict[str, Any]) -> None:
+        """Callback de progreso de AgentService.process_ai_turn"""
+        with self._lock:
+            self._append_event(event, data)
+            if event == "phase_started" and data["phase"] in self.phases:
+                self.current_phase = data["phase"]
+                self.phases[data["phase"]]["status"] = "running"
+            elif event == "phase_completed" and data["phase"] in self.phases:
+                self.phases[data["phase"]].update(status="completed", duration_ms=data.get("duration_ms"))
+            elif event == "phase_skipped" and data["phase"] in self.phases:
+                self.phases[data["phase"]]["status"] = "skipped"
+            elif event == "agents_planned":
+                self.agents_total = data["total"]
+            elif event == "agent_completed":
+                self.agents_results.append(data)
+
+
+    def mark_running(self) -> None:
+        with self._lock:
+            self.status = "running"
+            self.started_at = datetime.utcnow()
+            self._append_event("turn_started", {"job_id": self.id})
+
+
+    def mark_completed(self, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self.status = "completed"
+            self.result = result
+            self.current_phase = None
+            self.finished_at = datetime.utcnow()
+            self._append_event("turn_completed", result)
+        self._done.set()
+
+
+    def mark_failed(self, error: str) -> None:
+        with self._lock:
+            self.status = "failed"
+            self.error = error
+            self.finished_at = datetime.utcnow()
+            self._append_event("turn_failed", {"error": error})
+        self._done.set()
+
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Esperar a que termine; True si terminó dentro del timeout"""
+        return self._done.wait(timeout)
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representación para GET /api/agents/jobs/{id}"""
+        with self._lock:
+            completed_phases = sum(1 for p in self.phases.values() if p["status"] in ("completed", "skipped"))
+            return {
+                "job_id": self.id,
+                "game_id": self.game_id,
+                "status": self.status,
+                "current_phase": self.current_phase,
+                "phases": {phase: dict(info) for phase, info in self.phases.items()},
+                "progress": {
+                    "phases_completed": completed_phases,
+                    "phases_total": len(self.phases),
+                    "agents_completed": len(self.agents_results),
+                    "agents_total": self.agents_total,
+                },
+                "agents_results": list(self.agents_results),
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at.isoformat(),
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            }
+
+
+class JobService:
+    """
+    Cola en memoria con un worker que ejecuta los turnos de IA.
+
+    - Un único hilo worker: los turnos se ejecutan de uno en uno, también
+      entre partidas distintas (el AgentService guarda los tiempos del último
+      turno y las acciones de un turno dependen del anterior).
+    - Como máximo un turno en cola o en curso por partida; un segundo envío
+      lanza TurnJobConflictError con el job existente.
+    - run_exclusive() reserva una partida sin turnos activos mientras se
+      ejecuta una operación (borrado): los envíos lanzan GameReservedError.
+    - Se conservan los últimos MAX_FINISHED_JOBS trabajos terminados para
+      que los clientes puedan consultar el resultado.
+    """
+
+    MAX_FINISHED_JOBS = 100
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, TurnJob]" = OrderedDict()
+        self._active_by_game: Dict[Optional[int], str] = {}
+        # Partidas reservadas por run_exclusive (no aceptan turnos nuevos)
+        self._reserved_games: set = set()
+        self._queue: "queue.Queue[TurnJob]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+
+    def submit_turn(self, game_id: Optional[int] = None, include_timings: bool = False) -> TurnJob:
+        """
+        Encolar el procesamiento del turno actual de una partida.
+
+        Raises:
+            TurnJobConflictError: Si ya hay un turno en curso para esa partida
+            GameReservedError: Si la partida está reservada (run_exclusive)
+        """
+        with self._lock:
+            self._check_available(game_id)
+
+            job = TurnJob(game_id, include_timings)
+            self._jobs[job.id] = job
+            self._active_by_game[game_id] = job.id
+            self._trim_finished_jobs()
+            self._ensure_worker()
+
+        self._queue.put(job)
+        print(f"📥 Turno encolado (partida {game_id}, job {job.id})")
+        return job
+
+
+    def run_exclusive(self, game_id: Optional[int], fn: Callable[[], T]) -> T:
+        """
+        Ejecutar fn con la partida reservada: sin turnos en cola ni en curso, y
+        sin aceptar envíos nuevos hasta que termine (comprobación y reserva
+        atómicas bajo el lock del servicio).
+
+        Raises:
+            TurnJobConflictError: Si la partida tiene un turno en cola o en curso
+            GameReservedError: Si otra operación exclusiva la tiene reservada
+        """
+        with self._lock:
+            self._check_available(game_id)
+            self._reserved_games.add(game_id)
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self._reserved_games.discard(game_id)
+
+
+    def _check_available(self, game_id: Optional[int]) -> None:
+        """Lanzar el conflicto si la partida tiene un turno activo o está reservada (con el lock tomado)"""
+        active_id = self._active_by_game.get(game_id)
+        if active_id is not None:
+            raise TurnJobConflictError(self._jobs[active_id])
+        if game_id in self._reserved_games:
+            raise GameReservedError(game_id)
+
+
+    def get_job(self, job_id: str) -> Optional[TurnJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+    def get_active_job(self, game_id: Optional[int] = None) -> Optional[TurnJob]:
+        with self._lock:
+            active_id = self._active_by_game.get(game_id)
+            return self._jobs.get(active_id) if active_id else None
+
+
+    def _trim_finished_jobs(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.is_finished]
+        for job_id in finished[:max(0, len(finished) - self.MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run_worker, name="turn-job-worker", daemon=True)
+            self._worker.start()
+
+
+    def _run_worker(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                self._execute(job)
+            finally:
+                self._queue.task_done()
+
+
+    def _release(self, job: TurnJob) -> None:
+        """Liberar la partida antes de publicar el resultado (permite encolar el siguiente turno)"""
+        with self._lock:
+            if self._active_by_game.get(job.game_id) == job.id:
+                del self._active_by_game[job.game_id]
+
+
+    def _execute(self, job: TurnJob) -> None:
+        """Ejecutar el turno con su propia sesión de BD"""
+        from ..models.database import SessionLocal
+        from .agent_service import get_agent_service
+
+        job.mark_running()
+        print(f"⚙️ Ejecutando turno (job {job.id})")
+        db = SessionLocal()
+        result: Optional[Dict[str, Any]] = None
+        error: Optional[str] = None
+        try:
+            result = get_agent_service().process_current_turn(
+                db,
+                include_timings=job.include_timings,
+                progress_callback=job.on_progress,
+                game_id=job.game_id
+            )
+            print(f"✅ Job {job.id} completado")
+        except ValueError as e:
+            db.rollback()
+            print(f"❌ Job {job.id} falló: {e}")
+            error = str(e)
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Job {job.id} falló: {e}")
+            # No exponer detalles internos al cliente
+            error = "Error procesando turno de IA"
+        finally:
+            db.close()
+            self._release(job)
+
+        if error is None:
+            job.mark_completed(result)
+        else:
+            job.mark_failed(error)
+
+
+# ==================== INSTANCIA GLOBAL ====================
+
+_job_service_instance = None
+_job_service_lock = threading.Lock()
+
+def get_job_service() -> JobService:
+    """
+    Obtener instancia singleton del Job Service.
+
+    Returns:
+        JobService: Instancia compartida
+    """
+    global _job_service_instance
+    with _job_service_lock:
+        if _job_service_instance is None:
+            _job_service_instance = JobService()
+    return _job_service_instance
@@ -0,0 +1,224 @@
+"""
+Cliente LLM resiliente
+Envuelve el modelo de chat con deadlines, reintentos con backoff y peticiones hedged
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from ..config import settings
+from .metrics_service import get_metrics_service
+
+
+class LLMBudgetExceededError(Exception):
+    """Se agotó el presupuesto de tiempo/reintentos de una decisión"""
+    pass
+
+
+class ResilientLLMClient:
+    """
+    Cliente que añade a cualquier chat model de LangChain:
+
+    - Deadline por llamada (LLM_TIMEOUT_SECONDS) y presupuesto total por
+      decisión (LLM_DECISION_BUDGET_SECONDS).
+    - Reintentos con backoff exponencial y jitter completo
+      (LLM_MAX_RETRIES, LLM_BACKOFF_BASE_SECONDS, LLM_BACKOFF_MAX_SECONDS).
+    - Peticiones hedged (solo en la ruta async): si la primera respuesta tarda
+      más que el umbral, se lanza una petición duplicada y se usa la primera
+      que termine. El umbral es LLM_HEDGE_AFTER_SECONDS o, si vale 0, el p95
+      de las latencias observadas.
+
+    Si el presupuesto se agota lanza LLMBudgetExceededError y el llamante
+    decide la acción de fallback.
+    """
+
+    def __init__(self, llm: Any):
+        self.llm = llm
+        self._latencies: Deque[float] = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self.metrics = get_metrics_service()
+        self.stats: Dict[str, int] = {
+            "calls": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "errors": 0,
+            "hedged_requests": 0,
+            "hedge_wins": 0,
+            "budget_exhausted": 0,
+        }
+
+
+    # ==================== MÉTRICAS INTERNAS ====================
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += amount
+        self.metrics.inc("nationmind_llm_events_total", amount, event=key)
+
+
+    def _record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+        self.metrics.observe("nationmind_llm_request_seconds", seconds)
+
+
+    def _record_usage(self, response: Any) -> None:
+        """Contabilizar tokens si el proveedor devuelve usage_metadata"""
+        usage = getattr(response, "usage_metadata", None) or {}
+        for token_type in ("input", "output"):
+            tokens = usage.get(f"{token_type}_tokens")
+            if tokens:
+                self.metrics.inc("nationmind_llm_tokens_total", tokens, type=token_type)
+
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Percentil de las latencias recientes (None si no hay muestras)"""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(percentile / 100 * (len(samples) - 1))))
+        return samples[index]
+
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Segundos a esperar antes de lanzar la petición duplicada (None = sin hedging)"""
+        if not settings.LLM_HEDGE_ENABLED:
+            return None
+        if settings.LLM_HEDGE_AFTER_SECONDS > 0:
+            return settings.LLM_HEDGE_AFTER_SECONDS
+        with self._lock:
+            enough_samples = len(self._latencies) >= settings.LLM_HEDGE_MIN_SAMPLES
+        if not enough_samples:
+            return None
+        return self.latency_percentile(95)
+
+
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        """Backoff exponencial con jitter completo: uniforme en [0, min(max, base * 2^n)]"""
+        cap = min(settings.LLM_BACKOFF_MAX_SECONDS, settings.LLM_BACKOFF_BASE_SECONDS * (2 ** attempt))
+        return random.uniform(0, cap)
+
+
+    # ==================== RUTA SÍNCRONA ====================
+
+    def invoke(self, messages: List) -> Any:
+        """
+        Llamada síncrona con reintentos y backoff.
+
+        El deadline por llamada lo aplica el propio cliente HTTP del modelo
+        (timeout configurado en el provider); aquí se controla el presupuesto.
+        """
+        deadline = time.monotonic() + settings.LLM_DECISION_BUDGET_SECONDS
+        last_error: Optional[Exception] = None
+
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            if attempt > 0:
+                delay = self._backoff_delay(attempt - 1)
+                if time.monotonic() + delay >= deadline:
+                    break
+                self._count("retries")
+                time.sleep(delay)
+
+            self._count("calls")
+            start = time.monotonic()
+            try:
+                response = self.llm.invoke(messages)
+                self._record_latency(time.monotonic() - start)
+                self._record_usage(response)
+                return response
+            except Exception as e:
+                self._count("errors")
+                last_error = e
+
+            if time.monotonic() >= deadline:
+                break
+
+        self._count("budget_exhausted")
+        raise LLMBudgetExceededError(f"Presupuesto LLM agotado: {last_error}")
+
+
+    # ==================== RUTA ASÍNCRONA ====================
+
+    async def ainvoke(self, messages: List) -> Any:
+        """Llamada async con deadline por intento, reintentos, backoff y hedging"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.LLM_DECISION_BUDGET_SECONDS
+        last_error: Optional[Exception] = None
+
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            if attempt > 0:
+                delay = self._backoff_delay(attempt - 1)
+                if loop.time() + delay >= deadline:
+                    break
+                self._count("retries")
+                await asyncio.sleep(delay)
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+
+            timeout = min(settings.LLM_TIMEOUT_SECONDS, remaining)
+            try:
+                response = await self._attempt(messages, timeout)
+                self._record_usage(response)
+                return response
+            except asyncio.TimeoutError as e:
+                self._count("timeouts")
+                last_error = e
+            except Exception as e:
+                self._count("errors")
+                last_error = e
+
+        self._count("budget_exhausted")
+        raise LLMBudgetExceededError(f"Presupuesto LLM agotado: {last_error or 'timeout'}")
+
+
+    async def _attempt(self, messages: List, timeout: float) -> Any:
+        """
+        Un intento con deadline. Si el hedging está activo y la primera
+        petición supera el umbral, se lanza una segunda en paralelo.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + timeout
+
+        self._count("calls")
+        primary = asyncio.create_task(self.llm.ainvoke(messages))
+        pending = {primary}
+        last_error: Optional[BaseException] = None
+
+        try:
+            hedge_delay = self._hedge_delay()
+            if hedge_delay is not None and hedge_delay < timeout:
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+                if not done:
+                    self._count("calls")
+                    self._count("hedged_requests")
+                    pending.add(asyncio.create_task(self.llm.ainvoke(messages)))
+
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._count("hedge_wins")
+                        self._record_latency(loop.time() - start)
+                        return task.result()
+                    last_error = task.exception()
+
+            if last_error is not None and not pending:
+                raise last_error
+            raise asyncio.TimeoutError(f"LLM sin respuesta en {timeout:.1f}s")
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,265 @@
+"""
+Proveedores de LLM para los agentes
+Selecciona el chat model según Settings (Groq o un LLM falso local)
+"""
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from ..config import settings
+
+
+SUPPORTED_PROVIDERS = ("groq", "fake")
+
+
+def get_llm_provider_name() -> str:
+    """
+    Resolver el proveedor de LLM.
+
+    LLM_PROVIDER tiene prioridad; si está vacío se deduce de LLM_MODEL
+    (los modelos "fake" / "fake-*" usan el LLM falso, el resto Groq).
+    """
+    provider = settings.LLM_PROVIDER.strip().lower()
+    if not provider:
+        provider = "fake" if settings.LLM_MODEL.strip().lower().startswith("fake") else "groq"
+    if provider not in SUPPORTED_PROVIDERS:
+        raise ValueError(
+            f"LLM_PROVIDER '{provider}' no soportado. Opciones: {', '.join(SUPPORTED_PROVIDERS)}"
+        )
+    return provider
+
+
+def create_chat_model() -> BaseChatModel:
+    """
+    Crear el chat model configurado.
+
+    Sin reintentos internos en Groq: los gestiona ResilientLLMClient.
+    """
+    provider = get_llm_provider_name()
+
+    if provider == "fake":
+        return FakeDecisionLLM(
+            latency_ms=settings.LLM_FAKE_LATENCY_MS,
+            latency_jitter_ms=settings.LLM_FAKE_LATENCY_JITTER_MS,
+            seed=settings.LLM_FAKE_SEED
+        )
+
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(
+        model=settings.LLM_MODEL,
+        temperature=settings.LLM_TEMPERATURE,
+        max_tokens=settings.LLM_MAX_TOKENS,
+        api_key=settings.GROQ_API_KEY,
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        max_retries=0
+    )
+
+
+# ==================== LLM FALSO (OFFLINE) ====================
+
+_STATUS_LABELS = {
+    "Aliado": "allied",
+    "EN GUERRA": "war",
+    "Neutral": "neutral",
+    "Acuerdo Comercial": "trade_agreement",
+}
+
+
+class FakeDecisionLLM(BaseChatModel):
+    """
+    LLM basado en reglas que responde con el JSON de decisión de los agentes.
+
+    Lee del prompt la personalidad, el turno, el oro, las tropas y las
+    relaciones, y elige una acción válida según reglas por personalidad
+    (aggressive, diplomatic, defensive, expansionist, neutral). Es
+    determinista: el RNG se siembra con LLM_FAKE_SEED y los datos del prompt,
+    así que el mismo estado produce la misma decisión aunque las llamadas
+    lleguen en otro orden. La latencia simulada es configurable.
+    """
+
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    seed: int = 42
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-decision"
+
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        prompt = self._prompt_text(messages)
+        rng = self._rng_for(prompt)
+        delay = self._latency_seconds(rng)
+        if delay > 0:
+            time.sleep(delay)
+        return self._build_result(prompt, rng)
+
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        prompt = self._prompt_text(messages)
+        rng = self._rng_for(prompt)
+        delay = self._latency_seconds(rng)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._build_result(prompt, rng)
+
+
+    # ==================== HELPERS ====================
+
+    @staticmethod
+    def _prompt_text(messages: List[BaseMessage]) -> str:
+        return "\n".join(str(m.content) for m in messages)
+
+
+    def _rng_for(self, prompt: str) -> random.Random:
+        """RNG determinista a partir de la semilla y del estado descrito en el prompt"""
+        state = self._parse_prompt(prompt)
+        key = f"{self.seed}|{state['turn']}|{state['nation']}|{state['gold']}|{state['troops']}"
+        return random.Random(key)
+
+
+    def _latency_seconds(self, rng: random.Random) -> float:
+        jitter = rng.uniform(-self.latency_jitter_ms, self.latency_jitter_ms) if self.latency_jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+
+    def _build_result(self, prompt: str, rng: random.Random) -> ChatResult:
+        decision = self._decide(self._parse_prompt(prompt), rng)
+        content = json.dumps(decision, ensure_ascii=False)
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                # Aproximación de ~4 caracteres por token
+                "input_tokens": len(prompt) // 4,
+                "output_tokens": len(content) // 4,
+                "total_tokens": len(prompt) // 4 + len(content) // 4,
+            }
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+    @staticmethod
+    def _parse_prompt(prompt: str) -> Dict[str, Any]:
+        """Extraer del prompt de AgentService los datos necesarios para decidir"""
+        def find_int(pattern: str, default: int = 0) -> int:
+            match = re.search(pattern, prompt)
+            return int(float(match.group(1))) if match else default
+
+        personality = re.search(r"personalidad \((\w+)\)", prompt)
+        nation = re.search(r"## Tu Nación: (.+)", prompt)
+
+        relations = []
+        for match in re.finditer(r"- Nación (\d+): .*?(Aliado|EN GUERRA|Neutral|Acuerdo Comercial|\w+) \(score: (-?\d+)\)", prompt):
+            relations.append({
+                "nation_id": int(match.group(1)),
+                "status": _STATUS_LABELS.get(match.group(2), match.group(2)),
+                "score": int(match.group(3)),
+            })
+
+        return {
+            "personality": personality.group(1) if personality else "neutral",
+            "nation": nation.group(1).strip() if nation else "",
+            "turn": find_int(r"# Turno (\d+)"),
+            "gold": find_int(r"- Oro: (\d+(?:\.\d+)?)"),
+            "troops": find_int(r"- Tropas: (\d+(?:\.\d+)?)"),
+            "relations": relations,
+        }
+
+
+    @staticmethod
+    def _decide(state: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+        """Reglas de decisión por personalidad"""
+        gold = state["gold"]
+        troops = state["troops"]
+        relations = state["relations"]
+        candidates = [r for r in relations if r["status"] in ("neutral", "trade_agreement")]
+
+        def war(reasoning: str) -> Optional[Dict[str, Any]]:
+            if troops < 50 or not candidates:
+                return None
+            target = min(candidates, key=lambda r: (r["score"], r["nation_id"]))
+            return {
+                "action": "declare_war",
+                "params": {"target_nation_id": target["nation_id"], "reason": "Disputa territorial"},
+                "reasoning": reasoning
+            }
+
+        def alliance(reasoning: str) -> Optional[Dict[str, Any]]:
+            if not candidates:
+                return None
+            target = max(candidates, key=lambda r: (r["score"], -r["nation_id"]))
+            return {
+                "action": "propose_alliance",
+                "params": {"target_nation_id": target["nation_id"], "message": "Buscamos cooperación mutua"},
+                "reasoning": reasoning
+            }
+
+        def military(fraction: float, reasoning: str) -> Optional[Dict[str, Any]]:
+            amount = int(gold * fraction)
+            if amount < 10:
+                return None
+            return {"action": "invest_in_military", "params": {"amount": amount}, "reasoning": reasoning}
+
+        def economy(fraction: float, reasoning: str) -> Optional[Dict[str, Any]]:
+            amount = int(gold * fraction)
+            if amount < 20:
+                return None
+            return {"action": "invest_in_economy", "params": {"amount": amount}, "reasoning": reasoning}
+
+        personality = state["personality"]
+        roll = rng.random()
+
+        if personality == "aggressive":
+            options = [
+                war("Atacamos mientras tenemos ventaja") if troops >= 80 and roll < 0.4 else None,
+                military(0.35, "Reforzamos el ejército para la conquista"),
+            ]
+        elif personality == "diplomatic":
+            options = [
+                alliance("Las alianzas garantizan la paz") if roll < 0.6 else None,
+                economy(0.25, "Una economía fuerte sostiene la diplomacia"),
+            ]
+        elif personality == "defensive":
+            options = [
+                military(0.25, "Disuasión: reforzamos la defensa") if troops < 200 else None,
+                alliance("Buscamos aliados defensivos") if roll < 0.4 else None,
+            ]
+        elif personality == "expansionist":
+            options = [
+                war("Oportunidad de expansión territorial") if troops >= 150 and roll < 0.1 else None,
+                economy(0.3, "Crecimiento económico primero") if roll < 0.7 else None,
+                alliance("Ampliamos nuestra influencia diplomática"),
+            ]
+        else:
+            choice = rng.choice(["economy", "military", "alliance", "wait"])
+            options = [
+                economy(0.2, "Desarrollo equilibrado") if choice == "economy" else None,
+                military(0.2, "Mantener capacidad defensiva") if choice == "military" else None,
+                alliance("Cooperación pragmática") if choice == "alliance" else None,
+            ]
+
+        for option in options:
+            if option is not None:
+                return option
+
+        return {"action": "do_nothing", "params": {}, "reasoning": "Esperar y observar"}
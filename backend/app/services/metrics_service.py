@@ -0,0 +1,190 @@
+"""
+Servicio de métricas
+Contadores e histogramas en memoria exportados en formato de texto de Prometheus
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# Buckets por defecto (segundos), los mismos que usan los clientes de Prometheus
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Llamadas al LLM: latencias de red mucho mayores
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 45.0, 90.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _escape_label_value(value: str) -> str:
+    """Escapar \\, " y saltos de línea según el formato de texto de Prometheus"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Span:
+    """Medición de un bloque de código (segundos en .seconds al salir)"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.total += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class MetricsService:
+    """
+    Registro de métricas del backend.
+
+    - Contadores: inc("nationmind_llm_tokens_total", 120, type="input")
+    - Histogramas: observe(...) o span(...) para medir un bloque
+    - render_prometheus() devuelve el texto que sirve GET /metrics
+
+    Es thread-safe: los agentes se ejecutan en hilos y en el event loop.
+    """
+
+    # Métricas conocidas: nombre -> (tipo, ayuda, buckets)
+    METRICS: Dict[str, Tuple[str, str, Optional[Tuple[float, ...]]]] = {
+        "nationmind_turns_processed_total": ("counter", "Turnos de IA procesados", None),
+        "nationmind_turn_phase_seconds": ("histogram", "Duración de cada fase del turno", DEFAULT_BUCKETS),
+        "nationmind_agent_step_seconds": ("histogram", "Duración de gather/think/act por agente", DEFAULT_BUCKETS),
+        "nationmind_llm_request_seconds": ("histogram", "Latencia de las llamadas al LLM", LLM_BUCKETS),
+        "nationmind_llm_tokens_total": ("counter", "Tokens consumidos por el LLM", None),
+        "nationmind_llm_events_total": ("counter", "Reintentos, timeouts, errores y hedging del LLM", None),
+        "nationmind_rag_query_seconds": ("histogram", "Latencia de las consultas RAG", DEFAULT_BUCKETS),
+        "nationmind_rag_index_lag_seconds": ("histogram", "Retraso entre encolar un evento e indexarlo en RAG", DEFAULT_BUCKETS),
+        "nationmind_rag_indexed_events_total": ("counter", "Eventos indexados (o fallidos) en la memoria RAG", None),
+        "nationmind_rag_context_cache_total": ("counter", "Aciertos y fallos de la caché de contexto RAG", None),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+
+
+    @staticmethod
+    def _key(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+    def inc(self, name: str, amount: float = 1.0, **labels: Any) -> None:
+        """Incrementar un contador"""
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Registrar una observación en un histograma"""
+        key = self._key(labels)
+        buckets = (self.METRICS.get(name) or (None, None, None))[2] or DEFAULT_BUCKETS
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(buckets)
+            histogram.observe(value)
+
+
+    @contextmanager
+    def span(self, name: str, **labels: Any) -> Iterator[Span]:
+        """Medir un bloque y registrarlo en el histograma `name` (también si falla)"""
+        span = Span()
+        try:
+            yield span
+        finally:
+            span.seconds = time.perf_counter() - span.start
+            self.observe(name, span.seconds, **labels)
+
+
+    def timed(self, name: str, **labels: Any) -> Callable:
+        """Decorador equivalente a span() para funciones completas"""
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+    # ==================== EXPORTACIÓN ====================
+
+    @staticmethod
+    def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(key) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in pairs) + "}"
+
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+    def render_prometheus(self) -> str:
+        """Exportar todas las series en formato de texto de Prometheus (v0.0.4)"""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {
+                name: {
+                    key: (h.buckets, list(h.counts), h.total, h.sum)
+                    for key, h in series.items()
+                }
+                for name, series in self._histograms.items()
+            }
+
+        lines: List[str] = []
+
+        for name in sorted(counters):
+            help_text = (self.METRICS.get(name) or (None, name, None))[1]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(counters[name].items()):
+                lines.append(f"{name}{self._format_labels(key)} {self._format_value(value)}")
+
+        for name in sorted(histograms):
+            help_text = (self.METRICS.get(name) or (None, name, None))[1]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, (buckets, counts, total, value_sum) in sorted(histograms[name].items()):
+                for bound, count in zip(buckets, counts):
+                    lines.append(f"{name}_bucket{self._format_labels(key, ('le', repr(float(bound))))} {count}")
+                lines.append(f"{name}_bucket{self._format_labels(key, ('le', '+Inf'))} {total}")
+                lines.append(f"{name}_sum{self._format_labels(key)} {repr(value_sum)}")
+                lines.append(f"{name}_count{self._format_labels(key)} {total}")
+
+        return "\n".join(lines) + "\n"
+
+
+# ==================== INSTANCIA GLOBAL ====================
+
+_metrics_service_instance = MetricsService()
+
+def get_metrics_service() -> MetricsService:
+    """
+    Obtener instancia singleton del Metrics Service.
+
+    Se crea al importar el módulo para que los decoradores @timed puedan
+    usarse a nivel de clase.
+
+    Returns:
+        MetricsService: Instancia compartida
+    """
+    return _metrics_service_instance
@@ -5,6 +5,7 @@ Contiene toda la lógica de negocio relacionada con naciones
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..models.nation import Nation
+from ..models.database import commit_or_flush
 from ..schemas.nation_schema import NationCreate, NationUpdate
 
 
@@ -12,9 +13,15 @@ class NationService:
     """Servicio para operaciones CRUD y lógica de naciones"""
     
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[Nation]:
-        """Obtener todas las naciones"""
-        query = db.query(Nation)
+    def get_all(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        active_only: bool = True,
+        game_id: Optional[int] = None
+    ) -> List[Nation]:
+        """Obtener todas las naciones (de una partida si se indica game_id)"""
+        query = NationService._in_game(db.query(Nation), game_id)
         if active_only:
             query = query.filter(Nation.is_active == True)
         return query.offset(skip).limit(limit).all()
@@ -25,17 +32,16 @@ class NationService:
         return db.query(Nation).filter(Nation.id == nation_id).first()
     
     @staticmethod
-    def get_by_name(db: Session, name: str) -> Optional[Nation]:
-        """Obtener nación por nombre"""
-        return db.query(Nation).filter(Nation.name == name).first()
+    def get_by_name(db: Session, name: str, game_id: Optional[int] = None) -> Optional[Nation]:
+        """Obtener nación por nombre (el nombre solo es único dentro de una partida)"""
+        return NationService._in_game(db.query(Nation), game_id).filter(Nation.name == name).first()
     
     @staticmethod
     def create(db: Session, nation_data: NationCreate) -> Nation:
         """Crear una nueva nación"""
         nation = Nation(**nation_data.model_dump())
         db.add(nation)
-        db.commit()
-        db.refresh(nation)
+        commit_or_flush(db, nation)
         return nation
     
     @staticmethod
@@ -54,8 +60,7 @@ class NationService:
         for key, value in update_data.items():
             setattr(nation, key, value)
         
-        db.commit()
-        db.refresh(nation)
+        commit_or_flush(db, nation)
         return nation
     
     @staticmethod
@@ -66,21 +71,21 @@ class NationService:
             return False
         
         nation.is_active = False
-        db.commit()
+        commit_or_flush(db)
         return True
     
     @staticmethod
-    def get_ai_nations(db: Session) -> List[Nation]:
+    def get_ai_nations(db: Session, game_id: Optional[int] = None) -> List[Nation]:
         """Obtener solo naciones controladas por IA"""
-        return db.query(Nation).filter(
+        return NationService._in_game(db.query(Nation), game_id).filter(
             Nation.ai_controlled == True,
             Nation.is_active == True
         ).all()
     
     @staticmethod
-    def get_player_nation(db: Session) -> Optional[Nation]:
+    def get_player_nation(db: Session, game_id: Optional[int] = None) -> Optional[Nation]:
         """Obtener la nación del jugador"""
-        return db.query(Nation).filter(
+        return NationService._in_game(db.query(Nation), game_id).filter(
             Nation.ai_controlled == False,
             Nation.is_active == True
         ).first()
@@ -95,10 +100,14 @@ class NationService:
         nation.gold = max(0, nation.gold + gold_change)
         nation.troops = max(0, nation.troops + troops_change)
         
-        db.commit()
-        db.refresh(nation)
+        commit_or_flush(db, nation)
         return nation
     
+    @staticmethod
+    def _in_game(query, game_id: Optional[int]):
+        """Limitar la consulta a una partida (None = todas)"""
+        return query.filter(Nation.game_id == game_id) if game_id is not None else query
+    
     @staticmethod
     def calculate_total_power(nation: Nation) -> float:
         """Calcular poder total de una nación"""
@@ -0,0 +1,425 @@
+"""
+Vector store en proceso sobre NumPy.
+Matriz de embeddings memory-mapped + arrays de metadata; búsqueda por
+similitud coseno con multiplicación de matrices por bloques.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..config import settings
+from ..models.event import Event
+from .embedding_cache import CachedEncoder, content_hash
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_VECTOR_DTYPES = ("float32", "float16")
+
+INITIAL_CAPACITY = 1024
+
+# Filas por bloque en la búsqueda: acota la memoria temporal del producto
+SEARCH_BLOCK_ROWS = 8192
+
+
+class NumpyVectorStore:
+    """
+    Persistencia y búsqueda semántica en el propio proceso, sin IPC ni red.
+
+    En disco (NUMPY_VECTOR_DIR) hay dos ficheros por dimensión y dtype:
+
+    - ``game_events-<dim>-<dtype>.vec``: matriz (capacidad x dim) en memmap.
+      Los vectores se guardan normalizados, así que coseno = producto escalar.
+    - ``game_events-<dim>-<dtype>.jsonl``: log de solo-añadir con la fila, la
+      descripción y la metadata de cada evento (y los borrados). Al arrancar
+      se reproduce para reconstruir los arrays de filtros, y se compacta si
+      tiene muchas líneas obsoletas.
+
+    Como en la caché de embeddings en disco, primero se escriben los vectores
+    y después las líneas del log que apuntan a ellos.
+    """
+
+    def __init__(self, embedding_model: CachedEncoder, directory: Optional[str] = None, dtype: Optional[str] = None):
+        self.embedding_model = embedding_model
+        self.directory = directory or settings.NUMPY_VECTOR_DIR
+        self.dtype_name = (dtype or settings.NUMPY_VECTOR_DTYPE).strip().lower()
+        if self.dtype_name not in SUPPORTED_VECTOR_DTYPES:
+            raise ValueError(
+                f"NUMPY_VECTOR_DTYPE '{self.dtype_name}' no soportado. Opciones: {', '.join(SUPPORTED_VECTOR_DTYPES)}"
+            )
+        self.dtype = np.dtype(self.dtype_name)
+        self.embedding_dimension = embedding_model.dimension
+
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, f"game_events-{self.embedding_dimension}-{self.dtype_name}")
+        self.vectors_path = base + ".vec"
+        self.log_path = base + ".jsonl"
+        self._lock = threading.Lock()
+
+        self._load()
+        logger.info("NumPy Vector Store inicializado en %s (%d eventos)", base, len(self._rows))
+
+    # ==================== PERSISTENCIA ====================
+
+    def _open_vectors(self, capacity: int) -> None:
+        size = capacity * self.embedding_dimension * self.dtype.itemsize
+        exists = os.path.exists(self.vectors_path)
+        if exists and os.path.getsize(self.vectors_path) != size:
+            os.truncate(self.vectors_path, size)
+        self.vectors = np.memmap(
+            self.vectors_path,
+            dtype=self.dtype,
+            mode="r+" if exists else "w+",
+            shape=(capacity, self.embedding_dimension)
+        )
+
+    def _reset_arrays(self, capacity: int) -> None:
+        self.event_ids = np.zeros(capacity, dtype=np.int64)
+        self.nation_ids = np.zeros(capacity, dtype=np.int64)
+        self.game_ids = np.zeros(capacity, dtype=np.int64)
+        self.importances = np.zeros(capacity, dtype=np.int32)
+        self.type_codes = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.descriptions: List[Optional[str]] = [None] * capacity
+        self.metadatas: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._rows: Dict[int, int] = {}
+        self._free_rows: List[int] = []
+        self._used_rows = 0
+        self._event_types: Dict[str, int] = {}
+
+    def _load(self) -> None:
+        row_bytes = self.embedding_dimension * self.dtype.itemsize
+        capacity = INITIAL_CAPACITY
+        if os.path.exists(self.vectors_path):
+            capacity = max(capacity, os.path.getsize(self.vectors_path) // row_bytes)
+        self._open_vectors(capacity)
+        self._reset_arrays(capacity)
+
+        log_lines = 0
+        if os.path.exists(self.log_path):
+            with open(self.log_path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Última línea a medias tras una caída: se ignora
+                        logger.warning("Línea ilegible en %s, se ignora", self.log_path)
+                        continue
+                    log_lines += 1
+                    if "deleted" in entry:
+                        for event_id in entry["deleted"]:
+                            self._release(event_id)
+                    elif entry["row"] < capacity:
+                        self._assign(entry["row"], entry["event_id"], entry["description"], entry["metadata"])
+
+        self._free_rows = sorted(
+            (row for row in range(self._used_rows) if not self.alive[row]), reverse=True
+        )
+        if log_lines > 2 * len(self._rows) + INITIAL_CAPACITY:
+            self._compact_log()
+
+    def _compact_log(self) -> None:
+        tmp_path = f"{self.log_path}.tmp"
+        with open(tmp_path, "w") as f:
+            for event_id, row in self._rows.items():
+                f.write(self._log_line(row, event_id))
+        os.replace(tmp_path, self.log_path)
+
+    def _log_line(self, row: int, event_id: int) -> str:
+        return json.dumps({
+            "row": row,
+            "event_id": event_id,
+            "description": self.descriptions[row],
+            "metadata": self.metadatas[row],
+        }) + "\n"
+
+    def _append_log(self, lines: List[str]) -> None:
+        with open(self.log_path, "a") as f:
+            f.write("".join(lines))
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self.alive)
+        if needed <= capacity:
+            return
+        new_capacity = capacity
+        while new_capacity < needed:
+            new_capacity *= 2
+
+        self.vectors.flush()
+        del self.vectors
+        self._open_vectors(new_capacity)
+
+        extra = new_capacity - capacity
+        self.event_ids = np.concatenate([self.event_ids, np.zeros(extra, dtype=np.int64)])
+        self.nation_ids = np.concatenate([self.nation_ids, np.zeros(extra, dtype=np.int64)])
+        self.game_ids = np.concatenate([self.game_ids, np.zeros(extra, dtype=np.int64)])
+        self.importances = np.concatenate([self.importances, np.zeros(extra, dtype=np.int32)])
+        self.type_codes = np.concatenate([self.type_codes, np.zeros(extra, dtype=np.int32)])
+        self.alive = np.concatenate([self.alive, np.zeros(extra, dtype=bool)])
+        self.descriptions.extend([None] * extra)
+        self.metadatas.extend([None] * extra)
+
+    # ==================== FILAS ====================
+
+    def _assign(self, row: int, event_id: int, description: str, metadata: Dict[str, Any]) -> None:
+        previous = self._rows.get(event_id)
+        if previous is not None and previous != row:
+            self.alive[previous] = False
+        self._rows[event_id] = row
+        self.event_ids[row] = event_id
+        self.nation_ids[row] = metadata.get("nation_id") or 0
+        self.game_ids[row] = metadata.get("game_id") or 0
+        self.importances[row] = metadata.get("importance") or 0
+        self.type_codes[row] = self._event_types.setdefault(metadata.get("event_type") or "", len(self._event_types))
+        self.alive[row] = True
+        self.descriptions[row] = description
+        self.metadatas[row] = metadata
+        self._used_rows = max(self._used_rows, row + 1)
+
+    def _release(self, event_id: int) -> bool:
+        row = self._rows.pop(event_id, None)
+        if row is None:
+            return False
+        self.alive[row] = False
+        self.descriptions[row] = None
+        self.metadatas[row] = None
+        return True
+
+    def _row_for(self, event_id: int) -> int:
+        row = self._rows.get(event_id)
+        if row is not None:
+            return row
+        if self._free_rows:
+            return self._free_rows.pop()
+        self._grow(self._used_rows + 1)
+        row = self._used_rows
+        self._used_rows += 1
+        return row
+
+    # ==================== ESCRITURA ====================
+
+    def _build_metadata(self, event: Event, description: str) -> Dict[str, Any]:
+        return {
+            "event_id": event.id,
+            "game_id": event.game_id,
+            "nation_id": event.nation_id,
+            "turn_id": event.turn_id,
+            "turn_number": event.turn_number,
+            "event_type": event.event_type,
+            "importance": event.importance,
+            "created_at": str(event.created_at),
+            "content_hash": content_hash(self.embedding_model.model_name, description),
+            "embedding_model": self.embedding_model.model_name,
+        }
+
+    def add_event(self, event: Event) -> bool:
+        return self.add_events_batch([event]) == 1
+
+    def add_events_batch(self, events: List[Event]) -> int:
+        if not events:
+            return 0
+
+        try:
+            descriptions = [self._create_event_description(event) for event in events]
+            embeddings = np.asarray(self.embedding_model.encode(descriptions), dtype=np.float32)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+
+            with self._lock:
+                # Un mismo evento repetido en el lote ocupa una sola fila
+                batch_rows: Dict[int, int] = {}
+                for event in events:
+                    if event.id not in batch_rows:
+                        batch_rows[event.id] = self._row_for(event.id)
+                rows = [batch_rows[event.id] for event in events]
+                self.vectors[rows] = embeddings.astype(self.dtype)
+                self.vectors.flush()
+
+                lines = []
+                for event, row, description in zip(events, rows, descriptions):
+                    self._assign(row, event.id, description, self._build_metadata(event, description))
+                    lines.append(self._log_line(row, event.id))
+                self._append_log(lines)
+
+            return len(events)
+        except Exception as exc:
+            logger.exception("Error añadiendo eventos al NumPy Vector Store: %s", exc)
+            return 0
+
+    # ==================== LECTURA ====================
+
+    def _filter_rows(
+        self,
+        nation_id: Optional[int] = None,
+        event_type: Optional[str] = None,
+        min_importance: int = 0,
+        game_id: Optional[int] = None,
+    ) -> np.ndarray:
+        """Filas vivas que cumplen los filtros (antes de calcular similitudes)"""
+        used = self._used_rows
+        mask = self.alive[:used].copy()
+        if game_id is not None:
+            mask &= self.game_ids[:used] == game_id
+        if nation_id is not None:
+            mask &= self.nation_ids[:used] == nation_id
+        if event_type:
+            code = self._event_types.get(event_type)
+            if code is None:
+                return np.zeros(0, dtype=np.int64)
+            mask &= self.type_codes[:used] == code
+        if min_importance > 0:
+            mask &= self.importances[:used] >= min_importance
+        return np.flatnonzero(mask)
+
+    def search_relevant_events(
+        self,
+        query: str,
+        n_results: int = 5,
+        nation_id: Optional[int] = None,
+        event_type: Optional[str] = None,
+        min_importance: int = 0,
+        game_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        return self.search_relevant_events_batch([query], n_results, nation_id, event_type, min_importance, game_id)[0]
+
+    def search_relevant_events_batch(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        nation_id: Optional[int] = None,
+        event_type: Optional[str] = None,
+        min_importance: int = 0,
+        game_id: Optional[int] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        try:
+            query_embeddings = np.asarray(self.embedding_model.encode(list(queries)), dtype=np.float32)
+            norms = np.linalg.norm(query_embeddings, axis=1, keepdims=True)
+            query_embeddings = query_embeddings / np.clip(norms, 1e-12, None)
+
+            with self._lock:
+                candidates = self._filter_rows(nation_id, event_type, min_importance, game_id)
+                if n_results <= 0 or len(candidates) == 0:
+                    return [[] for _ in queries]
+
+                # Top-k por bloques: cada bloque (filas x consultas) se fusiona
+                # con los k mejores acumulados de cada consulta
+                best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+                best_scores = np.zeros((len(queries), 0), dtype=np.float32)
+                for start in range(0, len(candidates), SEARCH_BLOCK_ROWS):
+                    block = candidates[start:start + SEARCH_BLOCK_ROWS]
+                    scores = query_embeddings @ self.vectors[block].astype(np.float32).T
+                    best_rows = np.concatenate([best_rows, np.broadcast_to(block, scores.shape)], axis=1)
+                    best_scores = np.concatenate([best_scores, scores], axis=1)
+                    if best_scores.shape[1] > n_results:
+                        keep = np.argpartition(-best_scores, n_results - 1, axis=1)[:, :n_results]
+                        best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                        best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+                order = np.argsort(-best_scores, axis=1, kind="stable")
+                return [
+                    [
+                        {
+                            "id": f"event_{int(self.event_ids[best_rows[q, i]])}",
+                            "description": self.descriptions[best_rows[q, i]],
+                            "metadata": self.metadatas[best_rows[q, i]],
+                            "distance": float(1.0 - best_scores[q, i]),
+                        }
+                        for i in order[q]
+                    ]
+                    for q in range(len(queries))
+                ]
+        except Exception as exc:
+            logger.exception("Error buscando eventos en NumPy Vector Store: %s", exc)
+            return [[] for _ in queries]
+
+    def get_nation_history(self, nation_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+        try:
+            with self._lock:
+                rows = self._filter_rows(nation_id=nation_id)
+                # Los ids de evento son crecientes: id descendente = más recientes primero
+                rows = rows[np.argsort(-self.event_ids[rows], kind="stable")][:limit]
+                return [
+                    {
+                        "id": f"event_{int(self.event_ids[row])}",
+                        "description": self.descriptions[row],
+                        "metadata": self.metadatas[row],
+                    }
+                    for row in rows
+                ]
+        except Exception as exc:
+            logger.exception("Error obteniendo historial desde NumPy Vector Store: %s", exc)
+            return []
+
+    def get_nation_histories(self, nation_ids: List[int], limit: int = 10) -> Dict[int, List[Dict[str, Any]]]:
+        return {nation_id: self.get_nation_history(nation_id, limit) for nation_id in nation_ids}
+
+    def get_index_manifest(self) -> Dict[int, str]:
+        with self._lock:
+            return {
+                event_id: self.metadatas[row].get("content_hash", "")
+                for event_id, row in self._rows.items()
+            }
+
+    def delete_events(self, event_ids: List[int]) -> int:
+        with self._lock:
+            deleted = [event_id for event_id in event_ids if self._release(event_id)]
+            if deleted:
+                self._free_rows = sorted(
+                    (row for row in range(self._used_rows) if not self.alive[row]), reverse=True
+                )
+                self._append_log([json.dumps({"deleted": deleted}) + "\n"])
+        return len(deleted)
+
+    def clear_collection(self) -> bool:
+        try:
+            with self._lock:
+                self.vectors.flush()
+                del self.vectors
+                for path in (self.vectors_path, self.log_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+                self._open_vectors(INITIAL_CAPACITY)
+                self._reset_arrays(INITIAL_CAPACITY)
+            logger.info("NumPy Vector Store limpiado: %s", self.directory)
+            return True
+        except Exception as exc:
+            logger.exception("Error limpiando NumPy Vector Store: %s", exc)
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total_events = len(self._rows)
+            capacity = len(self.alive)
+        return {
+            "backend": "numpy",
+            "collection_name": self.vectors_path,
+            "total_events": total_events,
+            "capacity": capacity,
+            "dtype": self.dtype_name,
+            "embedding_model": self.embedding_model.model_name,
+            "embedding_dimension": self.embedding_dimension,
+            "embedding_cache": self.embedding_model.cache.get_stats(),
+        }
+
+    def _create_event_description(self, event: Event) -> str:
+        parts = [f"Turno {event.turn_id}:", event.description]
+
+        if event.data:
+            if "target" in event.data:
+                parts.append(f"Objetivo: {event.data['target']}")
+            if "result" in event.data:
+                parts.append(f"Resultado: {event.data['result']}")
+
+        if event.importance >= 8:
+            parts.append("(Evento crítico)")
+        elif event.importance >= 6:
+            parts.append("(Evento importante)")
+
+        return " ".join(parts)
@@ -0,0 +1,214 @@
+"""
+Compactación de la memoria RAG
+Resume los eventos poco importantes de cada era (bloque de K turnos) en un
+documento por nación y los retira del vector store
+"""
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+
+from ..config import settings
+from ..models.database import after_commit, unit_of_work
+from ..models.event import Event
+from ..models.turn import Turn
+from ..schemas.event_schema import EventCreate
+from .event_service import EventService
+from .nation_service import NationService
+
+
+SUMMARY_EVENT_TYPE = "summary"
+
+# Marca en Event.data de los eventos ya resumidos (fuera del vector store)
+COMPACTED_FLAG = "rag_compacted"
+
+# Etiquetas de los tipos de evento en el texto del resumen
+EVENT_TYPE_LABELS = {
+    "economic_report": "informes económicos",
+    "ECONOMIC": "acciones económicas",
+    "recruit": "reclutamientos",
+    "MILITARY": "acciones militares",
+    "DIPLOMATIC": "acciones diplomáticas",
+}
+
+
+def is_compacted(event: Event) -> bool:
+    """True si el evento se resumió y ya no debe estar en el vector store"""
+    return bool((event.data or {}).get(COMPACTED_FLAG))
+
+
+class RAGCompactionService:
+    """
+    Compactación jerárquica de la memoria de los agentes.
+
+    Cada RAG_COMPACTION_EVERY_TURNS turnos, los eventos con importancia menor
+    que RAG_COMPACTION_MAX_IMPORTANCE de las eras ya cerradas (las que
+    terminan al menos RAG_COMPACTION_KEEP_TURNS turnos atrás) se agrupan por
+    nación y era en un evento "summary" generado con plantillas (sin LLM).
+
+    - El resumen se guarda en la BD y se indexa como cualquier evento.
+    - Los eventos originales siguen en la BD marcados con data["rag_compacted"]
+      y se eliminan del vector store tras el commit; reindex y sync los saltan.
+
+    Así el vector store crece con los eventos importantes y un resumen por
+    nación y era, no con cada informe económico.
+    """
+
+    @staticmethod
+    def is_due(turn_number: int) -> bool:
+        """¿Toca compactar al cerrar este turno?"""
+        every = settings.RAG_COMPACTION_EVERY_TURNS
+        return settings.RAG_ENABLED and every > 0 and turn_number % every == 0
+
+
+    @staticmethod
+    def compact(db: Session, current_turn_number: int, game_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Compactar todas las eras cerradas pendientes de una partida.
+
+        El punto de partida es el to_turn del último resumen de la partida.
+        Los vectores de los eventos resumidos se podan después del commit.
+
+        Args:
+            db: Sesión de base de datos
+            current_turn_number: Turno que se acaba de jugar
+            game_id: Partida a compactar (None = todas, una sola partida por BD)
+
+        Returns:
+            dict: Resumen (eras, summaries_created, events_compacted, from_turn, to_turn)
+        """
+        every = max(1, settings.RAG_COMPACTION_EVERY_TURNS)
+        # Última era cerrada: termina en un múltiplo de K y fuera de la ventana reciente
+        to_turn = (current_turn_number - settings.RAG_COMPACTION_KEEP_TURNS) // every * every
+        from_turn = RAGCompactionService._last_compacted_turn(db, game_id) + 1
+        summary = {"eras": 0, "summaries_created": 0, "events_compacted": 0, "from_turn": from_turn, "to_turn": to_turn}
+        if to_turn < from_turn:
+            return summary
+
+        query = (
+            db.query(Event, Turn.turn_number)
+            .join(Turn, Event.turn_id == Turn.id)
+            .filter(
+                Turn.turn_number >= from_turn,
+                Turn.turn_number <= to_turn,
+                Event.importance < settings.RAG_COMPACTION_MAX_IMPORTANCE,
+                Event.event_type != SUMMARY_EVENT_TYPE
+            )
+        )
+        if game_id is not None:
+            query = query.filter(Turn.game_id == game_id)
+        rows = query.order_by(Event.id).all()
+
+        # (era, nation_id) -> eventos
+        groups: Dict[tuple, List[tuple]] = defaultdict(list)
+        for event, turn_number in rows:
+            if not is_compacted(event):
+                groups[((turn_number - 1) // every, event.nation_id)].append((event, turn_number))
+
+        turn_ids = RAGCompactionService._turn_ids(db, from_turn, to_turn, game_id)
+        pruned_ids: List[int] = []
+        eras = set()
+        # Dentro de un turno se confirma con él; suelta, en una sola transacción
+        with unit_of_work(db):
+            for (era, nation_id), events in sorted(groups.items(), key=lambda item: item[0]):
+                era_start, era_end = era * every + 1, (era + 1) * every
+                summary_event = EventService.create(db, EventCreate(
+                    turn_id=turn_ids.get(era_end) or events[-1][0].turn_id,
+                    nation_id=nation_id,
+                    game_id=game_id,
+                    event_type=SUMMARY_EVENT_TYPE,
+                    description=RAGCompactionService._describe(db, nation_id, era_start, era_end, events),
+                    data={
+                        "from_turn": era_start,
+                        "to_turn": era_end,
+                        "events_compacted": len(events),
+                        "event_types": RAGCompactionService._count_types(events),
+                    },
+                    importance=max(event.importance or 1 for event, _ in events)
+                ))
+                for event, _ in events:
+                    event.data = dict(event.data or {}, **{COMPACTED_FLAG: True, "summary_event_id": summary_event.id})
+                    flag_modified(event, "data")
+                    pruned_ids.append(event.id)
+                eras.add(era)
+
+            if pruned_ids:
+                after_commit(db, lambda: RAGCompactionService._prune_vectors(pruned_ids))
+
+        summary.update(eras=len(eras), summaries_created=len(groups), events_compacted=len(pruned_ids))
+        print(
+            f"🗜️ Memoria compactada (turnos {from_turn}-{to_turn}): "
+            f"{len(pruned_ids)} eventos → {len(groups)} resúmenes"
+        )
+        return summary
+
+
+    @staticmethod
+    def _last_compacted_turn(db: Session, game_id: Optional[int] = None) -> int:
+        """Último turno ya cubierto por un resumen de la partida (0 si nunca se compactó)"""
+        query = db.query(Event).filter(Event.event_type == SUMMARY_EVENT_TYPE)
+        if game_id is not None:
+            query = query.filter(Event.game_id == game_id)
+        last_summary = query.order_by(Event.id.desc()).first()
+        return int((last_summary.data or {}).get("to_turn", 0)) if last_summary else 0
+
+
+    @staticmethod
+    def _turn_ids(db: Session, from_turn: int, to_turn: int, game_id: Optional[int] = None) -> Dict[int, int]:
+        query = db.query(Turn.turn_number, Turn.id).filter(
+            Turn.turn_number >= from_turn, Turn.turn_number <= to_turn
+        )
+        if game_id is not None:
+            query = query.filter(Turn.game_id == game_id)
+        rows = query.all()
+        return {turn_number: turn_id for turn_number, turn_id in rows}
+
+
+    @staticmethod
+    def _count_types(events: List[tuple]) -> Dict[str, int]:
+        counts: Dict[str, int] = defaultdict(int)
+        for event, _ in events:
+            counts[event.event_type] += 1
+        return dict(counts)
+
+
+    @staticmethod
+    def _describe(db: Session, nation_id: int, era_start: int, era_end: int, events: List[tuple]) -> str:
+        """Texto del resumen: recuento por tipo con los totales relevantes"""
+        nation = NationService.get_by_id(db, nation_id)
+        name = nation.name if nation else f"Nación {nation_id}"
+
+        parts = []
+        for event_type, count in sorted(RAGCompactionService._count_types(events).items(), key=lambda item: -item[1]):
+            typed = [event for event, _ in events if event.event_type == event_type]
+            label = EVENT_TYPE_LABELS.get(event_type, f"eventos '{event_type}'")
+            detail = RAGCompactionService._detail(event_type, typed)
+            parts.append(f"{count} {label}{f' ({detail})' if detail else ''}")
+
+        text = f"Resumen de {name}, turnos {era_start}-{era_end}: " + ", ".join(parts) + "."
+        return text if len(text) <= 500 else text[:497] + "..."
+
+
+    @staticmethod
+    def _detail(event_type: str, events: List[Event]) -> Optional[str]:
+        if event_type == "economic_report":
+            balance = sum((event.data or {}).get("net_change", 0) for event in events)
+            return f"balance total {'+' if balance > 0 else ''}{balance} oro"
+        if event_type == "recruit":
+            troops = sum((event.data or {}).get("amount", 0) for event in events)
+            return f"{troops} tropas"
+        return None
+
+
+    @staticmethod
+    def _prune_vectors(event_ids: List[int]) -> None:
+        """
+        Eliminar del vector store los eventos ya resumidos.
+
+        El borrado va a la cola del indexador, detrás de las inserciones
+        pendientes: el turno no espera y ningún evento podado vuelve a añadirse.
+        """
+        from .rag_indexer import get_rag_indexer
+
+        get_rag_indexer().enqueue_delete(event_ids, reason="compactación")
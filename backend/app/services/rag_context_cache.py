@@ -0,0 +1,118 @@
+"""
+Caché del contexto RAG de los agentes
+Reutiliza la salida de get_context_for_agent mientras no se indexen eventos
+que puedan cambiarla
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .metrics_service import get_metrics_service
+
+
+metrics = get_metrics_service()
+
+# Importancia mínima de los "eventos del mundo" que entran en el contexto
+CONTEXT_MIN_IMPORTANCE = 5
+
+
+class RAGContextCache:
+    """
+    LRU de contextos con invalidación por marcas de agua (watermarks).
+
+    El contexto de una nación depende de dos cosas del índice:
+
+    - los eventos con importancia >= CONTEXT_MIN_IMPORTANCE (búsqueda del
+      mundo): versión por partida, o global `world_version` si la búsqueda
+      no se limita a una partida
+    - los eventos de esa nación (su historial): versión por nación
+
+    Ambas crecen de forma monótona al indexar (note_indexed) y todas a la vez
+    al borrar o limpiar el índice (note_reset). La clave incluye las
+    versiones leídas ANTES de calcular el contexto, así que una entrada
+    calculada mientras se indexaba queda obsoleta sola, sin borrados
+    explícitos. Thread-safe.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._world_version = 0
+        self._game_world_versions: Dict[int, int] = {}
+        self._nation_versions: Dict[int, int] = {}
+        # Borrados/limpiezas: invalidan también las versiones por nación
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+
+    def key(self, nation_id: int, situation: str, max_events: int, game_id: Optional[int] = None) -> Tuple:
+        """Clave con las versiones actuales del índice (tomar antes de calcular)"""
+        with self._lock:
+            world_version = (
+                self._world_version if game_id is None else self._game_world_versions.get(game_id, 0)
+            )
+            return (
+                nation_id, situation, max_events, game_id,
+                self._epoch, world_version, self._nation_versions.get(nation_id, 0)
+            )
+
+
+    def get(self, key: Tuple) -> Optional[str]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            context = self._entries.get(key)
+            if context is None:
+                self._stats["misses"] += 1
+            else:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+        metrics.inc("nationmind_rag_context_cache_total", result="miss" if context is None else "hit")
+        return context
+
+
+    def put(self, key: Tuple, context: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = context
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+    def note_indexed(self, events: Iterable[Any]) -> None:
+        """Subir las marcas de agua afectadas por eventos (re)indexados"""
+        with self._lock:
+            for event in events:
+                if (event.importance or 0) >= CONTEXT_MIN_IMPORTANCE:
+                    self._world_version += 1
+                    # Un evento solo cambia el contexto de su propia partida
+                    if event.game_id is not None:
+                        self._game_world_versions[event.game_id] = self._game_world_versions.get(event.game_id, 0) + 1
+                self._nation_versions[event.nation_id] = self._nation_versions.get(event.nation_id, 0) + 1
+
+
+    def note_reset(self) -> None:
+        """Invalidar todo (eventos borrados o colección limpiada)"""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["world_version"] = self._world_version
+            stats["epoch"] = self._epoch
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
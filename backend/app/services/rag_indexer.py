@@ -0,0 +1,305 @@
+"""
+Indexación RAG en segundo plano (write-behind)
+Saca el embedding y la inserción vectorial del camino de la petición/turno
+"""
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+from ..config import settings
+from ..models.event import Event
+from .metrics_service import get_metrics_service
+
+
+# Espera máxima a que se vacíe la cola cuando un borrado no cabe en ella
+DELETE_FALLBACK_FLUSH_SECONDS = 30
+
+
+def detached_event_copy(event: Event) -> Event:
+    """
+    Copia del evento sin sesión de BD.
+
+    El worker indexa desde otro hilo, cuando la sesión original puede estar
+    cerrada; la copia lleva ya todos los campos que usa el RAG.
+    """
+    copy = Event(
+        id=event.id,
+        game_id=event.game_id,
+        turn_id=event.turn_id,
+        nation_id=event.nation_id,
+        event_type=event.event_type,
+        description=event.description,
+        data=event.data,
+        importance=event.importance,
+        created_at=event.created_at
+    )
+    copy.turn_number = event.turn_number
+    return copy
+
+
+class _Deletion:
+    """Borrado de vectores encolado detrás de las inserciones pendientes"""
+
+    def __init__(self, event_ids: List[int], reason: str):
+        self.event_ids = list(event_ids)
+        self.reason = reason
+
+
+class RAGIndexer:
+    """
+    Cola acotada de eventos pendientes de indexar en la memoria RAG.
+
+    - EventService encola el evento tras el commit (after_commit); el turno
+      no espera al embedding.
+    - Un hilo worker agrupa hasta RAG_INDEX_BATCH_SIZE eventos (o lo que
+      llegue en RAG_INDEX_FLUSH_SECONDS), rellena su turn_number con una
+      consulta por lote y llama a add_events_batch.
+    - Si la cola está llena, el evento se indexa en el hilo que lo encola
+      (contrapresión en lugar de perder eventos).
+    - Con RAG_INDEX_MODE=sync se indexa siempre en línea (comportamiento anterior).
+    - enqueue_delete() pone el borrado de vectores en la misma cola: el worker
+      lo ejecuta después de las inserciones encoladas antes, así que un evento
+      pendiente no reaparece tras podarlo y nadie espera al indexador.
+    - flush() espera a que se vacíe la cola; el lifespan de FastAPI lo llama
+      al cerrar.
+
+    Métricas: nationmind_rag_index_lag_seconds (encolado → indexado) y
+    nationmind_rag_indexed_events_total{result}.
+    """
+
+    def __init__(
+        self,
+        mode: str = "async",
+        max_queue_size: int = 1000,
+        batch_size: int = 32,
+        flush_seconds: float = 0.5
+    ):
+        self.mode = mode
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.metrics = get_metrics_service()
+        self._queue: "queue.Queue[Tuple[Union[Event, _Deletion], float]]" = queue.Queue(maxsize=max(1, max_queue_size))
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        # Instantes de encolado de los eventos pendientes (orden FIFO, como la cola)
+        self._pending_since: Deque[float] = deque()
+        self._stats = {"indexed": 0, "failed": 0, "deleted": 0, "sync_fallbacks": 0, "batches": 0}
+
+
+    def enqueue(self, event: Event) -> None:
+        """
+        Programar la indexación de un evento ya confirmado en BD.
+
+        El evento no debe depender de una sesión abierta (ver detached_event_copy).
+        """
+        item = (event, time.perf_counter())
+        if self.mode == "sync":
+            self._index_batch([item])
+            return
+
+        with self._lock:
+            try:
+                self._queue.put_nowait(item)
+                self._pending_since.append(item[1])
+                queued = True
+            except queue.Full:
+                self._stats["sync_fallbacks"] += 1
+                queued = False
+
+        if queued:
+            self._ensure_worker()
+        else:
+            # Cola llena: indexar aquí mismo (más lento, pero no se pierde)
+            self._index_batch([item])
+
+
+    def enqueue_delete(self, event_ids: List[int], reason: str) -> None:
+        """
+        Programar la eliminación de vectores tras las inserciones ya encoladas.
+
+        Args:
+            event_ids: IDs de los eventos a retirar del vector store
+            reason: Motivo para el log ("compactación", "partida eliminada"...)
+        """
+        if not event_ids:
+            return
+        item = (_Deletion(event_ids, reason), time.perf_counter())
+        if self.mode == "sync":
+            self._process([item])
+            return
+
+        with self._lock:
+            try:
+                self._queue.put_nowait(item)
+                self._pending_since.append(item[1])
+                queued = True
+            except queue.Full:
+                self._stats["sync_fallbacks"] += 1
+                queued = False
+
+        if queued:
+            self._ensure_worker()
+        else:
+            # Cola llena: esperar a las inserciones pendientes y borrar aquí
+            self.flush(DELETE_FALLBACK_FLUSH_SECONDS)
+            self._process([item])
+
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Esperar a que se indexen todos los eventos encolados; True si se vació a tiempo"""
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(
+                lambda: self._queue.unfinished_tasks == 0, timeout
+            )
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estado de la cola para /api/memory/stats"""
+        with self._lock:
+            oldest = self._pending_since[0] if self._pending_since else None
+            stats = dict(self._stats)
+        stats.update(
+            mode=self.mode,
+            pending=self._queue.unfinished_tasks,
+            lag_seconds=round(time.perf_counter() - oldest, 3) if oldest is not None else 0.0
+        )
+        return stats
+
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run_worker, name="rag-indexer", daemon=True)
+                self._worker.start()
+
+
+    def _run_worker(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._process(batch)
+            finally:
+                with self._lock:
+                    for _ in batch:
+                        self._pending_since.popleft()
+                for _ in batch:
+                    self._queue.task_done()
+
+
+    def _process(self, items: List[Tuple[Union[Event, _Deletion], float]]) -> None:
+        """Ejecutar los elementos en orden de cola: lotes de inserción y borrados"""
+        pending: List[Tuple[Event, float]] = []
+        for item in items:
+            if isinstance(item[0], _Deletion):
+                if pending:
+                    self._index_batch(pending)
+                    pending = []
+                self._delete(item[0])
+            else:
+                pending.append(item)
+        if pending:
+            self._index_batch(pending)
+
+
+    def _delete(self, deletion: _Deletion) -> None:
+        """Eliminar vectores del store (nunca lanza: /api/memory/sync lo corrige)"""
+        try:
+            from .rag_service import get_rag_service
+            deleted = get_rag_service().delete_events(deletion.event_ids)
+            print(f"🗑️ {deleted} eventos eliminados del vector store ({deletion.reason})")
+        except Exception as e:
+            print(
+                f"⚠️ Warning: No se pudieron eliminar {len(deletion.event_ids)} eventos del vector store "
+                f"({deletion.reason}); se corregirá con /api/memory/sync: {e}"
+            )
+            deleted = 0
+
+        with self._lock:
+            self._stats["deleted"] += deleted
+
+
+    @staticmethod
+    def _attach_turn_numbers(events: List[Event]) -> None:
+        """turn_number de los eventos del lote: una consulta por lote, fuera del turno"""
+        from ..models.database import SessionLocal
+        from .event_service import EventService
+
+        missing = [event for event in events if event.turn_number is None and event.turn_id is not None]
+        if not missing:
+            return
+        db = SessionLocal()
+        try:
+            EventService.attach_turn_numbers(db, missing)
+        except Exception as e:
+            # Sin turn_number el ranking usa turn_id: se indexa igualmente
+            print(f"⚠️ Warning: No se pudo obtener el número de turno de {len(missing)} eventos: {e}")
+        finally:
+            db.close()
+
+
+    def _index_batch(self, batch: List[Tuple[Event, float]]) -> None:
+        """Indexar un lote y registrar métricas (nunca lanza)"""
+        events = [event for event, _ in batch]
+        self._attach_turn_numbers(events)
+        try:
+            from .rag_service import get_rag_service
+            added = get_rag_service().add_events_batch(events)
+        except Exception as e:
+            print(f"⚠️ Warning: No se pudieron indexar {len(events)} eventos en RAG: {e}")
+            added = 0
+
+        now = time.perf_counter()
+        for _, enqueued_at in batch:
+            self.metrics.observe("nationmind_rag_index_lag_seconds", now - enqueued_at)
+        failed = len(events) - added
+        self.metrics.inc("nationmind_rag_indexed_events_total", added, result="indexed")
+        if failed:
+            self.metrics.inc("nationmind_rag_indexed_events_total", failed, result="failed")
+
+        with self._lock:
+            self._stats["indexed"] += added
+            self._stats["failed"] += failed
+            self._stats["batches"] += 1
+
+
+# ==================== INSTANCIA GLOBAL ====================
+
+_rag_indexer_instance = None
+_rag_indexer_lock = threading.Lock()
+
+def get_rag_indexer() -> RAGIndexer:
+    """
+    Obtener instancia singleton del indexador RAG.
+
+    Returns:
+        RAGIndexer: Instancia compartida
+    """
+    global _rag_indexer_instance
+    with _rag_indexer_lock:
+        if _rag_indexer_instance is None:
+            _rag_indexer_instance = RAGIndexer(
+                mode=settings.RAG_INDEX_MODE,
+                max_queue_size=settings.RAG_INDEX_QUEUE_SIZE,
+                batch_size=settings.RAG_INDEX_BATCH_SIZE,
+                flush_seconds=settings.RAG_INDEX_FLUSH_SECONDS
+            )
+    return _rag_indexer_instance
+
+
+def flush_rag_indexer(timeout: Optional[float] = None) -> bool:
+    """Vaciar la cola si el indexador llegó a crearse (cierre de la app, simulaciones)"""
+    if _rag_indexer_instance is None:
+        return True
+    return _rag_indexer_instance.flush(timeout)
@@ -0,0 +1,383 @@
+"""
+Mantenimiento de la memoria RAG
+Reindexado en streaming y reanudable desde la base de datos, y
+sincronización incremental (solo eventos nuevos, modificados o huérfanos)
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from ..config import settings
+from ..models.event import Event
+from .event_service import EventService
+from .rag_compaction import is_compacted
+
+
+class ReindexConflictError(Exception):
+    """Ya hay un reindexado o una sincronización en curso"""
+
+
+class ReindexCheckpoint:
+    """
+    Cursor del reindexado persistido en un fichero JSON.
+
+    Se reescribe de forma atómica (fichero temporal + os.replace) tras cada
+    lote, así que tras un fallo nunca queda a medias.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Checkpoint de reindexado ilegible, se empieza de cero: {e}")
+            return None
+
+    def save(self, data: Dict[str, Any]) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ReindexService:
+    """
+    Reindexado de todos los eventos de la BD en la memoria RAG.
+
+    - Pagina por clave (id > cursor ORDER BY id LIMIT n): coste constante por
+      página y memoria acotada, sin el límite de 1000 eventos de antes.
+    - Cada página se embebe e inserta con add_events_batch, que hace upsert
+      (repetir un lote es idempotente).
+    - Tras cada lote guarda el cursor en RAG_REINDEX_CHECKPOINT_FILE; con
+      resume=True se continúa desde ahí después de un fallo o reinicio.
+    - Un solo reindexado a la vez; el progreso (procesados, total,
+      eventos/s) se consulta con get_status().
+
+    sync() es la alternativa incremental: compara los ids y el content_hash
+    (texto de _create_event_description + modelo) de la BD con los del vector
+    store, embebe solo lo que falta o está obsoleto y borra los huérfanos.
+    Comparte el candado con el reindexado (operation = "reindex" | "sync").
+    """
+
+    def __init__(self, checkpoint_path: str):
+        self.checkpoint = ReindexCheckpoint(checkpoint_path)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._status: Dict[str, Any] = {"status": "idle"}
+
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            status = dict(self._status)
+        checkpoint = self.checkpoint.load()
+        status["checkpoint"] = checkpoint
+        return status
+
+
+    def start(self, resume: bool = True, batch_size: int = 256) -> Dict[str, Any]:
+        """
+        Lanzar el reindexado en un hilo en segundo plano.
+
+        Raises:
+            ReindexConflictError: Si ya hay uno en curso
+        """
+        return self._start("reindex", lambda: self._reindex(resume, batch_size, None))
+
+
+    def run(
+        self,
+        resume: bool = True,
+        batch_size: int = 256,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Reindexar en el hilo actual.
+
+        Returns:
+            dict: Resumen (events_added, elapsed_seconds, events_per_second...)
+
+        Raises:
+            ReindexConflictError: Si ya hay uno en curso
+        """
+        self._claim("reindex")
+        return self._run_safely("reindex", lambda: self._reindex(resume, batch_size, progress_callback))
+
+
+    def start_sync(self, batch_size: int = 256) -> Dict[str, Any]:
+        """
+        Lanzar la sincronización incremental en un hilo en segundo plano.
+
+        Raises:
+            ReindexConflictError: Si ya hay un reindexado o sync en curso
+        """
+        return self._start("sync", lambda: self._sync(batch_size, None))
+
+
+    def sync(
+        self,
+        batch_size: int = 256,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Sincronizar en el hilo actual.
+
+        Returns:
+            dict: Resumen (scanned, missing, stale, indexed, orphans_deleted...)
+
+        Raises:
+            ReindexConflictError: Si ya hay un reindexado o sync en curso
+        """
+        self._claim("sync")
+        return self._run_safely("sync", lambda: self._sync(batch_size, progress_callback))
+
+
+    def _claim(self, operation: str) -> None:
+        with self._lock:
+            if self._status.get("status") == "running":
+                running = self._status.get("operation", "reindex")
+                raise ReindexConflictError(f"Ya hay una operación '{running}' en curso")
+            self._status = {"status": "running", "operation": operation}
+
+
+    def _start(self, operation: str, job: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        self._claim(operation)
+        self._thread = threading.Thread(
+            target=self._run_in_background, args=(operation, job), name=f"rag-{operation}", daemon=True
+        )
+        self._thread.start()
+        return self.get_status()
+
+
+    def _run_in_background(self, operation: str, job: Callable[[], Dict[str, Any]]) -> None:
+        try:
+            self._run_safely(operation, job)
+        except Exception:
+            pass  # Ya registrado en el estado (status=failed)
+
+
+    def _run_safely(self, operation: str, job: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        try:
+            summary = job()
+        except Exception as e:
+            print(f"❌ Operación '{operation}' interrumpida: {e}")
+            with self._lock:
+                self._status.update(status="failed", error=str(e), finished_at=datetime.utcnow().isoformat())
+            raise
+        with self._lock:
+            self._status = dict(summary, status="completed", operation=operation)
+        return summary
+
+
+    def _update_progress(self, progress: Dict[str, Any], callback) -> None:
+        with self._lock:
+            self._status.update(progress)
+        if callback is not None:
+            callback(dict(progress))
+
+
+    def _reindex(self, resume: bool, batch_size: int, progress_callback) -> Dict[str, Any]:
+        from ..models.database import SessionLocal
+        from .rag_service import get_rag_service
+
+        batch_size = max(1, batch_size)
+        checkpoint = self.checkpoint.load() if resume else None
+        if not resume:
+            self.checkpoint.clear()
+
+        cursor = checkpoint["last_event_id"] if checkpoint else 0
+        processed = checkpoint["events_added"] if checkpoint else 0
+        started_at = checkpoint["started_at"] if checkpoint else datetime.utcnow().isoformat()
+        if checkpoint:
+            print(f"🔁 Reanudando reindexado desde el evento {cursor} ({processed} ya indexados)")
+
+        rag = get_rag_service()
+        db = SessionLocal()
+        start = time.perf_counter()
+        added_this_run = 0
+        try:
+            remaining = db.query(Event).filter(Event.id > cursor).count()
+            total = processed + remaining
+            print(f"📚 Reindexando {remaining} eventos en lotes de {batch_size}...")
+            self._update_progress({
+                "processed": processed, "total": total, "last_event_id": cursor,
+                "events_per_second": 0.0, "started_at": started_at
+            }, progress_callback)
+
+            while True:
+                events = (
+                    db.query(Event)
+                    .filter(Event.id > cursor)
+                    .order_by(Event.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                if not events:
+                    break
+
+                # Los eventos compactados solo viven en la BD (su resumen sí se indexa)
+                indexable = [event for event in events if not is_compacted(event)]
+                EventService.attach_turn_numbers(db, indexable)
+                added = rag.add_events_batch(indexable)
+                if added < len(indexable):
+                    # El cursor no avanza: al reanudar se repite este lote (upsert)
+                    raise RuntimeError(
+                        f"Solo se indexaron {added}/{len(indexable)} eventos del lote tras el id {cursor}"
+                    )
+
+                cursor = events[-1].id
+                processed += added
+                added_this_run += added
+                self.checkpoint.save({
+                    "last_event_id": cursor,
+                    "events_added": processed,
+                    "started_at": started_at,
+                    "updated_at": datetime.utcnow().isoformat()
+                })
+                # No acumular en la sesión las páginas ya procesadas
+                db.expunge_all()
+
+                elapsed = time.perf_counter() - start
+                self._update_progress({
+                    "processed": processed,
+                    "total": total,
+                    "last_event_id": cursor,
+                    "events_per_second": round(added_this_run / elapsed, 1) if elapsed > 0 else 0.0
+                }, progress_callback)
+        finally:
+            db.close()
+
+        elapsed = time.perf_counter() - start
+        self.checkpoint.clear()
+        summary = {
+            "events_added": processed,
+            "events_added_this_run": added_this_run,
+            "last_event_id": cursor,
+            "elapsed_seconds": round(elapsed, 3),
+            "events_per_second": round(added_this_run / elapsed, 1) if elapsed > 0 else 0.0,
+            "started_at": started_at,
+            "finished_at": datetime.utcnow().isoformat()
+        }
+        print(f"✅ Reindexado completado: {processed} eventos ({summary['events_per_second']} eventos/s)")
+        return summary
+
+
+    def _sync(self, batch_size: int, progress_callback) -> Dict[str, Any]:
+        from ..models.database import SessionLocal
+        from .rag_service import get_rag_service
+
+        batch_size = max(1, batch_size)
+        rag = get_rag_service()
+        started_at = datetime.utcnow().isoformat()
+        start = time.perf_counter()
+
+        # event_id -> content_hash de lo que hay en el vector store
+        manifest = rag.get_index_manifest()
+        print(f"🔎 Sincronizando RAG: {len(manifest)} eventos en el vector store")
+
+        db = SessionLocal()
+        cursor = 0
+        scanned = missing = stale = indexed = 0
+        try:
+            total = db.query(Event).count()
+            self._update_progress({
+                "scanned": 0, "total": total, "missing": 0, "stale": 0, "indexed": 0,
+                "started_at": started_at
+            }, progress_callback)
+
+            while True:
+                events = (
+                    db.query(Event)
+                    .filter(Event.id > cursor)
+                    .order_by(Event.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                if not events:
+                    break
+
+                pending = []
+                for event in events:
+                    # Lo que queda en el manifiesto al final son huérfanos
+                    # (incluidos los eventos compactados que sigan indexados)
+                    indexed_hash = manifest.pop(event.id, None)
+                    if is_compacted(event):
+                        if indexed_hash is not None:
+                            manifest[event.id] = indexed_hash
+                        continue
+                    if indexed_hash is None:
+                        missing += 1
+                        pending.append(event)
+                    elif indexed_hash != rag.event_content_hash(event):
+                        stale += 1
+                        pending.append(event)
+
+                if pending:
+                    EventService.attach_turn_numbers(db, pending)
+                    added = rag.add_events_batch(pending)
+                    if added < len(pending):
+                        raise RuntimeError(
+                            f"Solo se indexaron {added}/{len(pending)} eventos del lote tras el id {cursor}"
+                        )
+                    indexed += added
+
+                cursor = events[-1].id
+                scanned += len(events)
+                db.expunge_all()
+                self._update_progress({
+                    "scanned": scanned, "total": total, "missing": missing,
+                    "stale": stale, "indexed": indexed
+                }, progress_callback)
+        finally:
+            db.close()
+
+        orphans = sorted(manifest)
+        orphans_deleted = rag.delete_events(orphans) if orphans else 0
+
+        elapsed = time.perf_counter() - start
+        summary = {
+            "scanned": scanned,
+            "missing": missing,
+            "stale": stale,
+            "indexed": indexed,
+            "orphans_deleted": orphans_deleted,
+            "elapsed_seconds": round(elapsed, 3),
+            "events_per_second": round(scanned / elapsed, 1) if elapsed > 0 else 0.0,
+            "started_at": started_at,
+            "finished_at": datetime.utcnow().isoformat()
+        }
+        print(
+            f"✅ Sync RAG: {scanned} revisados, {missing} nuevos, {stale} obsoletos, "
+            f"{orphans_deleted} huérfanos eliminados ({elapsed:.2f}s)"
+        )
+        return summary
+
+
+# ==================== INSTANCIA GLOBAL ====================
+
+_reindex_service_instance = None
+_reindex_service_lock = threading.Lock()
+
+def get_reindex_service() -> ReindexService:
+    """
+    Obtener instancia singleton del servicio de reindexado.
+
+    Returns:
+        ReindexService: Instancia compartida
+    """
+    global _reindex_service_instance
+    with _reindex_service_lock:
+        if _reindex_service_instance is None:
+            _reindex_service_instance = ReindexService(settings.RAG_REINDEX_CHECKPOINT_FILE)
+    return _reindex_service_instance
@@ -0,0 +1,76 @@
+"""
+Ranking de la memoria de los agentes
+Reordena los candidatos de la búsqueda vectorial combinando similitud
+semántica, importancia del evento y recencia
+"""
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+
+
+def similarity_from_distance(distance: float, metric: str) -> float:
+    """
+    Similitud coseno a partir de la distancia que devuelve cada backend.
+
+    Chroma usa L2 al cuadrado; entre vectores normalizados es 2·(1 - coseno).
+    Supabase y NumPy devuelven directamente 1 - coseno.
+    """
+    if metric == "l2":
+        return 1.0 - distance / 2.0
+    return 1.0 - distance
+
+
+def overfetch_count(n_results: int) -> int:
+    """Candidatos a pedir al vector store para quedarse con n_results tras el ranking"""
+    return n_results * max(1, settings.RAG_RERANK_OVERFETCH)
+
+
+def rerank_events(
+    events: List[Dict[str, Any]],
+    n_results: int,
+    metric: str,
+    reference_turn: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Ordenar eventos por una puntuación combinada y quedarse con los mejores.
+
+    score = w_sim · similitud + w_imp · importancia/10 + w_rec · recencia
+
+    La recencia decae a la mitad cada RAG_RANK_RECENCY_HALF_LIFE turnos de la
+    partida respecto a reference_turn (por defecto, el turno más reciente
+    entre los candidatos). Se mide en turn_number; si algún candidato se
+    indexó sin él (vectores antiguos) se usa turn_id para todos, ya que las
+    dos escalas no son comparables. Cada evento devuelto lleva su "score".
+
+    Args:
+        events: Resultados de search_relevant_events (con distance y metadata)
+        n_results: Número de eventos a devolver
+        metric: Métrica de distancia del backend ("l2" o "cosine")
+        reference_turn: Turno respecto al que se mide la recencia
+    """
+    if not events:
+        return []
+
+    metadatas = [event.get("metadata") or {} for event in events]
+    key = "turn_number" if all(metadata.get("turn_number") is not None for metadata in metadatas) else "turn_id"
+    turns = [metadata.get(key) or 0 for metadata in metadatas]
+    if reference_turn is None:
+        reference_turn = max(turns)
+    half_life = max(settings.RAG_RANK_RECENCY_HALF_LIFE, 1e-9)
+
+    scored = []
+    for position, (event, turn_id) in enumerate(zip(events, turns)):
+        metadata = event.get("metadata") or {}
+        similarity = similarity_from_distance(event.get("distance", 0.0), metric)
+        importance = min(max((metadata.get("importance") or 0) / 10.0, 0.0), 1.0)
+        recency = 0.5 ** (max(reference_turn - turn_id, 0) / half_life)
+        score = (
+            settings.RAG_RANK_WEIGHT_SIMILARITY * similarity
+            + settings.RAG_RANK_WEIGHT_IMPORTANCE * importance
+            + settings.RAG_RANK_WEIGHT_RECENCY * recency
+        )
+        # A igual puntuación se conserva el orden del vector store
+        scored.append((-score, position, dict(event, score=round(score, 4))))
+
+    scored.sort(key=lambda item: item[:2])
+    return [event for _, _, event in scored[:n_results]]
@@ -2,13 +2,32 @@
 Servicio RAG (Retrieval Augmented Generation)
 Sistema de memoria para agentes IA con almacenamiento vectorial intercambiable.
 """
-import chromadb
+import threading
+import time
 from typing import List, Dict, Any, Optional
-from sentence_transformers import SentenceTransformer
 from sqlalchemy.orm import Session
 
 from ..models.event import Event
 from ..config import settings
+from .metrics_service import get_metrics_service
+from .embedding_cache import CachedEncoder, content_hash
+from .embedding_backends import create_embedding_model, embedding_cache_name
+from .rag_context_cache import CONTEXT_MIN_IMPORTANCE, RAGContextCache
+from .rag_ranking import overfetch_count, rerank_events
+
+
+metrics = get_metrics_service()
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Página al leer el manifiesto de la colección de Chroma
+MANIFEST_PAGE_SIZE = 1000
+
+# Historial por nación en Chroma (collection.get no ordena ni limita por
+# recencia): se leen solo los eventos de los últimos HISTORY_WINDOW_EVENTS
+# ids y la ventana se multiplica por HISTORY_WINDOW_GROWTH hasta reunir `limit`
+HISTORY_WINDOW_EVENTS = 256
+HISTORY_WINDOW_GROWTH = 4
 
 
 class RAGService:
@@ -16,17 +35,48 @@ class RAGService:
     Servicio para gestionar la memoria del sistema usando un vector store.
 
     En desarrollo usa ChromaDB. En producción puede usar Supabase Vector
-    (PostgreSQL + pgvector) sin cambiar el resto de la aplicación.
+    (PostgreSQL + pgvector) sin cambiar el resto de la aplicación. Con
+    VECTOR_BACKEND=numpy usa un índice NumPy en el propio proceso.
+
+    Los backends distintos de Chroma viven en self.store y exponen la misma
+    interfaz que este servicio.
     """
     
     def __init__(self):
         """Inicializar el backend vectorial y el modelo de embeddings."""
 
+        # Imports pesados (torch, sentence_transformers, chromadb) diferidos
+        # hasta crear el servicio: importar la app o scripts CLI no los carga
         self.backend = settings.VECTOR_BACKEND.strip().lower()
 
         # Cargar modelo para crear embeddings
         # sentence-transformers/all-MiniLM-L6-v2 es pequeño y rápido (80MB)
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Backend según EMBEDDING_BACKEND (torch, onnx u onnx-int8), envuelto
+        # en la caché de embeddings (compartida con SupabaseVectorStore)
+        self.embedding_backend = settings.EMBEDDING_BACKEND.strip().lower()
+        self.embedding_model = CachedEncoder(
+            create_embedding_model(EMBEDDING_MODEL_NAME, self.embedding_backend),
+            embedding_cache_name(EMBEDDING_MODEL_NAME, self.embedding_backend)
+        )
+
+        self.store = None
+        # Mayor event_id indexado en Chroma (None = aún no se ha leído de la colección)
+        self._latest_event_id: Optional[int] = None
+        self._latest_event_lock = threading.Lock()
+        # Chroma usa L2 (al cuadrado); pgvector y NumPy, distancia coseno
+        self.distance_metric = "cosine" if self.backend in ("numpy", "supabase") else "l2"
+        # Contextos de agentes en caché hasta que se indexe algo que los cambie
+        self.context_cache = RAGContextCache(settings.RAG_CONTEXT_CACHE_SIZE)
+
+        if self.backend == "numpy":
+            from .numpy_vector_store import NumpyVectorStore
+
+            self.store = NumpyVectorStore(self.embedding_model)
+            stats = self.store.get_stats()
+            print(f"✅ RAG Service inicializado con índice NumPy ({stats['dtype']})")
+            print(f"📁 Vectores: {stats['collection_name']}")
+            print(f"📊 Eventos en colección: {stats['total_events']}")
+            return
 
         if self.backend == "supabase":
             from .supabase_vector_store import SupabaseVectorStore
@@ -39,6 +89,8 @@ class RAGService:
             print(f"📊 Eventos en colección: {stats['total_events']}")
             return
 
+        import chromadb
+
         # Configurar ChromaDB según el modo (HTTP para Docker, Persistent para local)
         if settings.USE_CHROMADB_HTTP:
             # Modo Docker: conectar a ChromaDB como servicio HTTP
@@ -78,7 +130,15 @@ class RAGService:
         Returns:
             bool: True si se añadió correctamente
         """
-        if self.backend == "supabase":
+        # Tras escribir (aunque falle a medias) se invalidan los contextos afectados
+        try:
+            return self._add_event(event)
+        finally:
+            self.context_cache.note_indexed([event])
+    
+    
+    def _add_event(self, event: Event) -> bool:
+        if self.store is not None:
             return self.store.add_event(event)
 
         try:
@@ -89,22 +149,16 @@ class RAGService:
             embedding = self.embedding_model.encode(event_text).tolist()
             
             # Metadata para filtrar búsquedas
-            metadata = {
-                "event_id": event.id,
-                "nation_id": event.nation_id,
-                "turn_id": event.turn_id,
-                "event_type": event.event_type,
-                "importance": event.importance,
-                "created_at": str(event.created_at)
-            }
+            metadata = self._event_metadata(event, event_text)
             
-            # Añadir a ChromaDB
-            self.collection.add(
+            # Añadir a ChromaDB (upsert: reindexar el mismo evento es idempotente)
+            self.collection.upsert(
                 embeddings=[embedding],
                 documents=[event_text],
                 metadatas=[metadata],
                 ids=[f"event_{event.id}"]
             )
+            self._note_latest_event_id([event])
             
             return True
             
@@ -126,7 +180,15 @@ class RAGService:
         if not events:
             return 0
 
-        if self.backend == "supabase":
+        # Tras escribir (aunque falle a medias) se invalidan los contextos afectados
+        try:
+            return self._add_events_batch(events)
+        finally:
+            self.context_cache.note_indexed(events)
+    
+    
+    def _add_events_batch(self, events: List[Event]) -> int:
+        if self.store is not None:
             return self.store.add_events_batch(events)
         
         try:
@@ -134,24 +196,18 @@ class RAGService:
             texts = [self._create_event_description(e) for e in events]
             embeddings = self.embedding_model.encode(texts).tolist()
             
-            metadatas = [{
-                "event_id": e.id,
-                "nation_id": e.nation_id,
-                "turn_id": e.turn_id,
-                "event_type": e.event_type,
-                "importance": e.importance,
-                "created_at": str(e.created_at)
-            } for e in events]
+            metadatas = [self._event_metadata(e, text) for e, text in zip(events, texts)]
             
             ids = [f"event_{e.id}" for e in events]
             
-            # Añadir todos de golpe
-            self.collection.add(
+            # Añadir todos de golpe (upsert: repetir un lote es idempotente)
+            self.collection.upsert(
                 embeddings=embeddings,
                 documents=texts,
                 metadatas=metadatas,
                 ids=ids
             )
+            self._note_latest_event_id(events)
             
             return len(events)
             
@@ -160,13 +216,15 @@ class RAGService:
             return 0
     
     
+    @metrics.timed("nationmind_rag_query_seconds", operation="search")
     def search_relevant_events(
         self,
         query: str,
         n_results: int = 5,
         nation_id: Optional[int] = None,
         event_type: Optional[str] = None,
-        min_importance: int = 0
+        min_importance: int = 0,
+        game_id: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Buscar eventos relevantes usando similitud semántica
@@ -177,37 +235,30 @@ class RAGService:
             nation_id: Filtrar por nación específica
             event_type: Filtrar por tipo de evento
             min_importance: Importancia mínima (0-10)
+            game_id: Filtrar por partida (None = todas)
             
         Returns:
             Lista de eventos relevantes con metadata
         """
-        if self.backend == "supabase":
+        if self.store is not None:
             return self.store.search_relevant_events(
                 query=query,
                 n_results=n_results,
                 nation_id=nation_id,
                 event_type=event_type,
                 min_importance=min_importance,
+                game_id=game_id,
             )
 
         try:
             # Crear embedding de la query
             query_embedding = self.embedding_model.encode(query).tolist()
             
-            # Construir filtros
-            where_filter = {}
-            if nation_id:
-                where_filter["nation_id"] = nation_id
-            if event_type:
-                where_filter["event_type"] = event_type
-            if min_importance > 0:
-                where_filter["importance"] = {"$gte": min_importance}
-            
             # Buscar en ChromaDB
             results = self.collection.query(
                 query_embeddings=[query_embedding],
                 n_results=n_results,
-                where=where_filter if where_filter else None
+                where=self._chroma_where(nation_id, event_type, min_importance, game_id)
             )
             
             # Formatear resultados
@@ -228,6 +279,94 @@ class RAGService:
             return []
     
     
+    @metrics.timed("nationmind_rag_query_seconds", operation="search_batch")
+    def search_relevant_events_batch(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        nation_id: Optional[int] = None,
+        event_type: Optional[str] = None,
+        min_importance: int = 0,
+        game_id: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Buscar eventos relevantes para varias consultas a la vez
+        
+        Codifica todas las consultas en una sola llamada al modelo y hace una
+        única búsqueda vectorizada con los mismos filtros para todas.
+        
+        Args:
+            queries: Consultas en lenguaje natural
+            (resto igual que search_relevant_events)
+            
+        Returns:
+            Una lista de resultados por consulta, en el mismo orden
+        """
+        if not queries:
+            return []
+
+        if self.store is not None:
+            return self.store.search_relevant_events_batch(
+                queries=queries,
+                n_results=n_results,
+                nation_id=nation_id,
+                event_type=event_type,
+                min_importance=min_importance,
+                game_id=game_id,
+            )
+
+        try:
+            query_embeddings = self.embedding_model.encode(list(queries)).tolist()
+            
+            # Una sola consulta a ChromaDB con todos los embeddings
+            results = self.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=self._chroma_where(nation_id, event_type, min_importance, game_id)
+            )
+            
+            batch = []
+            for q in range(len(queries)):
+                documents = results['documents'][q] if results['documents'] else []
+                batch.append([
+                    {
+                        "description": doc,
+                        "metadata": results['metadatas'][q][i],
+                        "distance": results['distances'][q][i],
+                        "id": results['ids'][q][i]
+                    }
+                    for i, doc in enumerate(documents)
+                ])
+            return batch
+            
+        except Exception as e:
+            print(f"❌ Error buscando eventos en batch: {e}")
+            return [[] for _ in queries]
+    
+    
+    @staticmethod
+    def _chroma_where(
+        nation_id: Optional[int],
+        event_type: Optional[str],
+        min_importance: int,
+        game_id: Optional[int]
+    ) -> Optional[Dict[str, Any]]:
+        """Filtro `where` de Chroma (con varias condiciones exige $and)"""
+        conditions = []
+        if game_id is not None:
+            conditions.append({"game_id": game_id})
+        if nation_id:
+            conditions.append({"nation_id": nation_id})
+        if event_type:
+            conditions.append({"event_type": event_type})
+        if min_importance > 0:
+            conditions.append({"importance": {"$gte": min_importance}})
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+    
+    
+    @metrics.timed("nationmind_rag_query_seconds", operation="history")
     def get_nation_history(self, nation_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Obtener historial de una nación específica
@@ -239,14 +378,24 @@ class RAGService:
         Returns:
             Lista de eventos de esa nación
         """
-        if self.backend == "supabase":
+        if self.store is not None:
             return self.store.get_nation_history(nation_id, limit)
 
         try:
-            results = self.collection.get(
-                where={"nation_id": nation_id},
-                limit=limit
-            )
+            # collection.get no ordena: se leen los de la nación dentro de una
+            # ventana de ids recientes (creciente si no bastan) y se ordenan
+            # por event_id descendente (ids crecientes = más recientes primero)
+            latest = self._get_latest_event_id()
+            window = HISTORY_WINDOW_EVENTS
+            while True:
+                lower = latest - window
+                where = {"nation_id": nation_id}
+                if lower > 0:
+                    where = {"$and": [where, {"event_id": {"$gte": lower}}]}
+                results = self.collection.get(where=where, include=["documents", "metadatas"])
+                if len(results["ids"]) >= limit or lower <= 0:
+                    break
+                window *= HISTORY_WINDOW_GROWTH
             
             events = []
             for i, doc in enumerate(results['documents']):
@@ -256,18 +405,50 @@ class RAGService:
                     "id": results['ids'][i]
                 })
             
-            return events
+            events.sort(key=lambda e: (e["metadata"] or {}).get("event_id", 0), reverse=True)
+            return events[:limit]
             
         except Exception as e:
             print(f"❌ Error obteniendo historial: {e}")
             return []
     
     
+    def _get_latest_event_id(self) -> int:
+        """Mayor event_id de la colección de Chroma (se lee una vez: solo ids)"""
+        with self._latest_event_lock:
+            if self._latest_event_id is None:
+                ids = self.collection.get(include=[])["ids"]
+                self._latest_event_id = max((int(event_id.split("_", 1)[1]) for event_id in ids), default=0)
+            return self._latest_event_id
+    
+    
+    def _note_latest_event_id(self, events: List[Event]) -> None:
+        with self._latest_event_lock:
+            if self._latest_event_id is not None:
+                self._latest_event_id = max([self._latest_event_id] + [event.id for event in events])
+    
+    
+    def get_nation_histories(self, nation_ids: List[int], limit: int = 10) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Historial de varias naciones (mismo formato que get_nation_history)
+        
+        Returns:
+            dict: nation_id -> lista de eventos
+        """
+        if self.store is not None:
+            return self.store.get_nation_histories(nation_ids, limit)
+
+        # Chroma no permite limitar por grupo: un get por nación (sin embeddings)
+        return {nation_id: self.get_nation_history(nation_id, limit) for nation_id in nation_ids}
+    
+    
+    @metrics.timed("nationmind_rag_query_seconds", operation="context")
     def get_context_for_agent(
         self,
         nation_id: int,
         current_situation: str,
-        max_events: int = 5
+        max_events: int = 5,
+        game_id: Optional[int] = None
     ) -> str:
         """
         Obtener contexto relevante para un agente IA
@@ -279,21 +460,89 @@ class RAGService:
             nation_id: ID de la nación que pide contexto
             current_situation: Descripción de la situación actual
             max_events: Máximo de eventos a incluir
+            game_id: Partida de la nación: los eventos del mundo se buscan
+                solo en ella (None = todas)
             
         Returns:
             str: Contexto en formato texto para el LLM
         """
-        # Buscar eventos relevantes a la situación actual
-        relevant_events = self.search_relevant_events(
+        # Versiones del índice leídas antes de calcular (ver RAGContextCache)
+        cache_key = self.context_cache.key(nation_id, current_situation, max_events, game_id)
+        cached = self.context_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Buscar eventos relevantes a la situación actual (sobre-muestreo +
+        # ranking por similitud, importancia y recencia)
+        candidates = self.search_relevant_events(
             query=current_situation,
-            n_results=max_events,
-            min_importance=5  # Solo eventos importantes
+            n_results=overfetch_count(max_events),
+            min_importance=CONTEXT_MIN_IMPORTANCE,  # Solo eventos importantes
+            game_id=game_id
         )
+        relevant_events = rerank_events(candidates, max_events, self.distance_metric)
         
         # También incluir eventos propios recientes
         own_events = self.get_nation_history(nation_id, limit=3)
         
-        # Formatear como contexto para el LLM
+        context = self._format_agent_context(relevant_events, own_events)
+        self.context_cache.put(cache_key, context)
+        return context
+    
+    
+    @metrics.timed("nationmind_rag_query_seconds", operation="context_batch")
+    def get_contexts_for_agents(
+        self,
+        situations: Dict[int, str],
+        max_events: int = 5,
+        game_id: Optional[int] = None
+    ) -> Dict[int, str]:
+        """
+        Obtener el contexto de todos los agentes de un turno a la vez
+        
+        Equivale a llamar a get_context_for_agent por nación, pero con una
+        sola codificación de las consultas y una sola búsqueda vectorizada.
+        
+        Args:
+            situations: nation_id -> descripción de la situación actual
+            max_events: Máximo de eventos relevantes por nación
+            game_id: Partida de las naciones (None = todas)
+            
+        Returns:
+            dict: nation_id -> contexto en formato texto para el LLM
+        """
+        contexts: Dict[int, str] = {}
+        cache_keys = {}
+        for nation_id, situation in situations.items():
+            cache_keys[nation_id] = self.context_cache.key(nation_id, situation, max_events, game_id)
+            cached = self.context_cache.get(cache_keys[nation_id])
+            if cached is not None:
+                contexts[nation_id] = cached
+
+        # Solo se buscan las naciones sin contexto en caché
+        nation_ids = [nation_id for nation_id in situations if nation_id not in contexts]
+        if nation_ids:
+            candidates_batch = self.search_relevant_events_batch(
+                queries=[situations[nation_id] for nation_id in nation_ids],
+                n_results=overfetch_count(max_events),
+                min_importance=CONTEXT_MIN_IMPORTANCE,  # Solo eventos importantes
+                game_id=game_id
+            )
+            histories = self.get_nation_histories(nation_ids, limit=3)
+            for nation_id, candidates in zip(nation_ids, candidates_batch):
+                relevant_events = rerank_events(candidates, max_events, self.distance_metric)
+                contexts[nation_id] = self._format_agent_context(relevant_events, histories.get(nation_id, []))
+                self.context_cache.put(cache_keys[nation_id], contexts[nation_id])
+        
+        return {nation_id: contexts[nation_id] for nation_id in situations}
+    
+    
+    @staticmethod
+    def _format_agent_context(
+        relevant_events: List[Dict[str, Any]],
+        own_events: List[Dict[str, Any]]
+    ) -> str:
+        """Formatear eventos relevantes e historial propio como contexto para el LLM"""
         context_parts = ["### Memoria de eventos relevantes:\n"]
         
         if relevant_events:
@@ -316,7 +565,14 @@ class RAGService:
         Returns:
             bool: True si se limpió correctamente
         """
-        if self.backend == "supabase":
+        try:
+            return self._clear_collection()
+        finally:
+            self.context_cache.note_reset()
+    
+    
+    def _clear_collection(self) -> bool:
+        if self.store is not None:
             return self.store.clear_collection()
 
         try:
@@ -325,6 +581,8 @@ class RAGService:
                 name="game_events",
                 metadata={"description": "Historical events from the geopolitical simulator"}
             )
+            with self._latest_event_lock:
+                self._latest_event_id = 0
             print("🗑️ Colección ChromaDB limpiada")
             return True
         except Exception as e:
@@ -332,6 +590,75 @@ class RAGService:
             return False
     
     
+    def get_index_manifest(self) -> Dict[int, str]:
+        """
+        Eventos presentes en el vector store y su content_hash
+        
+        Returns:
+            dict: event_id -> content_hash ("" si se indexó antes de guardar el hash)
+        """
+        if self.store is not None:
+            return self.store.get_index_manifest()
+
+        manifest: Dict[int, str] = {}
+        offset = 0
+        while True:
+            page = self.collection.get(include=["metadatas"], limit=MANIFEST_PAGE_SIZE, offset=offset)
+            for event_key, metadata in zip(page["ids"], page["metadatas"]):
+                event_id = (metadata or {}).get("event_id")
+                if event_id is None:
+                    event_id = int(event_key.split("_", 1)[1])
+                manifest[int(event_id)] = (metadata or {}).get("content_hash", "")
+            if len(page["ids"]) < MANIFEST_PAGE_SIZE:
+                return manifest
+            offset += MANIFEST_PAGE_SIZE
+    
+    
+    def delete_events(self, event_ids: List[int]) -> int:
+        """
+        Eliminar eventos del vector store (p. ej. huérfanos que ya no están en la BD)
+        
+        Returns:
+            int: Número de eventos eliminados
+        """
+        if not event_ids:
+            return 0
+
+        try:
+            if self.store is not None:
+                return self.store.delete_events(event_ids)
+
+            self.collection.delete(ids=[f"event_{event_id}" for event_id in event_ids])
+            return len(event_ids)
+        finally:
+            self.context_cache.note_reset()
+    
+    
+    def event_content_hash(self, event: Event) -> str:
+        """Hash del texto que se indexaría para el evento con el modelo actual"""
+        return content_hash(self.embedding_model.model_name, self._create_event_description(event))
+    
+    
+    def _event_metadata(self, event: Event, event_text: str) -> Dict[str, Any]:
+        """Metadata guardada junto al vector (filtros de búsqueda + content_hash para sync)"""
+        metadata = {
+            "event_id": event.id,
+            "nation_id": event.nation_id,
+            "turn_id": event.turn_id,
+            "event_type": event.event_type,
+            "importance": event.importance,
+            "created_at": str(event.created_at),
+            "content_hash": content_hash(self.embedding_model.model_name, event_text),
+            "embedding_model": self.embedding_model.model_name
+        }
+        # Chroma no admite None en la metadata: sin partida o sin número de turno no se guarda la clave
+        if event.game_id is not None:
+            metadata["game_id"] = event.game_id
+        if event.turn_number is not None:
+            metadata["turn_number"] = event.turn_number
+        return metadata
+    
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Obtener estadísticas de la colección RAG
@@ -339,15 +666,19 @@ class RAGService:
         Returns:
             dict: Estadísticas de uso
         """
-        if self.backend == "supabase":
-            return self.store.get_stats()
-
-        return {
-            "total_events": self.collection.count(),
-            "persist_directory": settings.CHROMA_PERSIST_DIR,
-            "collection_name": self.collection.name,
-            "embedding_model": "all-MiniLM-L6-v2"
-        }
+        if self.store is not None:
+            stats = self.store.get_stats()
+        else:
+            stats = {
+                "total_events": self.collection.count(),
+                "persist_directory": settings.CHROMA_PERSIST_DIR,
+                "collection_name": self.collection.name,
+                "embedding_model": EMBEDDING_MODEL_NAME,
+                "embedding_backend": self.embedding_backend,
+                "embedding_cache": self.embedding_model.cache.get_stats()
+            }
+        stats["context_cache"] = self.context_cache.get_stats()
+        return stats
     
     
     def _create_event_description(self, event: Event) -> str:
@@ -380,15 +711,64 @@ class RAGService:
 # Instancia global del servicio RAG
 # Se inicializa una vez y se reutiliza
 _rag_service_instance = None
+_rag_service_lock = threading.Lock()
+
+# Estado de carga para /api/health: disabled | not_loaded | loading | ready | failed
+_rag_readiness: Dict[str, Any] = {"status": "not_loaded", "load_seconds": None, "error": None}
 
 def get_rag_service() -> RAGService:
     """
     Obtener instancia singleton del RAG Service
     
+    La primera llamada carga el modelo de embeddings y conecta con el vector
+    store; las llamadas concurrentes esperan a esa carga en lugar de repetirla.
+    
     Returns:
         RAGService: Instancia compartida del servicio
     """
     global _rag_service_instance
-    if _rag_service_instance is None:
-        _rag_service_instance = RAGService()
+    if _rag_service_instance is not None:
+        return _rag_service_instance
+    with _rag_service_lock:
+        if _rag_service_instance is None:
+            _rag_readiness.update(status="loading", error=None)
+            start = time.perf_counter()
+            try:
+                _rag_service_instance = RAGService()
+            except Exception as e:
+                _rag_readiness.update(status="failed", error=str(e))
+                raise
+            _rag_readiness.update(status="ready", load_seconds=round(time.perf_counter() - start, 3))
     return _rag_service_instance
+
+
+def warmup_rag_service(mode: str) -> None:
+    """
+    Precargar el servicio RAG al arrancar la API.
+    
+    Args:
+        mode: "eager" (bloquea el arranque hasta cargarlo), "background"
+              (carga en un hilo; la API responde mientras tanto) o "lazy"
+              (se carga en la primera petición que lo use)
+    """
+    if not settings.RAG_ENABLED:
+        _rag_readiness["status"] = "disabled"
+        return
+
+    def load() -> None:
+        try:
+            get_rag_service()
+        except Exception as e:
+            print(f"❌ Error precargando el servicio RAG: {e}")
+
+    if mode == "eager":
+        load()
+    elif mode == "background":
+        threading.Thread(target=load, name="rag-warmup", daemon=True).start()
+
+
+def get_rag_readiness() -> Dict[str, Any]:
+    """Estado de carga del servicio RAG (para /api/health)"""
+    if not settings.RAG_ENABLED:
+        return {"status": "disabled", "load_seconds": None, "error": None}
+    return dict(_rag_readiness)
@@ -3,7 +3,9 @@ Servicio para gestión de Relaciones Diplomáticas
 """
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from ..models.nation import Nation
 from ..models.relation import Relation
+from ..models.database import commit_or_flush
 from ..schemas.relation_schema import RelationCreate, RelationUpdate
 
 
@@ -11,9 +13,12 @@ class RelationService:
     """Servicio para operaciones de relaciones diplomáticas"""
     
     @staticmethod
-    def get_all(db: Session) -> List[Relation]:
-        """Obtener todas las relaciones"""
-        return db.query(Relation).all()
+    def get_all(db: Session, game_id: Optional[int] = None) -> List[Relation]:
+        """Obtener todas las relaciones (de una partida si se indica game_id)"""
+        query = db.query(Relation)
+        if game_id is not None:
+            query = query.filter(Relation.game_id == game_id)
+        return query.all()
     
     @staticmethod
     def get_by_id(db: Session, relation_id: int) -> Optional[Relation]:
@@ -38,7 +43,22 @@ class RelationService:
     
     @staticmethod
     def create(db: Session, relation_data: RelationCreate) -> Relation:
-        """Crear una nueva relación"""
+        """
+        Crear una nueva relación
+        
+        Raises:
+            ValueError: Si las naciones son de partidas distintas
+        """
+        game_id = relation_data.game_id
+        nations = db.query(Nation.game_id).filter(
+            Nation.id.in_([relation_data.nation_a_id, relation_data.nation_b_id])
+        ).all()
+        nation_games = {nation_game_id for nation_game_id, in nations}
+        if len(nation_games) > 1:
+            raise ValueError("Las naciones pertenecen a partidas distintas")
+        if game_id is None and nation_games:
+            game_id = nation_games.pop()
+        
         # Asegurarse de que siempre guardemos nation_a_id < nation_b_id para consistencia
         nation_a = min(relation_data.nation_a_id, relation_data.nation_b_id)
         nation_b = max(relation_data.nation_a_id, relation_data.nation_b_id)
@@ -47,12 +67,12 @@ class RelationService:
             nation_a_id=nation_a,
             nation_b_id=nation_b,
             status=relation_data.status,
-            relationship_score=relation_data.relationship_score
+            relationship_score=relation_data.relationship_score,
+            game_id=game_id
         )
         
         db.add(relation)
-        db.commit()
-        db.refresh(relation)
+        commit_or_flush(db, relation)
         return relation
     
     @staticmethod
@@ -71,8 +91,7 @@ class RelationService:
         for key, value in update_data.items():
             setattr(relation, key, value)
         
-        db.commit()
-        db.refresh(relation)
+        commit_or_flush(db, relation)
         return relation
     
     @staticmethod
@@ -87,8 +106,7 @@ class RelationService:
                 relation.status = status
             if relationship_score is not None:
                 relation.relationship_score = relationship_score
-            db.commit()
-            db.refresh(relation)
+            commit_or_flush(db, relation)
             return relation
         else:
             # Crear nueva
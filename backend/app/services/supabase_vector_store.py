@@ -3,28 +3,129 @@ Vector store sobre PostgreSQL/Supabase usando pgvector.
 """
 from __future__ import annotations
 
+import json
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import re
+import struct
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
 
 from pgvector.psycopg2 import register_vector
-from pgvector.sqlalchemy import Vector as VectorType
-from sqlalchemy import JSON, Column, DateTime, Integer, MetaData, String, Table, Text, and_, event as sqlalchemy_event, func, select, text
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector as VectorType
+from sqlalchemy import JSON, Column, DateTime, Integer, MetaData, String, Table, Text, and_, cast, column, event as sqlalchemy_event, func, literal, select, table, text, true, union_all
 from sqlalchemy.dialects.postgresql import insert as pg_insert
-from sentence_transformers import SentenceTransformer
 
 from ..config import settings
 from ..models.database import engine
 from ..models.event import Event
+from .embedding_cache import CachedEncoder, content_hash
 
 logger = logging.getLogger(__name__)
 _vector_listener_registered = False
 
+# Columnas por las que filtran las búsquedas e historiales (índice B-tree cada una)
+FILTER_COLUMNS = ("game_id", "nation_id", "turn_id", "event_type", "importance", "created_at")
+
+# Versiones de pgvector: índices HNSW y búsqueda iterativa (filtros selectivos)
+PGVECTOR_HNSW_VERSION = (0, 5, 0)
+PGVECTOR_ITERATIVE_SCAN_VERSION = (0, 8, 0)
+ITERATIVE_SCAN_MODES = ("off", "strict_order", "relaxed_order")
+
+# Cuantización del índice HNSW (VECTOR_QUANTIZATION): clase de operadores,
+# dimensión máxima que admite el índice y versión mínima de pgvector
+QUANTIZATION_MODES = {
+    "none": {"opclass": "vector_cosine_ops", "max_dim": 2000, "version": (0, 5, 0)},
+    "halfvec": {"opclass": "halfvec_cosine_ops", "max_dim": 4000, "version": (0, 7, 0)},
+    "binary": {"opclass": "bit_hamming_ops", "max_dim": 64000, "version": (0, 7, 0)},
+}
+
+_INDEX_DEFINITION = re.compile(r"USING (\w+) \((.+?)\)", re.IGNORECASE)
+
+# Ingesta masiva: a partir de COPY_MIN_ROWS eventos se usa COPY binario a una
+# tabla temporal y un único upsert por bloque de COPY_CHUNK_ROWS (memoria
+# constante sea cual sea el lote)
+COPY_MIN_ROWS = 100
+COPY_CHUNK_ROWS = 2000
+COPY_COLUMNS = (
+    "event_id", "game_id", "nation_id", "turn_id", "event_type", "importance",
+    "description", "event_metadata", "embedding", "created_at",
+)
+
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_COPY_TRAILER = struct.pack(">h", -1)
+_POSTGRES_EPOCH = datetime(2000, 1, 1)
+
+
+def _copy_int(value: Optional[int]) -> bytes:
+    return struct.pack(">i", -1) if value is None else struct.pack(">ii", 4, value)
+
+
+def _copy_text(value: Optional[str]) -> bytes:
+    if value is None:
+        return struct.pack(">i", -1)
+    data = value.encode("utf-8")
+    return struct.pack(">i", len(data)) + data
+
+
+def _copy_vector(embedding: np.ndarray) -> bytes:
+    """Formato binario de pgvector: dimensión (int16), 0 (int16) y float4 big-endian"""
+    data = struct.pack(">HH", embedding.shape[0], 0) + np.asarray(embedding, dtype=">f4").tobytes()
+    return struct.pack(">i", len(data)) + data
+
+
+def _copy_timestamp(value: datetime) -> bytes:
+    """timestamp sin zona: microsegundos desde 2000-01-01"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - _POSTGRES_EPOCH
+    return struct.pack(">iq", 8, (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds)
+
+
+def _copy_row(record: Dict[str, Any]) -> bytes:
+    """Una fila de COPY ... (FORMAT binary) con las columnas de COPY_COLUMNS"""
+    return b"".join((
+        struct.pack(">h", len(COPY_COLUMNS)),
+        _copy_int(record["event_id"]),
+        _copy_int(record["game_id"]),
+        _copy_int(record["nation_id"]),
+        _copy_int(record["turn_id"]),
+        _copy_text(record["event_type"]),
+        _copy_int(record["importance"]),
+        _copy_text(record["description"]),
+        # json en binario es el propio texto
+        _copy_text(json.dumps(record["event_metadata"])),
+        _copy_vector(record["embedding"]),
+        _copy_timestamp(record["created_at"]),
+    ))
+
+
+class _CopyStream:
+    """Fichero de solo lectura que genera el flujo COPY binario bajo demanda"""
+
+    def __init__(self, rows: Iterable[bytes]):
+        self._chunks: Iterator[bytes] = iter([_COPY_HEADER, *rows, _COPY_TRAILER])
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
 
 class SupabaseVectorStore:
     """Persistencia y búsqueda semántica sobre PostgreSQL con pgvector."""
 
-    def __init__(self, embedding_model: SentenceTransformer):
+    def __init__(self, embedding_model: CachedEncoder):
         self.embedding_model = embedding_model
         self.metadata = MetaData()
         self.table_name = settings.VECTOR_TABLE_NAME
@@ -33,6 +134,7 @@ class SupabaseVectorStore:
             self.table_name,
             self.metadata,
             Column("event_id", Integer, primary_key=True),
+            Column("game_id", Integer, index=True, nullable=True),
             Column("nation_id", Integer, index=True, nullable=False),
             Column("turn_id", Integer, index=True, nullable=False),
             Column("event_type", String(50), index=True, nullable=False),
@@ -43,8 +145,17 @@ class SupabaseVectorStore:
             Column("created_at", DateTime, index=True, nullable=False, default=datetime.utcnow),
         )
 
+        self.pgvector_version: tuple = ()
+
         self._register_vector_support()
         self._ensure_schema()
+        self.quantization = self._resolve_quantization(settings.VECTOR_QUANTIZATION)
+        self.hnsw_index_name = (
+            f"{self.table_name}_embedding_hnsw_idx" if self.quantization == "none"
+            else f"{self.table_name}_embedding_{self.quantization}_hnsw_idx"
+        )
+        if settings.VECTOR_MANAGE_INDEXES:
+            self._ensure_indexes()
         logger.info("Supabase Vector Store inicializado en %s", self.table_name)
 
     def _register_vector_support(self) -> None:
@@ -61,11 +172,197 @@ class SupabaseVectorStore:
     def _ensure_schema(self) -> None:
         with engine.begin() as connection:
             connection.execute(text("create extension if not exists vector"))
+            version = connection.execute(
+                text("select extversion from pg_extension where extname = 'vector'")
+            ).scalar()
+        self.pgvector_version = tuple(int(part) for part in re.findall(r"\d+", version or "")[:3])
         self.metadata.create_all(bind=engine, tables=[self.table])
+        # Tablas creadas antes de las partidas múltiples
+        with engine.begin() as connection:
+            connection.execute(text(f'alter table "{self.table_name}" add column if not exists game_id integer'))
+
+    def _resolve_quantization(self, mode: str) -> str:
+        """Modo de cuantización efectivo (none si pgvector no lo soporta)"""
+        mode = (mode or "none").lower()
+        if mode not in QUANTIZATION_MODES:
+            logger.warning("VECTOR_QUANTIZATION=%s no válido (none, halfvec, binary); se usa none", mode)
+            return "none"
+        if self.pgvector_version < QUANTIZATION_MODES[mode]["version"]:
+            logger.warning(
+                "pgvector %s no soporta VECTOR_QUANTIZATION=%s (>= 0.7.0); se usa none",
+                ".".join(map(str, self.pgvector_version)) or "?", mode,
+            )
+            return "none"
+        return mode
+
+    @property
+    def supports_hnsw(self) -> bool:
+        return self.pgvector_version >= PGVECTOR_HNSW_VERSION
+
+    @property
+    def supports_iterative_scan(self) -> bool:
+        return self.pgvector_version >= PGVECTOR_ITERATIVE_SCAN_VERSION
+
+    def _existing_indexes(self) -> List[Dict[str, Any]]:
+        """Índices de la tabla: nombre, método (btree, hnsw, ivfflat), primera columna y validez"""
+        stmt = text(
+            "select c.relname as name, pg_get_indexdef(i.indexrelid) as definition, i.indisvalid as valid "
+            "from pg_index i join pg_class c on c.oid = i.indexrelid "
+            "where i.indrelid = to_regclass(:table_name)"
+        )
+        with engine.connect() as connection:
+            rows = connection.execute(stmt, {"table_name": self.table_name}).mappings().all()
+
+        indexes = []
+        for row in rows:
+            match = _INDEX_DEFINITION.search(row["definition"])
+            if not match:
+                continue
+            first_column = match.group(2).split(",")[0].split()[0].strip('"')
+            indexes.append({
+                "name": row["name"],
+                "method": match.group(1).lower(),
+                "column": first_column,
+                "valid": bool(row["valid"]),
+                "definition": row["definition"],
+            })
+        return indexes
+
+    def _ensure_indexes(self) -> None:
+        """
+        Crear los índices que falten: B-tree de los filtros y HNSW del embedding.
+
+        La tabla puede venir de create_all o de supabase_vector.sql (con el
+        antiguo ivfflat); se comprueba lo que hay y se completa con CREATE
+        INDEX CONCURRENTLY para no bloquear las escrituras. Con cuantización
+        el HNSW se construye sobre la expresión (halfvec o binary_quantize) y
+        la columna sigue guardando el vector completo para reordenar. Los
+        índices vectoriales de otro tipo (ivfflat, otra cuantización) se
+        eliminan una vez construido el actual.
+        """
+        try:
+            indexes = self._existing_indexes()
+            statements: List[str] = []
+
+            covered = {index["column"] for index in indexes if index["valid"] and index["method"] == "btree"}
+            for column_name in FILTER_COLUMNS:
+                if column_name not in covered:
+                    statements.append(
+                        f'create index concurrently if not exists "{self.table_name}_{column_name}_idx" '
+                        f'on "{self.table_name}" ({column_name})'
+                    )
+
+            mode = QUANTIZATION_MODES[self.quantization]
+            if not self.supports_hnsw:
+                logger.warning(
+                    "pgvector %s no soporta HNSW (>= 0.5.0): las búsquedas no usarán índice vectorial",
+                    ".".join(map(str, self.pgvector_version)) or "?",
+                )
+            elif self.embedding_dimension > mode["max_dim"]:
+                logger.warning(
+                    "HNSW con VECTOR_QUANTIZATION=%s admite hasta %d dimensiones (VECTOR_EMBEDDING_DIM=%d): "
+                    "las búsquedas no usarán índice vectorial",
+                    self.quantization, mode["max_dim"], self.embedding_dimension,
+                )
+            else:
+                vector_indexes = [
+                    index for index in indexes
+                    if index["method"] in ("hnsw", "ivfflat") and "embedding" in index["definition"]
+                ]
+                current = [
+                    index for index in vector_indexes
+                    if index["method"] == "hnsw" and re.search(rf"\b{mode['opclass']}\b", index["definition"])
+                ]
+                for index in current:
+                    # Un CREATE INDEX CONCURRENTLY interrumpido deja el índice inválido
+                    if not index["valid"]:
+                        statements.append(f'drop index concurrently if exists "{index["name"]}"')
+                if not any(index["valid"] for index in current):
+                    statements.append(
+                        f'create index concurrently if not exists "{self.hnsw_index_name}" '
+                        f'on "{self.table_name}" using hnsw ({self._index_expression()}) '
+                        f"with (m = {int(settings.VECTOR_HNSW_M)}, "
+                        f"ef_construction = {int(settings.VECTOR_HNSW_EF_CONSTRUCTION)})"
+                    )
+                else:
+                    self._warn_on_hnsw_params(next(index for index in current if index["valid"]))
+                for index in vector_indexes:
+                    if index not in current:
+                        statements.append(f'drop index concurrently if exists "{index["name"]}"')
+
+            if not statements:
+                return
+
+            # CONCURRENTLY no puede ir dentro de una transacción
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                for statement in statements:
+                    start = time.perf_counter()
+                    connection.execute(text(statement))
+                    logger.info("Índice vectorial: %s (%.1fs)", statement, time.perf_counter() - start)
+        except Exception as exc:
+            logger.exception("No se pudieron verificar/crear los índices de %s: %s", self.table_name, exc)
+
+    def _index_expression(self) -> str:
+        """Expresión y clase de operadores del HNSW según la cuantización"""
+        opclass = QUANTIZATION_MODES[self.quantization]["opclass"]
+        if self.quantization == "halfvec":
+            return f"(embedding::halfvec({self.embedding_dimension})) {opclass}"
+        if self.quantization == "binary":
+            return f"(binary_quantize(embedding)::bit({self.embedding_dimension})) {opclass}"
+        return f"embedding {opclass}"
+
+    def _coarse_distance(self, query: Any) -> Any:
+        """
+        Distancia de la búsqueda gruesa: la misma expresión que el índice
+        HNSW para que el planificador lo use
+        """
+        column = self.table.c.embedding
+        dimension = self.embedding_dimension
+        if self.quantization == "halfvec":
+            return cast(column, HALFVEC(dimension)).cosine_distance(cast(query, HALFVEC(dimension)))
+        if self.quantization == "binary":
+            return cast(func.binary_quantize(column), BIT(dimension)).hamming_distance(
+                cast(func.binary_quantize(query), BIT(dimension))
+            )
+        return column.cosine_distance(query)
+
+    def _candidate_count(self, n_results: int) -> int:
+        """Candidatos de la búsqueda gruesa que se reordenan con el vector completo"""
+        if self.quantization == "none":
+            return n_results
+        return n_results * max(1, settings.VECTOR_RERANK_FACTOR)
+
+    def _warn_on_hnsw_params(self, index: Dict[str, Any]) -> None:
+        """Avisar si el HNSW existente se construyó con otros m/ef_construction"""
+        params = dict(re.findall(r"(m|ef_construction)\s*=\s*'?(\d+)", index["definition"]))
+        expected = {"m": str(settings.VECTOR_HNSW_M), "ef_construction": str(settings.VECTOR_HNSW_EF_CONSTRUCTION)}
+        if params and params != expected:
+            logger.warning(
+                "El índice %s usa %s y la configuración pide %s; bórralo para reconstruirlo al arrancar",
+                index["name"], params, expected,
+            )
+
+    def _apply_search_settings(self, connection: Any, candidates: int, filtered: bool) -> None:
+        """
+        Parámetros del HNSW para la consulta en curso (SET LOCAL, solo esta transacción).
+
+        ef_search nunca es menor que los candidatos pedidos (si no, devuelve
+        menos filas) y con filtros se activa la búsqueda iterativa de pgvector >= 0.8, que
+        sigue recorriendo el grafo hasta completar los resultados.
+        """
+        if not self.supports_hnsw:
+            return
+        ef_search = max(int(settings.VECTOR_HNSW_EF_SEARCH), candidates)
+        connection.execute(text(f"set local hnsw.ef_search = {ef_search}"))
+
+        mode = settings.VECTOR_HNSW_ITERATIVE_SCAN
+        if filtered and self.supports_iterative_scan and mode in ITERATIVE_SCAN_MODES and mode != "off":
+            connection.execute(text(f"set local hnsw.iterative_scan = {mode}"))
 
-    def _build_record(self, event: Event, embedding: List[float], description: str) -> Dict[str, Any]:
+    def _build_record(self, event: Event, embedding: Any, description: str) -> Dict[str, Any]:
         return {
             "event_id": event.id,
+            "game_id": event.game_id,
             "nation_id": event.nation_id,
             "turn_id": event.turn_id,
             "event_type": event.event_type,
@@ -73,11 +370,15 @@ class SupabaseVectorStore:
             "description": description,
             "event_metadata": {
                 "event_id": event.id,
+                "game_id": event.game_id,
                 "nation_id": event.nation_id,
                 "turn_id": event.turn_id,
+                "turn_number": event.turn_number,
                 "event_type": event.event_type,
                 "importance": event.importance,
                 "created_at": str(event.created_at),
+                "content_hash": content_hash(self.embedding_model.model_name, description),
+                "embedding_model": self.embedding_model.model_name,
             },
             "embedding": embedding,
             "created_at": event.created_at or datetime.utcnow(),
@@ -89,20 +390,7 @@ class SupabaseVectorStore:
             embedding = self.embedding_model.encode(description).tolist()
             record = self._build_record(event, embedding, description)
 
-            stmt = pg_insert(self.table).values([record])
-            stmt = stmt.on_conflict_do_update(
-                index_elements=[self.table.c.event_id],
-                set_={
-                    "nation_id": stmt.excluded.nation_id,
-                    "turn_id": stmt.excluded.turn_id,
-                    "event_type": stmt.excluded.event_type,
-                    "importance": stmt.excluded.importance,
-                    "description": stmt.excluded.description,
-                    "event_metadata": stmt.excluded.event_metadata,
-                    "embedding": stmt.excluded.embedding,
-                    "created_at": stmt.excluded.created_at,
-                },
-            )
+            stmt = self._upsert(pg_insert(self.table).values([record]))
 
             with engine.begin() as connection:
                 connection.execute(stmt)
@@ -117,6 +405,9 @@ class SupabaseVectorStore:
             return 0
 
         try:
+            if len(events) >= COPY_MIN_ROWS:
+                return self._copy_events(events)
+
             descriptions = [self._create_event_description(event) for event in events]
             embeddings = self.embedding_model.encode(descriptions).tolist()
             records = [
@@ -124,20 +415,7 @@ class SupabaseVectorStore:
                 for event, embedding, description in zip(events, embeddings, descriptions)
             ]
 
-            stmt = pg_insert(self.table).values(records)
-            stmt = stmt.on_conflict_do_update(
-                index_elements=[self.table.c.event_id],
-                set_={
-                    "nation_id": stmt.excluded.nation_id,
-                    "turn_id": stmt.excluded.turn_id,
-                    "event_type": stmt.excluded.event_type,
-                    "importance": stmt.excluded.importance,
-                    "description": stmt.excluded.description,
-                    "event_metadata": stmt.excluded.event_metadata,
-                    "embedding": stmt.excluded.embedding,
-                    "created_at": stmt.excluded.created_at,
-                },
-            )
+            stmt = self._upsert(pg_insert(self.table).values(records))
 
             with engine.begin() as connection:
                 connection.execute(stmt)
@@ -147,6 +425,55 @@ class SupabaseVectorStore:
             logger.exception("Error añadiendo eventos en batch a Supabase Vector: %s", exc)
             return 0
 
+    def _upsert(self, stmt: Any) -> Any:
+        """INSERT ... ON CONFLICT (event_id) DO UPDATE de todas las columnas"""
+        return stmt.on_conflict_do_update(
+            index_elements=[self.table.c.event_id],
+            set_={name: stmt.excluded[name] for name in COPY_COLUMNS if name != "event_id"},
+        )
+
+    def _copy_events(self, events: List[Event]) -> int:
+        """
+        Ingesta masiva: por bloques de COPY_CHUNK_ROWS, embeber, volcar con COPY
+        binario a una tabla temporal y fusionar con un único upsert.
+
+        Todo el lote va en una transacción (como el INSERT ... VALUES); la
+        tabla temporal es de la conexión y se vacía tras cada bloque.
+        """
+        staging = f"{self.table_name}_staging"
+        staging_table = table(staging, *[column(name) for name in COPY_COLUMNS])
+        merge = self._upsert(pg_insert(self.table).from_select(list(COPY_COLUMNS), select(staging_table)))
+
+        written = 0
+        with engine.begin() as connection:
+            connection.execute(text(
+                f'create temp table if not exists "{staging}" ('
+                "event_id integer, game_id integer, nation_id integer, turn_id integer, event_type varchar(50), "
+                "importance integer, description text, event_metadata json, "
+                f"embedding vector({self.embedding_dimension}), created_at timestamp"
+                ") on commit delete rows"
+            ))
+            cursor = connection.connection.cursor()
+            try:
+                for start in range(0, len(events), COPY_CHUNK_ROWS):
+                    chunk = events[start:start + COPY_CHUNK_ROWS]
+                    descriptions = [self._create_event_description(event) for event in chunk]
+                    embeddings = np.asarray(self.embedding_model.encode(descriptions), dtype=np.float32)
+                    rows = (
+                        _copy_row(self._build_record(event, embedding, description))
+                        for event, embedding, description in zip(chunk, embeddings, descriptions)
+                    )
+                    cursor.copy_expert(
+                        f'copy "{staging}" ({", ".join(COPY_COLUMNS)}) from stdin with (format binary)',
+                        _CopyStream(rows),
+                    )
+                    connection.execute(merge)
+                    connection.execute(text(f'truncate "{staging}"'))
+                    written += len(chunk)
+            finally:
+                cursor.close()
+        return written
+
     def search_relevant_events(
         self,
         query: str,
@@ -154,35 +481,42 @@ class SupabaseVectorStore:
         nation_id: Optional[int] = None,
         event_type: Optional[str] = None,
         min_importance: int = 0,
+        game_id: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
         try:
             query_embedding = self.embedding_model.encode(query).tolist()
-            distance_expr = self.table.c.embedding.cosine_distance(query_embedding).label("distance")
-
-            conditions = []
-            if nation_id is not None:
-                conditions.append(self.table.c.nation_id == nation_id)
-            if event_type:
-                conditions.append(self.table.c.event_type == event_type)
-            if min_importance > 0:
-                conditions.append(self.table.c.importance >= min_importance)
+            query_vector = cast(
+                literal(query_embedding, type_=VectorType(self.embedding_dimension)),
+                VectorType(self.embedding_dimension),
+            )
+            conditions = self._search_conditions(nation_id, event_type, min_importance, game_id)
+            candidate_count = self._candidate_count(n_results)
 
-            stmt = select(
+            # Búsqueda gruesa por el índice (cuantizado o no) y orden final
+            # con la distancia del vector completo
+            candidates = select(
                 self.table.c.event_id,
                 self.table.c.description,
                 self.table.c.event_metadata,
-                self.table.c.nation_id,
-                self.table.c.turn_id,
-                self.table.c.event_type,
-                self.table.c.importance,
-                self.table.c.created_at,
-                distance_expr,
+                self.table.c.embedding,
             )
             if conditions:
-                stmt = stmt.where(and_(*conditions))
-            stmt = stmt.order_by(distance_expr).limit(n_results)
+                candidates = candidates.where(and_(*conditions))
+            candidates = (
+                candidates.order_by(self._coarse_distance(query_vector))
+                .limit(candidate_count)
+                .subquery("candidates")
+            )
+
+            distance_expr = candidates.c.embedding.cosine_distance(query_vector).label("distance")
+            stmt = (
+                select(candidates.c.event_id, candidates.c.description, candidates.c.event_metadata, distance_expr)
+                .order_by(distance_expr)
+                .limit(n_results)
+            )
 
             with engine.connect() as connection:
+                self._apply_search_settings(connection, candidate_count, filtered=bool(conditions))
                 rows = connection.execute(stmt).mappings().all()
 
             return [
@@ -198,6 +532,105 @@ class SupabaseVectorStore:
             logger.exception("Error buscando eventos en Supabase Vector: %s", exc)
             return []
 
+    def search_relevant_events_batch(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        nation_id: Optional[int] = None,
+        event_type: Optional[str] = None,
+        min_importance: int = 0,
+        game_id: Optional[int] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        try:
+            query_embeddings = self.embedding_model.encode(list(queries)).tolist()
+
+            # Una fila por consulta y un JOIN LATERAL con los candidatos de cada una
+            query_rows = union_all(*[
+                select(
+                    literal(index).label("query_index"),
+                    cast(
+                        literal(embedding, type_=VectorType(self.embedding_dimension)),
+                        VectorType(self.embedding_dimension),
+                    ).label("embedding"),
+                )
+                for index, embedding in enumerate(query_embeddings)
+            ]).subquery("queries")
+
+            conditions = self._search_conditions(nation_id, event_type, min_importance, game_id)
+            candidate_count = self._candidate_count(n_results)
+            candidates = select(
+                self.table.c.event_id,
+                self.table.c.description,
+                self.table.c.event_metadata,
+                self.table.c.embedding,
+            )
+            if conditions:
+                candidates = candidates.where(and_(*conditions))
+            candidates = (
+                candidates.order_by(self._coarse_distance(query_rows.c.embedding))
+                .limit(candidate_count)
+                .lateral("candidates")
+            )
+
+            # Reordenar los candidatos de cada consulta con el vector completo
+            distance_expr = candidates.c.embedding.cosine_distance(query_rows.c.embedding).label("distance")
+            position = func.row_number().over(
+                partition_by=query_rows.c.query_index,
+                order_by=distance_expr,
+            ).label("position")
+            ranked = (
+                select(
+                    query_rows.c.query_index,
+                    candidates.c.event_id,
+                    candidates.c.description,
+                    candidates.c.event_metadata,
+                    distance_expr,
+                    position,
+                )
+                .select_from(query_rows.join(candidates, true()))
+                .subquery("ranked")
+            )
+            stmt = (
+                select(ranked)
+                .where(ranked.c.position <= n_results)
+                .order_by(ranked.c.query_index, ranked.c.position)
+            )
+
+            with engine.connect() as connection:
+                self._apply_search_settings(connection, candidate_count, filtered=bool(conditions))
+                rows = connection.execute(stmt).mappings().all()
+
+            batch: List[List[Dict[str, Any]]] = [[] for _ in queries]
+            for row in rows:
+                batch[row["query_index"]].append({
+                    "id": f"event_{row['event_id']}",
+                    "description": row["description"],
+                    "metadata": row["event_metadata"],
+                    "distance": float(row["distance"]),
+                })
+            return batch
+        except Exception as exc:
+            logger.exception("Error buscando eventos en batch en Supabase Vector: %s", exc)
+            return [[] for _ in queries]
+
+    def _search_conditions(
+        self,
+        nation_id: Optional[int],
+        event_type: Optional[str],
+        min_importance: int,
+        game_id: Optional[int] = None,
+    ) -> List[Any]:
+        conditions = []
+        if game_id is not None:
+            conditions.append(self.table.c.game_id == game_id)
+        if nation_id is not None:
+            conditions.append(self.table.c.nation_id == nation_id)
+        if event_type:
+            conditions.append(self.table.c.event_type == event_type)
+        if min_importance > 0:
+            conditions.append(self.table.c.importance >= min_importance)
+        return conditions
+
     def get_nation_history(self, nation_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         try:
             stmt = (
@@ -227,6 +660,65 @@ class SupabaseVectorStore:
             logger.exception("Error obteniendo historial desde Supabase Vector: %s", exc)
             return []
 
+    def get_nation_histories(self, nation_ids: List[int], limit: int = 10) -> Dict[int, List[Dict[str, Any]]]:
+        histories: Dict[int, List[Dict[str, Any]]] = {nation_id: [] for nation_id in nation_ids}
+        if not nation_ids:
+            return histories
+
+        try:
+            # Los `limit` más recientes de cada nación en una sola consulta
+            position = func.row_number().over(
+                partition_by=self.table.c.nation_id,
+                order_by=self.table.c.created_at.desc(),
+            ).label("position")
+            ranked = (
+                select(
+                    self.table.c.event_id,
+                    self.table.c.nation_id,
+                    self.table.c.description,
+                    self.table.c.event_metadata,
+                    position,
+                )
+                .where(self.table.c.nation_id.in_(nation_ids))
+                .subquery("ranked")
+            )
+            stmt = (
+                select(ranked)
+                .where(ranked.c.position <= limit)
+                .order_by(ranked.c.nation_id, ranked.c.position)
+            )
+
+            with engine.connect() as connection:
+                rows = connection.execute(stmt).mappings().all()
+
+            for row in rows:
+                histories[row["nation_id"]].append({
+                    "id": f"event_{row['event_id']}",
+                    "description": row["description"],
+                    "metadata": row["event_metadata"],
+                })
+        except Exception as exc:
+            logger.exception("Error obteniendo historiales desde Supabase Vector: %s", exc)
+        return histories
+
+    def get_index_manifest(self) -> Dict[int, str]:
+        stmt = select(
+            self.table.c.event_id,
+            self.table.c.event_metadata["content_hash"].as_string().label("content_hash"),
+        )
+        with engine.connect() as connection:
+            rows = connection.execute(stmt).all()
+        return {row.event_id: row.content_hash or "" for row in rows}
+
+    def delete_events(self, event_ids: List[int]) -> int:
+        deleted = 0
+        with engine.begin() as connection:
+            for start in range(0, len(event_ids), 1000):
+                chunk = event_ids[start:start + 1000]
+                result = connection.execute(self.table.delete().where(self.table.c.event_id.in_(chunk)))
+                deleted += result.rowcount or 0
+        return deleted
+
     def clear_collection(self) -> bool:
         try:
             with engine.begin() as connection:
@@ -249,8 +741,20 @@ class SupabaseVectorStore:
             "backend": "supabase",
             "collection_name": self.table_name,
             "total_events": total_events,
-            "embedding_model": "all-MiniLM-L6-v2",
+            "embedding_model": self.embedding_model.model_name,
             "embedding_dimension": self.embedding_dimension,
+            "vector_index": {
+                "type": "hnsw" if self.supports_hnsw else None,
+                "name": self.hnsw_index_name,
+                "m": settings.VECTOR_HNSW_M,
+                "ef_construction": settings.VECTOR_HNSW_EF_CONSTRUCTION,
+                "ef_search": settings.VECTOR_HNSW_EF_SEARCH,
+                "iterative_scan": settings.VECTOR_HNSW_ITERATIVE_SCAN if self.supports_iterative_scan else None,
+                "quantization": self.quantization,
+                "rerank_candidates": self._candidate_count(1),
+                "pgvector_version": ".".join(map(str, self.pgvector_version)),
+            },
+            "embedding_cache": self.embedding_model.cache.get_stats(),
         }
 
     def _create_event_description(self, event: Event) -> str:
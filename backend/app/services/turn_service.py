@@ -4,6 +4,7 @@ Servicio para gestión de Turnos
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..models.turn import Turn
+from ..models.database import commit_or_flush
 from ..schemas.turn_schema import TurnCreate
 
 
@@ -11,9 +12,9 @@ class TurnService:
     """Servicio para operaciones de turnos"""
     
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[Turn]:
+    def get_all(db: Session, skip: int = 0, limit: int = 100, game_id: Optional[int] = None) -> List[Turn]:
         """Obtener todos los turnos (ordenados por número)"""
-        return db.query(Turn).order_by(Turn.turn_number.desc()).offset(skip).limit(limit).all()
+        return TurnService._in_game(db.query(Turn), game_id).order_by(Turn.turn_number.desc()).offset(skip).limit(limit).all()
     
     @staticmethod
     def get_by_id(db: Session, turn_id: int) -> Optional[Turn]:
@@ -21,40 +22,50 @@ class TurnService:
         return db.query(Turn).filter(Turn.id == turn_id).first()
     
     @staticmethod
-    def get_by_number(db: Session, turn_number: int) -> Optional[Turn]:
-        """Obtener turno por número"""
-        return db.query(Turn).filter(Turn.turn_number == turn_number).first()
+    def get_by_number(db: Session, turn_number: int, game_id: Optional[int] = None) -> Optional[Turn]:
+        """Obtener turno por número (los números se repiten entre partidas)"""
+        return TurnService._in_game(db.query(Turn), game_id).filter(Turn.turn_number == turn_number).first()
     
     @staticmethod
-    def get_current(db: Session) -> Optional[Turn]:
-        """Obtener el turno actual (último)"""
-        return db.query(Turn).order_by(Turn.turn_number.desc()).first()
+    def get_current(db: Session, game_id: Optional[int] = None) -> Optional[Turn]:
+        """Obtener el turno actual (último) de la partida"""
+        return TurnService._in_game(db.query(Turn), game_id).order_by(Turn.turn_number.desc()).first()
     
     @staticmethod
     def create(db: Session, turn_data: TurnCreate) -> Turn:
         """Crear un nuevo turno"""
         turn = Turn(**turn_data.model_dump())
         db.add(turn)
-        db.commit()
-        db.refresh(turn)
+        commit_or_flush(db, turn)
         return turn
     
     @staticmethod
-    def get_current_turn_number(db: Session) -> int:
+    def get_current_turn_number(db: Session, game_id: Optional[int] = None) -> int:
         """Obtener el número del turno actual"""
-        current_turn = TurnService.get_current(db)
+        current_turn = TurnService.get_current(db, game_id)
         return current_turn.turn_number if current_turn else 0
     
     @staticmethod
-    def create_next_turn(db: Session, world_state: dict, summary: str = None) -> Turn:
-        """Crear el siguiente turno automáticamente"""
-        current_number = TurnService.get_current_turn_number(db)
+    def create_next_turn(
+        db: Session,
+        world_state: dict,
+        summary: str = None,
+        game_id: Optional[int] = None
+    ) -> Turn:
+        """Crear el siguiente turno de la partida automáticamente"""
+        current_number = TurnService.get_current_turn_number(db, game_id)
         next_number = current_number + 1
         
         turn_data = TurnCreate(
             turn_number=next_number,
             world_state=world_state,
-            summary=summary
+            summary=summary,
+            game_id=game_id
         )
         
         return TurnService.create(db, turn_data)
+    
+    @staticmethod
+    def _in_game(query, game_id: Optional[int]):
+        """Limitar la consulta a una partida (None = todas)"""
+        return query.filter(Turn.game_id == game_id) if game_id is not None else query
@@ -0,0 +1,189 @@
+"""
+Snapshot del mundo por turno
+Foto inmutable de naciones, relaciones y eventos que comparten todos los agentes IA
+"""
+from typing import Dict, List, Any, Optional
+from sqlalchemy.orm import Session
+
+from .nation_service import NationService
+from .relation_service import RelationService
+from .event_service import EventService
+from .turn_service import TurnService
+
+
+class TurnSnapshot:
+    """
+    Estado del mundo leído una sola vez al inicio de la fase de agentes.
+
+    Sustituye a las consultas get_my_nation_status / get_all_nations_status /
+    get_relations_status que cada agente hacía por separado: las tablas de
+    naciones y relaciones se leen una vez por turno en lugar de una vez por
+    agente. Devuelve los mismos diccionarios que esas herramientas.
+
+    También guarda el contexto histórico (RAG) de cada agente, calculado
+    para todas las naciones de una vez con RAGService.get_contexts_for_agents.
+
+    Tras la fase de acción el snapshot deja de reflejar la BD y debe
+    invalidarse con invalidate(); cualquier lectura posterior lanza error.
+    """
+
+    def __init__(
+        self,
+        turn_number: int,
+        turn_id: Optional[int],
+        nations: List[Dict[str, Any]],
+        relations: List[Dict[str, Any]],
+        recent_events: List[Dict[str, Any]],
+        game_id: Optional[int] = None
+    ):
+        self.game_id = game_id
+        self.turn_number = turn_number
+        self.turn_id = turn_id
+        self._nations = nations
+        self._nations_by_id = {n["id"]: n for n in nations}
+        self._relations = relations
+        self._recent_events = recent_events
+
+        # Matriz de relaciones: nation_id -> {otra_nation_id: relación}
+        self._relations_matrix: Dict[int, Dict[int, Dict[str, Any]]] = {}
+        for rel in relations:
+            self._relations_matrix.setdefault(rel["nation_a_id"], {})[rel["nation_b_id"]] = rel
+            self._relations_matrix.setdefault(rel["nation_b_id"], {})[rel["nation_a_id"]] = rel
+
+        # nation_id -> contexto RAG precalculado para el agente
+        self._historical_contexts: Dict[int, str] = {}
+        self._valid = True
+
+
+    @classmethod
+    def build(
+        cls,
+        db: Session,
+        turn_number: int,
+        recent_events_limit: int = 10,
+        game_id: Optional[int] = None
+    ) -> "TurnSnapshot":
+        """
+        Construir el snapshot con una consulta por tabla.
+
+        Args:
+            db: Sesión de base de datos
+            turn_number: Número del turno actual
+            recent_events_limit: Número de eventos recientes a incluir
+            game_id: Partida del turno (None = todas)
+        """
+        current_turn = TurnService.get_current(db, game_id)
+        nations = NationService.get_all(db, game_id=game_id)
+        relations = RelationService.get_all(db, game_id)
+        recent_events = EventService.get_recent_events(db, limit=recent_events_limit, game_id=game_id)
+
+        return cls(
+            turn_number=turn_number,
+            turn_id=current_turn.id if current_turn else None,
+            nations=[n.to_dict() for n in nations],
+            relations=[r.to_dict() for r in relations],
+            recent_events=[e.to_dict() for e in recent_events],
+            game_id=game_id
+        )
+
+
+    @property
+    def is_valid(self) -> bool:
+        return self._valid
+
+
+    def invalidate(self) -> None:
+        """Marcar el snapshot como obsoleto (tras aplicar acciones)"""
+        self._valid = False
+        self._nations = []
+        self._nations_by_id = {}
+        self._relations = []
+        self._relations_matrix = {}
+        self._recent_events = []
+        self._historical_contexts = {}
+
+
+    def _ensure_valid(self) -> None:
+        if not self._valid:
+            raise RuntimeError(f"Snapshot del turno {self.turn_number} invalidado")
+
+
+    def has_nation(self, nation_id: int) -> bool:
+        """Comprobar si una nación activa está en el snapshot"""
+        self._ensure_valid()
+        return nation_id in self._nations_by_id
+
+
+    def get_my_nation_status(self, nation_id: int) -> Dict[str, Any]:
+        """Equivalente a la herramienta get_my_nation_status"""
+        self._ensure_valid()
+        nation = self._nations_by_id.get(nation_id)
+        if not nation:
+            return {"error": "Nación no encontrada"}
+
+        return {
+            "id": nation["id"],
+            "name": nation["name"],
+            "gold": nation["gold"],
+            "troops": nation["troops"],
+            "territories": nation["territories"],
+            "military_power": nation["military_power"],
+            "economic_power": nation["economic_power"],
+            "diplomatic_influence": nation["diplomatic_influence"],
+            "is_active": nation["is_active"]
+        }
+
+
+    def get_all_nations_status(self) -> List[Dict[str, Any]]:
+        """Equivalente a la herramienta get_all_nations_status"""
+        self._ensure_valid()
+        return [
+            {
+                "id": n["id"],
+                "name": n["name"],
+                "gold": n["gold"],
+                "troops": n["troops"],
+                "territories": n["territories"],
+                "military_power": n["military_power"],
+                "is_active": n["is_active"],
+                "ai_controlled": n["ai_controlled"]
+            }
+            for n in self._nations
+        ]
+
+
+    def get_relations_status(self, nation_id: int) -> List[Dict[str, Any]]:
+        """Equivalente a la herramienta get_relations_status"""
+        self._ensure_valid()
+        return [
+            {
+                "with_nation_id": other_id,
+                "status": rel["status"],
+                "relationship_score": rel["relationship_score"]
+            }
+            for other_id, rel in self._relations_matrix.get(nation_id, {}).items()
+        ]
+
+
+    def get_relation_between(self, nation_a_id: int, nation_b_id: int) -> Optional[Dict[str, Any]]:
+        """Obtener la relación entre dos naciones desde la matriz"""
+        self._ensure_valid()
+        return self._relations_matrix.get(nation_a_id, {}).get(nation_b_id)
+
+
+    def get_recent_events(self) -> List[Dict[str, Any]]:
+        """Eventos recientes al inicio de la fase de agentes"""
+        self._ensure_valid()
+        return list(self._recent_events)
+
+
+    def set_historical_contexts(self, contexts: Dict[int, str]) -> None:
+        """Guardar los contextos RAG del turno (nation_id -> texto)"""
+        self._ensure_valid()
+        self._historical_contexts = dict(contexts)
+
+
+    def get_historical_context(self, nation_id: int) -> Optional[str]:
+        """Contexto RAG precalculado de una nación (None si no se calculó)"""
+        self._ensure_valid()
+        return self._historical_contexts.get(nation_id)
@@ -43,9 +43,9 @@ class VictoryService:
     }
     
     @staticmethod
-    def check_victory_conditions(db: Session, current_turn: int) -> Dict[str, Any]:
+    def check_victory_conditions(db: Session, current_turn: int, game_id: Optional[int] = None) -> Dict[str, Any]:
         """
-        Verificar todas las condiciones de victoria.
+        Verificar todas las condiciones de victoria de la partida.
         
         Returns:
             {
@@ -55,7 +55,7 @@ class VictoryService:
                 "details": str
             }
         """
-        nations = NationService.get_all(db)
+        nations = NationService.get_all(db, game_id=game_id)
         active_nations = [n for n in nations if n.is_active]
         
         # Si no hay naciones activas, es un empate (no debería pasar)
@@ -176,7 +176,7 @@ class VictoryService:
                 ...
             }
         """
-        nations = NationService.get_all(db)
+        nations = NationService.get_all(db, game_id=nation.game_id)
         active_nations = [n for n in nations if n.is_active]
         total_territories = sum(n.territories for n in active_nations)
         
@@ -231,14 +231,14 @@ class VictoryService:
     
     
     @staticmethod
-    def get_leaderboard(db: Session) -> List[Dict[str, Any]]:
+    def get_leaderboard(db: Session, game_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        Obtener tabla de clasificación de todas las naciones activas.
+        Obtener tabla de clasificación de todas las naciones activas de la partida.
         
         Returns:
             Lista ordenada por puntuación total descendente
         """
-        nations = NationService.get_all(db)
+        nations = NationService.get_all(db, game_id=game_id)
         active_nations = [n for n in nations if n.is_active]
         
         leaderboard = []
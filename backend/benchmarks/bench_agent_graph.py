@@ -0,0 +1,108 @@
+"""
+Micro-benchmark: coste de construir el grafo LangGraph de los agentes.
+
+Compara el patrón anterior (un StateGraph nuevo compilado por nación y por
+turno, con la sesión capturada en lambdas) con el actual (grafo compilado una
+vez por AgentService y db/snapshot pasados en config). Los nodos son no-ops,
+así que solo se mide la construcción/compilación y el overhead de invocación.
+
+Uso:
+    python benchmarks/bench_agent_graph.py --turns 200 --nations 7
+"""
+import argparse
+import os
+import sys
+import time
+
+# Agregar el directorio backend al path para importar los módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langgraph.graph import StateGraph, END
+
+from app.services.agent_service import AgentState, compile_agent_graph
+
+
+def _initial_state(nation_id: int) -> AgentState:
+    return {
+        "nation_id": nation_id,
+        "nation_name": f"Nación {nation_id}",
+        "personality": "neutral",
+        "current_status": {},
+        "world_status": [],
+        "relations": [],
+        "historical_context": "",
+        "messages": [],
+        "decision": None,
+        "turn_number": 1,
+        "timings": {}
+    }
+
+
+def _noop(state, db=None):
+    return state
+
+
+def _noop_with_config(state, config):
+    return state
+
+
+def legacy_build(db) -> object:
+    """Patrón anterior: grafo nuevo por nación con db capturada en lambdas"""
+    workflow = StateGraph(AgentState)
+    workflow.add_node("gather_info", lambda state: _noop(state, db))
+    workflow.add_node("think", lambda state: _noop(state, db))
+    workflow.add_node("act", lambda state: _noop(state, db))
+    workflow.set_entry_point("gather_info")
+    workflow.add_edge("gather_info", "think")
+    workflow.add_edge("think", "act")
+    workflow.add_edge("act", END)
+    return workflow.compile()
+
+
+def run(turns: int, nations: int) -> None:
+    db = object()  # Sustituto de la sesión: los nodos no la usan
+
+    # Antes: construir + compilar + invocar por nación y turno
+    start = time.perf_counter()
+    for _ in range(turns):
+        for nation_id in range(1, nations + 1):
+            graph = legacy_build(db)
+            graph.invoke(_initial_state(nation_id))
+    legacy_total = time.perf_counter() - start
+
+    # Solo construcción (para aislar el coste de compilar)
+    start = time.perf_counter()
+    for _ in range(turns * nations):
+        legacy_build(db)
+    legacy_build_only = time.perf_counter() - start
+
+    # Después: compilar una vez, invocar con config
+    start = time.perf_counter()
+    graph = compile_agent_graph(_noop_with_config, _noop_with_config, _noop_with_config)
+    compile_once = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(turns):
+        for nation_id in range(1, nations + 1):
+            graph.invoke(
+                _initial_state(nation_id),
+                config={"configurable": {"db": db, "snapshot": None}}
+            )
+    shared_total = time.perf_counter() - start + compile_once
+
+    runs = turns * nations
+    print(f"📊 {turns} turnos x {nations} naciones = {runs} ejecuciones de agente\n")
+    print(f"{'Modo':<38}{'Total (s)':>12}{'Por agente (ms)':>18}")
+    print(f"{'Antes: build+compile+invoke':<38}{legacy_total:>12.3f}{legacy_total / runs * 1000:>18.3f}")
+    print(f"{'Antes: solo build+compile':<38}{legacy_build_only:>12.3f}{legacy_build_only / runs * 1000:>18.3f}")
+    print(f"{'Después: compile una vez + invoke':<38}{shared_total:>12.3f}{shared_total / runs * 1000:>18.3f}")
+    print(f"\n⚡ Speedup: {legacy_total / shared_total:.1f}x (compilación única: {compile_once * 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de construcción del grafo de agentes")
+    parser.add_argument("--turns", type=int, default=200, help="Turnos simulados")
+    parser.add_argument("--nations", type=int, default=7, help="Naciones IA por turno")
+    args = parser.parse_args()
+
+    run(args.turns, args.nations)
@@ -0,0 +1,160 @@
+"""
+Benchmark: backends de embeddings (torch, ONNX, ONNX int8) en CPU.
+
+Usa un corpus fijo de eventos del juego (generado con semilla, con el mismo
+formato que RAGService._create_event_description) y consultas como las de
+los agentes. Para cada backend mide:
+
+- carga del modelo (s)
+- throughput codificando el corpus en batch (textos/s) — reindex e ingesta
+- latencia de una consulta suelta (ms, p50) — gather_info de cada agente
+- acuerdo con el backend de referencia (el primero de --backends):
+  coseno medio entre los vectores del mismo texto y recall@k de los
+  resultados de búsqueda (k vecinos más cercanos por consulta)
+
+Uso:
+    python benchmarks/bench_embeddings.py
+    python benchmarks/bench_embeddings.py --backends torch,onnx-int8 --events 2000 --k 5
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+# Agregar el directorio backend al path para importar los módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.embedding_backends import create_embedding_model
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+NATIONS = [
+    "Estados Unidos", "China", "Rusia", "España",
+    "Reino Unido", "Francia", "Alemania", "Japón"
+]
+
+EVENT_TEMPLATES = [
+    "{a} declaró la guerra a {b}",
+    "{a} propuso una alianza a {b}",
+    "{a} invirtió {gold} oro en el ejército y reclutó {troops} tropas",
+    "{a} invirtió {gold} oro en su economía",
+    "{a} generó {gold} oro (mantenimiento: {troops}). Balance: +{gold} oro",
+    "Batalla: {a} vs {b}. {a} ataca a {b}. Después de intensos combates, {a} obtiene una victoria. {b} sufre pérdidas significativas.",
+    "{a} firmó un tratado de paz con {b}",
+    "{a} decidió no actuar este turno",
+]
+
+QUERY_TEMPLATES = [
+    "Situación de {a}: evaluando opciones estratégicas",
+    "Historial de guerras entre {a} y {b}",
+    "Alianzas de {a}",
+    "Batallas perdidas por {a}",
+]
+
+
+def build_corpus(n_events: int, seed: int) -> List[str]:
+    """Eventos sintéticos con el formato de texto que se indexa en RAG"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(n_events):
+        a, b = rng.sample(NATIONS, 2)
+        text = rng.choice(EVENT_TEMPLATES).format(
+            a=a, b=b, gold=rng.randint(50, 1500), troops=rng.randint(10, 300)
+        )
+        importance = rng.randint(1, 10)
+        suffix = " (Evento crítico)" if importance >= 8 else " (Evento importante)" if importance >= 6 else ""
+        corpus.append(f"Turno {i // 20 + 1}: {text}{suffix}")
+    return corpus
+
+
+def build_queries(seed: int) -> List[str]:
+    rng = random.Random(seed + 1)
+    return [
+        template.format(a=a, b=rng.choice([n for n in NATIONS if n != a]))
+        for a in NATIONS
+        for template in QUERY_TEMPLATES
+    ]
+
+
+def top_k(corpus_vectors: np.ndarray, query_vectors: np.ndarray, k: int) -> np.ndarray:
+    """Índices de los k eventos más similares por consulta (vectores normalizados)"""
+    scores = query_vectors @ corpus_vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de backends de embeddings")
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8", help="Backends (el primero es la referencia)")
+    parser.add_argument("--events", type=int, default=1000, help="Tamaño del corpus")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3, help="Repeticiones del encode del corpus (mejor tiempo)")
+    parser.add_argument("--k", type=int, default=5, help="k para recall@k")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.events, args.seed)
+    queries = build_queries(args.seed)
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+
+    print(f"🧪 Corpus: {len(corpus)} eventos | {len(queries)} consultas | k={args.k}\n")
+
+    results: Dict[str, Dict[str, float]] = {}
+    reference = None
+
+    for backend in backends:
+        start = time.perf_counter()
+        model = create_embedding_model(MODEL_NAME, backend)
+        load_seconds = time.perf_counter() - start
+
+        model.encode(corpus[:args.batch_size], batch_size=args.batch_size)  # warmup
+
+        best = float("inf")
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            corpus_vectors = np.asarray(model.encode(corpus, batch_size=args.batch_size), dtype=np.float32)
+            best = min(best, time.perf_counter() - start)
+
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            model.encode(query)
+            latencies.append(time.perf_counter() - start)
+        query_vectors = np.asarray(model.encode(queries), dtype=np.float32)
+
+        row = {
+            "load_s": load_seconds,
+            "texts_per_s": len(corpus) / best,
+            "query_p50_ms": statistics.median(latencies) * 1000,
+        }
+
+        if reference is None:
+            reference = (corpus_vectors, query_vectors, top_k(corpus_vectors, query_vectors, args.k))
+            row["cosine"] = 1.0
+            row["recall"] = 1.0
+        else:
+            ref_corpus, ref_queries, ref_top = reference
+            row["cosine"] = float(np.mean(np.sum(ref_corpus * corpus_vectors, axis=1)))
+            candidate_top = top_k(corpus_vectors, query_vectors, args.k)
+            row["recall"] = float(np.mean([
+                len(set(ref_row) & set(cand_row)) / args.k
+                for ref_row, cand_row in zip(ref_top, candidate_top)
+            ]))
+
+        results[backend] = row
+
+    baseline = results[backends[0]]["texts_per_s"]
+    print(f"{'Backend':<12}{'carga s':>9}{'textos/s':>11}{'x':>7}{'consulta ms':>13}{'coseno':>9}{f'recall@{args.k}':>11}")
+    for backend, row in results.items():
+        print(
+            f"{backend:<12}{row['load_s']:>9.2f}{row['texts_per_s']:>11.0f}{row['texts_per_s'] / baseline:>7.2f}"
+            f"{row['query_p50_ms']:>13.2f}{row['cosine']:>9.4f}{row['recall']:>11.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: tiempo de arranque en frío de la API y de los scripts CLI.
+
+Cada medida se toma en un intérprete nuevo (subproceso) para que los imports
+no estén ya en caché:
+
+- cli:     importar lo que usa reset_game.py (app.models.database)
+- import:  importar app.main (todos los routers y servicios)
+- startup: entrar en el lifespan de FastAPI (API lista para aceptar peticiones)
+           y, por separado, hasta que /api/health informa ready=true
+
+Se repite para cada RAG_WARMUP_MODE (eager, background, lazy) e indica si
+torch / sentence_transformers / chromadb quedaron importados.
+
+Uso:
+    python benchmarks/bench_startup.py --runs 3
+    python benchmarks/bench_startup.py --modes background,lazy --database-url sqlite:///./bench.db
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("torch", "sentence_transformers", "chromadb")
+
+# Código ejecutado en cada subproceso; imprime una línea JSON con los tiempos
+CHILD_CODE = r"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {backend_dir!r})
+stage = {stage!r}
+result = {{}}
+if stage == "cli":
+    from app.models.database import Base, engine
+    result["seconds"] = time.perf_counter() - start
+elif stage == "import":
+    import app.main
+    result["seconds"] = time.perf_counter() - start
+else:
+    from fastapi.testclient import TestClient
+    import app.main
+    with TestClient(app.main.app) as client:
+        result["seconds"] = time.perf_counter() - start
+        # Esperar a que termine el warmup (en modo lazy no empieza nunca)
+        health = client.get("/api/health").json()
+        while health["components"]["rag"]["status"] == "loading" or (
+            {mode!r} == "background" and health["components"]["rag"]["status"] == "not_loaded"
+        ):
+            time.sleep(0.05)
+            health = client.get("/api/health").json()
+        result["ready_seconds"] = time.perf_counter() - start if health["ready"] else None
+result["heavy_modules"] = [m for m in {heavy!r} if m in sys.modules]
+print("BENCH " + json.dumps(result))
+"""
+
+
+def run_child(stage: str, mode: str, database_url: str) -> Dict[str, Any]:
+    env = dict(os.environ, RAG_WARMUP_MODE=mode, DATABASE_URL=database_url)
+    code = CHILD_CODE.format(backend_dir=BACKEND_DIR, stage=stage, mode=mode, heavy=HEAVY_MODULES)
+    completed = subprocess.run(
+        [sys.executable, "-c", code], env=env, cwd=BACKEND_DIR,
+        capture_output=True, text=True, check=True
+    )
+    line = next(l for l in completed.stdout.splitlines() if l.startswith("BENCH "))
+    return json.loads(line[len("BENCH "):])
+
+
+def summarize(values: List[float]) -> str:
+    if not values:
+        return f"{'-':>10}"
+    return f"{statistics.median(values) * 1000:>10.0f}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío")
+    parser.add_argument("--runs", type=int, default=3, help="Repeticiones por medida")
+    parser.add_argument("--modes", default="eager,background,lazy", help="Modos de warmup a medir")
+    parser.add_argument("--database-url", default="sqlite:///./bench_startup.db", help="BD para el lifespan")
+    args = parser.parse_args()
+
+    print(f"🚀 Arranque en frío ({args.runs} repeticiones, mediana en ms)\n")
+    print(f"{'Medida':<22}{'listo':>10}{'ready':>10}  módulos pesados")
+
+    cli = [run_child("cli", "lazy", args.database_url) for _ in range(args.runs)]
+    print(f"{'cli (reset_game)':<22}{summarize([r['seconds'] for r in cli])}{'-':>10}  "
+          f"{', '.join(cli[-1]['heavy_modules']) or 'ninguno'}")
+
+    imports = [run_child("import", "lazy", args.database_url) for _ in range(args.runs)]
+    print(f"{'import app.main':<22}{summarize([r['seconds'] for r in imports])}{'-':>10}  "
+          f"{', '.join(imports[-1]['heavy_modules']) or 'ninguno'}")
+
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        runs = [run_child("startup", mode, args.database_url) for _ in range(args.runs)]
+        ready = [r["ready_seconds"] for r in runs if r.get("ready_seconds") is not None]
+        # En modo lazy nada carga el RAG durante el arranque: sin columna ready
+        print(f"{'startup ' + mode:<22}{summarize([r['seconds'] for r in runs])}{summarize(ready)}  "
+              f"{', '.join(runs[-1]['heavy_modules']) or 'ninguno'}")
+
+
+if __name__ == "__main__":
+    main()
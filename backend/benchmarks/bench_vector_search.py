@@ -0,0 +1,196 @@
+"""
+Benchmark: latencia de SupabaseVectorStore.search_relevant_events con HNSW.
+
+Necesita un PostgreSQL con pgvector (DATABASE_URL). Trabaja sobre una tabla
+propia (bench_event_embeddings por defecto) que se vacía al empezar, así que
+no toca la memoria de la partida.
+
+Carga vectores sintéticos agrupados (un centro por nación y tipo de evento
+más ruido, como los textos reales) en tamaños crecientes. Para cada tamaño
+reconstruye el índice HNSW con los parámetros de la configuración y mide:
+
+- construcción del índice (s)
+- latencia de búsqueda (ms, p50/p95) sin filtros, por nación y con
+  min_importance=7 — las tres formas que usan los agentes
+- recall@k frente a la búsqueda exacta (sin índice)
+
+Los vectores de consulta no pasan por el modelo de embeddings: se mide solo
+el coste en la base de datos.
+
+Uso:
+    python benchmarks/bench_vector_search.py
+    python benchmarks/bench_vector_search.py --sizes 10000,100000,1000000 --queries 200
+    VECTOR_HNSW_EF_SEARCH=100 python benchmarks/bench_vector_search.py --sizes 100000
+    VECTOR_QUANTIZATION=binary VECTOR_RERANK_FACTOR=10 python benchmarks/bench_vector_search.py
+"""
+import argparse
+import hashlib
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Agregar el directorio backend al path para importar los módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+N_NATIONS = 8
+EVENT_TYPES = ["ECONOMIC", "MILITARY", "DIPLOMATIC", "economic_report", "recruit", "battle"]
+INSERT_CHUNK = 5000
+
+SCENARIOS = {
+    "sin filtro": {},
+    "por nación": {"nation_id": 3},
+    "importancia>=7": {"min_importance": 7},
+}
+
+
+class SyntheticEncoder:
+    """Codificador determinista: cada consulta es un vector fijo (hash del texto)"""
+
+    model_name = "synthetic"
+
+    def __init__(self, centers: np.ndarray, seed: int):
+        self.centers = centers
+        self.seed = seed
+
+    def encode(self, text: str) -> np.ndarray:
+        digest = int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+        rng = np.random.default_rng(self.seed + digest)
+        center = self.centers[rng.integers(len(self.centers))]
+        return normalize(center + rng.normal(0, 0.35, center.shape[0]).astype(np.float32))
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def load_rows(store: Any, centers: np.ndarray, start_id: int, count: int, rng: np.random.Generator) -> None:
+    """Insertar `count` filas sintéticas a partir de start_id"""
+    from app.models.database import engine
+
+    dimension = centers.shape[1]
+    for chunk_start in range(0, count, INSERT_CHUNK):
+        size = min(INSERT_CHUNK, count - chunk_start)
+        groups = rng.integers(len(centers), size=size)
+        vectors = normalize(centers[groups] + rng.normal(0, 0.35, (size, dimension)).astype(np.float32))
+        rows = []
+        for offset in range(size):
+            event_id = start_id + chunk_start + offset
+            group = int(groups[offset])
+            rows.append({
+                "event_id": event_id,
+                "nation_id": group % N_NATIONS + 1,
+                "turn_id": event_id // 50 + 1,
+                "event_type": EVENT_TYPES[group // N_NATIONS % len(EVENT_TYPES)],
+                "importance": int(rng.integers(1, 11)),
+                "description": f"Evento sintético {event_id}",
+                "event_metadata": {},
+                "embedding": vectors[offset],
+            })
+        with engine.begin() as connection:
+            connection.execute(store.table.insert(), rows)
+
+
+def exact_search(store: Any, query_vector: np.ndarray, k: int, filters: Dict[str, Any]) -> List[str]:
+    """Vecinos exactos (recorrido secuencial, sin índice vectorial)"""
+    from sqlalchemy import and_, select, text
+
+    from app.models.database import engine
+
+    distance = store.table.c.embedding.cosine_distance(query_vector.tolist())
+    stmt = select(store.table.c.event_id)
+    conditions = store._search_conditions(filters.get("nation_id"), None, filters.get("min_importance", 0))
+    if conditions:
+        stmt = stmt.where(and_(*conditions))
+    stmt = stmt.order_by(distance).limit(k)
+    with engine.connect() as connection:
+        connection.execute(text("set local enable_indexscan = off"))
+        return [f"event_{row.event_id}" for row in connection.execute(stmt)]
+
+
+def measure(store: Any, queries: List[str], k: int, filters: Dict[str, Any]) -> Dict[str, float]:
+    latencies = []
+    recalls = []
+    for query in queries:
+        start = time.perf_counter()
+        results = store.search_relevant_events(query, n_results=k, **filters)
+        latencies.append(time.perf_counter() - start)
+
+        expected = exact_search(store, store.embedding_model.encode(query), k, filters)
+        if expected:
+            recalls.append(len({result["id"] for result in results} & set(expected)) / len(expected))
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        "recall": statistics.mean(recalls) if recalls else 0.0,
+    }
+
+
+def drop_vector_index(store: Any) -> None:
+    """Cargar sin el HNSW y construirlo después es mucho más rápido"""
+    from sqlalchemy import text
+
+    from app.models.database import engine
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(f'drop index if exists "{store.hnsw_index_name}"'))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de búsqueda vectorial en Supabase (pgvector/HNSW)")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Tamaños de la tabla (acumulativos)")
+    parser.add_argument("--queries", type=int, default=100, help="Consultas por escenario")
+    parser.add_argument("--k", type=int, default=5, help="Resultados por consulta (n_results)")
+    parser.add_argument("--table", default="bench_event_embeddings", help="Tabla del benchmark (se vacía)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # La tabla del store sale de la configuración: fijarla antes de importar
+    os.environ["VECTOR_TABLE_NAME"] = args.table
+    from app.config import settings
+    from app.services.supabase_vector_store import SupabaseVectorStore
+
+    rng = np.random.default_rng(args.seed)
+    centers = normalize(rng.normal(0, 1, (N_NATIONS * len(EVENT_TYPES), settings.VECTOR_EMBEDDING_DIM)))
+    store = SupabaseVectorStore(SyntheticEncoder(centers, args.seed))
+    store.clear_collection()
+
+    sizes = sorted(int(size) for size in args.sizes.split(",") if size.strip())
+    queries = [f"Consulta {i}" for i in range(args.queries)]
+    print(
+        f"🧪 {args.table} | dim={settings.VECTOR_EMBEDDING_DIM} | m={settings.VECTOR_HNSW_M} "
+        f"ef_construction={settings.VECTOR_HNSW_EF_CONSTRUCTION} ef_search={settings.VECTOR_HNSW_EF_SEARCH} "
+        f"iterative_scan={settings.VECTOR_HNSW_ITERATIVE_SCAN} | quantization={store.quantization} "
+        f"(x{settings.VECTOR_RERANK_FACTOR}) | k={args.k}\n"
+    )
+    print(f"{'Filas':>10}{'índice s':>10}  {'Escenario':<16}{'p50 ms':>9}{'p95 ms':>9}{f'recall@{args.k}':>11}")
+
+    loaded = 0
+    for size in sizes:
+        drop_vector_index(store)
+        start = time.perf_counter()
+        load_rows(store, centers, loaded + 1, size - loaded, rng)
+        load_seconds = time.perf_counter() - start
+        loaded = size
+
+        start = time.perf_counter()
+        store._ensure_indexes()
+        build_seconds = time.perf_counter() - start
+
+        for position, (name, filters) in enumerate(SCENARIOS.items()):
+            row = measure(store, queries, args.k, filters)
+            prefix = f"{size:>10}{build_seconds:>10.1f}" if position == 0 else " " * 20
+            print(f"{prefix}  {name:<16}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['recall']:>11.3f}")
+        print(f"{'':>20}  (carga de {size} filas: {load_seconds:.1f}s)")
+
+    store.clear_collection()
+
+
+if __name__ == "__main__":
+    main()
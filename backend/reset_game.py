@@ -1,6 +1,8 @@
 """
 Script para resetear el juego eliminando todas las tablas y recreándolas limpias.
-Útil para empezar desde cero.
+Útil para empezar desde cero o para actualizar una base de datos creada antes
+de las partidas múltiples (las tablas no tenían game_id).
+Para borrar una sola partida usar DELETE /api/game/games/{game_id}.
 """
 import sys
 import os
@@ -37,7 +39,7 @@ def reset_database():
     print("\n🎮 ¡Base de datos reseteada! Ahora puedes iniciar un nuevo juego.")
 
 if __name__ == "__main__":
-    print("⚠️  ADVERTENCIA: Esto eliminará TODOS los datos del juego actual")
+    print("⚠️  ADVERTENCIA: Esto eliminará TODAS las partidas y sus datos")
     confirm = input("¿Estás seguro? (escribe 'SI' para confirmar): ")
     
     if confirm.upper() == "SI":
@@ -0,0 +1,219 @@
+"""
+Simulador headless del bucle de juego (sin servidor FastAPI).
+
+Inicializa partidas con GameService.initialize_game y ejecuta
+AgentService.process_ai_turn durante N turnos en M partidas, usando el LLM
+falso local y RNG sembrado. Informa de turnos/segundo, tiempos por fase
+(economía, agentes, batallas, victoria, siguiente turno) y del resultado
+final de VictoryService. Útil para balancear el juego y detectar
+regresiones de rendimiento.
+
+⚠️ Elimina y recrea las tablas de la base de datos indicada en cada partida.
+Por defecto usa una SQLite propia (simulation.db), no la base de datos del juego.
+Con --rag la memoria va a un store NumPy en un directorio temporal (se borra
+al terminar): los IDs de eventos simulados chocarían con los del juego real.
+
+Uso:
+    python simulate.py --games 10 --turns 50 --seed 42
+    python simulate.py --games 1 --turns 20 --all-ai --verbose
+"""
+import argparse
+import atexit
+import contextlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Simulador headless de Nation Mind AI")
+    parser.add_argument("--games", type=int, default=1, help="Número de partidas")
+    parser.add_argument("--turns", type=int, default=50, help="Turnos máximos por partida")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla base (partida i usa seed + i)")
+    parser.add_argument("--player", default="ESP", help="Código de la nación del jugador")
+    parser.add_argument("--all-ai", action="store_true", help="La nación del jugador también la controla la IA")
+    parser.add_argument(
+        "--database-url",
+        default="sqlite:///./simulation.db",
+        help="Base de datos a usar (se resetea en cada partida)"
+    )
+    parser.add_argument(
+        "--rag",
+        action="store_true",
+        help="Activar la memoria RAG (mucho más lento). Usa un store NumPy y una caché de "
+             "embeddings en un directorio temporal, nunca la memoria del juego"
+    )
+    parser.add_argument("--verbose", action="store_true", help="Mostrar la salida de los servicios")
+    return parser.parse_args()
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Fijar la configuración antes de importar la app (Settings se lee al importar)"""
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["LLM_FAKE_SEED"] = str(args.seed)
+    os.environ["RAG_ENABLED"] = "True" if args.rag else "False"
+    if args.rag:
+        # Vector store y caché aislados: los event_id/game_id de la SQLite
+        # simulada (1, 2, ...) sobrescribirían los vectores de la partida real
+        rag_dir = tempfile.mkdtemp(prefix="nationmind-sim-")
+        atexit.register(shutil.rmtree, rag_dir, True)
+        os.environ["VECTOR_BACKEND"] = "numpy"
+        os.environ["NUMPY_VECTOR_DIR"] = os.path.join(rag_dir, "vectors")
+        os.environ["EMBEDDING_CACHE_DIR"] = os.path.join(rag_dir, "embeddings")
+        os.environ["CHROMA_PERSIST_DIR"] = os.path.join(rag_dir, "chroma")
+
+
+@contextlib.contextmanager
+def quiet(enabled: bool):
+    """Silenciar los print() de los servicios"""
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_game(db, agent_service, args: argparse.Namespace, game_seed: int) -> Dict[str, Any]:
+    """Jugar una partida completa y devolver sus estadísticas"""
+    from app.models.database import Base, engine
+    from app.services.game_service import GameService
+    from app.services.nation_service import NationService
+    from app.services.turn_service import TurnService
+    from app.services.victory_service import VictoryService
+
+    random.seed(game_seed)
+    if hasattr(agent_service.llm, "seed"):
+        agent_service.llm.seed = game_seed
+
+    with quiet(not args.verbose):
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        game_id = GameService.initialize_game(db, args.player)["game_id"]
+
+        if args.all_ai:
+            for nation in NationService.get_all(db, game_id=game_id):
+                nation.ai_controlled = True
+            db.commit()
+
+    phase_timings: Dict[str, List[float]] = {}
+    victory_check = None
+    turns_played = 0
+    start = time.perf_counter()
+
+    for _ in range(args.turns):
+        current_turn = TurnService.get_current(db, game_id)
+        with quiet(not args.verbose):
+            agent_service.process_ai_turn(db, current_turn.turn_number, game_id=game_id)
+        turns_played += 1
+
+        for phase, seconds in agent_service.last_turn_timings.items():
+            phase_timings.setdefault(phase, []).append(seconds)
+
+        victory_check = agent_service.last_victory_check
+        if victory_check and victory_check["game_over"]:
+            break
+
+    if args.rag:
+        # Incluir en la medida la indexación pendiente (cola write-behind)
+        from app.services.rag_indexer import flush_rag_indexer
+        flush_rag_indexer()
+
+    elapsed = time.perf_counter() - start
+
+    if victory_check and victory_check["game_over"]:
+        winner = victory_check.get("winner")
+        outcome = victory_check.get("victory_type")
+        winner_name = winner.name if winner else "Empate"
+    else:
+        # Sin final: gana el líder de la clasificación
+        leaderboard = VictoryService.get_leaderboard(db, game_id)
+        outcome = "unfinished"
+        winner_name = leaderboard[0]["nation_name"] if leaderboard else "N/A"
+
+    return {
+        "turns": turns_played,
+        "seconds": elapsed,
+        "outcome": outcome,
+        "winner": winner_name,
+        "phase_timings": phase_timings,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    configure_environment(args)
+
+    # Agregar el directorio backend al path para importar los módulos
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from app.models.database import SessionLocal
+    from app.services.agent_service import get_agent_service
+
+    with quiet(not args.verbose):
+        agent_service = get_agent_service()
+
+    print(f"🎮 Simulando {args.games} partida(s) de hasta {args.turns} turnos (seed={args.seed})")
+    print(f"🗄️  Base de datos: {args.database_url}")
+    if args.rag:
+        print(f"🧠 Memoria RAG temporal: {os.environ['NUMPY_VECTOR_DIR']}")
+    print()
+
+    games = []
+    for game_index in range(args.games):
+        # Sesión nueva por partida: las tablas se recrean y los IDs se reutilizan
+        db = SessionLocal()
+        try:
+            result = run_game(db, agent_service, args, args.seed + game_index)
+        finally:
+            db.close()
+        games.append(result)
+        print(
+            f"  #{game_index + 1:<4} {result['turns']:>4} turnos  {result['seconds']:>7.2f}s  "
+            f"{result['outcome']:<12} 👑 {result['winner']}"
+        )
+
+    total_turns = sum(g["turns"] for g in games)
+    total_seconds = sum(g["seconds"] for g in games)
+
+    print(f"\n📊 {total_turns} turnos en {total_seconds:.2f}s → {total_turns / total_seconds:.1f} turnos/s "
+          f"({total_turns / total_seconds * 60:.0f} turnos/min)")
+
+    print(f"\n⏱️  Tiempos por fase (ms)")
+    print(f"{'Fase':<12}{'media':>10}{'p50':>10}{'p95':>10}{'máx':>10}")
+    all_phases: Dict[str, List[float]] = {}
+    for game in games:
+        for phase, values in game["phase_timings"].items():
+            all_phases.setdefault(phase, []).extend(values)
+    for phase in ("economy", "agents", "battles", "victory", "compaction", "next_turn", "commit", "total"):
+        values = [v * 1000 for v in all_phases.get(phase, [])]
+        if not values:
+            continue
+        print(
+            f"{phase:<12}{sum(values) / len(values):>10.2f}{percentile(values, 50):>10.2f}"
+            f"{percentile(values, 95):>10.2f}{max(values):>10.2f}"
+        )
+
+    print("\n🏆 Resultados")
+    for outcome, count in Counter(g["outcome"] for g in games).most_common():
+        print(f"  {outcome:<14}{count:>5}")
+    print("\n👑 Ganadores")
+    for winner, count in Counter(g["winner"] for g in games).most_common():
+        print(f"  {winner:<20}{count:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ create extension if not exists vector;
 
 create table if not exists public.event_embeddings (
     event_id integer primary key references public.events(id) on delete cascade,
+    game_id integer references public.games(id) on delete cascade,
     nation_id integer not null references public.nations(id) on delete cascade,
     turn_id integer not null references public.turns(id) on delete cascade,
     event_type varchar(50) not null,
@@ -12,13 +13,36 @@ create table if not exists public.event_embeddings (
     created_at timestamp without time zone not null default now()
 );
 
+-- Tablas anteriores a las partidas múltiples
+alter table public.event_embeddings add column if not exists game_id integer;
+
+create index if not exists event_embeddings_game_id_idx on public.event_embeddings (game_id);
 create index if not exists event_embeddings_nation_id_idx on public.event_embeddings (nation_id);
 create index if not exists event_embeddings_turn_id_idx on public.event_embeddings (turn_id);
 create index if not exists event_embeddings_event_type_idx on public.event_embeddings (event_type);
 create index if not exists event_embeddings_importance_idx on public.event_embeddings (importance);
 create index if not exists event_embeddings_created_at_idx on public.event_embeddings (created_at desc);
 
-create index if not exists event_embeddings_embedding_idx
+-- HNSW (pgvector >= 0.5): sin fase de entrenamiento y buen recall con filtros.
+-- Mismos parámetros por defecto que VECTOR_HNSW_M / VECTOR_HNSW_EF_CONSTRUCTION;
+-- el backend lo crea solo al arrancar si falta.
+drop index if exists public.event_embeddings_embedding_idx;
+
+create index if not exists event_embeddings_embedding_hnsw_idx
 on public.event_embeddings
-using ivfflat (embedding vector_cosine_ops)
-with (lists = 100);
\ No newline at end of file
+using hnsw (embedding vector_cosine_ops)
+with (m = 16, ef_construction = 64);
+
+-- Con VECTOR_QUANTIZATION=halfvec o binary el backend crea en su lugar el
+-- índice sobre la expresión cuantizada (la columna conserva el vector completo
+-- para reordenar los candidatos):
+--
+-- create index if not exists event_embeddings_embedding_halfvec_hnsw_idx
+-- on public.event_embeddings
+-- using hnsw ((embedding::halfvec(384)) halfvec_cosine_ops)
+-- with (m = 16, ef_construction = 64);
+--
+-- create index if not exists event_embeddings_embedding_binary_hnsw_idx
+-- on public.event_embeddings
+-- using hnsw ((binary_quantize(embedding)::bit(384)) bit_hamming_ops)
+-- with (m = 16, ef_construction = 64);
@@ -13,7 +13,7 @@ const BACKEND_BASE_URL = normalizeBackendBaseUrl(
 const BACKEND_API_KEY = process.env.BACKEND_API_KEY || '';
 const NODE_ENV = process.env.NODE_ENV || 'development';
 
-export async function POST() {
+export async function POST(request: Request) {
   const requireApiKey = NODE_ENV === 'production';
   if (requireApiKey && !BACKEND_API_KEY) {
     return NextResponse.json(
@@ -23,7 +23,9 @@ export async function POST() {
   }
 
   try {
-    const backendResponse = await fetch(`${BACKEND_BASE_URL}/api/agents/process-turn`, {
+    // Reenviar ?game_id= para procesar el turno de la partida que se está viendo
+    const { search } = new URL(request.url);
+    const backendResponse = await fetch(`${BACKEND_BASE_URL}/api/agents/process-turn${search}`, {
       method: 'POST',
       headers: BACKEND_API_KEY ? { 'x-api-key': BACKEND_API_KEY } : {},
       cache: 'no-store',
@@ -164,7 +164,21 @@ export default function GamePage() {
     showToast('info', '⚙️ Procesando Turno', 'Ejecutando acciones de las IA...', 3000);
     
     try {
-      await processAgentTurn();
+      // Mostrar cada decisión, batalla y victoria en cuanto llega por el stream
+      await processAgentTurn(gameState?.game_id, (event) => {
+        if (event.type === 'agent_completed' && event.data.success) {
+          showToast('info', `🤖 ${event.data.nation_name}`, event.data.action || 'Sin acción', 2500);
+        } else if (event.type === 'battle_resolved') {
+          showToast(
+            'battle',
+            `⚔️ ${event.data.attacker_name} vs ${event.data.defender_name}`,
+            `Ganador: ${event.data.winner_name}`,
+            4000
+          );
+        } else if (event.type === 'victory_checked' && event.data.game_over) {
+          showToast('victory', '🏆 Fin de la partida', event.data.details || '', 8000);
+        }
+      });
       await loadGameData();
       
       showToast(
@@ -9,8 +9,12 @@ import type {
   BattleSimulation,
   Event,
   Relation,
-  Turn
+  Turn,
+  TurnJob,
+  TurnResult,
+  TurnStreamEvent
 } from '@/types';
+import { TURN_STREAM_EVENTS } from '@/types';
 
 const normalizeBackendBaseUrl = (value: string): string =>
   value.replace(/\/+$/, '').replace(/\/api$/i, '');
@@ -211,17 +215,80 @@ export const advanceTurn = async (): Promise<ApiResponse<Turn>> => {
 
 // ==================== AGENTS ====================
 
-export const processAgentTurn = async (): Promise<{
-  message: string;
-  turn_number: number;
-  decisions: Array<{
-    nation: string;
-    action: string;
-    success: boolean;
-    details: any;
-  }>;
-}> => {
-  const response = await fetch('/api/secure/agents/process-turn', {
+const TURN_JOB_POLL_INTERVAL_MS = 1000;
+
+export const getTurnJob = async (jobId: string): Promise<TurnJob> => {
+  const response = await api.get(`/api/agents/jobs/${jobId}`);
+  return response.data;
+};
+
+const pollTurnJob = async (
+  jobId: string,
+  onProgress?: (job: TurnJob) => void
+): Promise<TurnResult> => {
+  for (;;) {
+    const job = await getTurnJob(jobId);
+    onProgress?.(job);
+
+    if (job.status === 'completed' && job.result) {
+      return job.result;
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Error procesando turno de IA');
+    }
+
+    await new Promise((resolve) => setTimeout(resolve, TURN_JOB_POLL_INTERVAL_MS));
+  }
+};
+
+// Sigue el job por Server-Sent Events; si el stream falla, vuelve a consultar por polling
+export const streamTurnJob = (
+  jobId: string,
+  onEvent?: (event: TurnStreamEvent) => void
+): Promise<TurnResult> => {
+  if (typeof EventSource === 'undefined') {
+    return pollTurnJob(jobId);
+  }
+
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_BASE_URL}/api/agents/jobs/${jobId}/events`);
+    let finished = false;
+
+    const finish = () => {
+      finished = true;
+      source.close();
+    };
+
+    TURN_STREAM_EVENTS.forEach((type) => {
+      source.addEventListener(type, (message) => {
+        const data = JSON.parse((message as MessageEvent).data);
+        onEvent?.({ type, data } as TurnStreamEvent);
+
+        if (type === 'turn_completed') {
+          finish();
+          resolve(data as TurnResult);
+        } else if (type === 'turn_failed') {
+          finish();
+          reject(new Error(data?.error || 'Error procesando turno de IA'));
+        }
+      });
+    });
+
+    source.onerror = () => {
+      if (finished) return;
+      finish();
+      pollTurnJob(jobId).then(resolve, reject);
+    };
+  });
+};
+
+// Encola el turno de la partida (el backend lo procesa en segundo plano) y sigue su progreso en vivo
+export const processAgentTurn = async (
+  gameId?: number | null,
+  onEvent?: (event: TurnStreamEvent) => void
+): Promise<TurnResult> => {
+  const query = gameId != null ? `?game_id=${gameId}` : '';
+  const response = await fetch(`/api/secure/agents/process-turn${query}`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
@@ -229,11 +296,16 @@ export const processAgentTurn = async (): Promise<{
   });
 
   const data = await response.json();
-  if (!response.ok) {
-    throw new Error(data?.detail || 'Error procesando turno de IA');
+  // 409: ya hay un turno en curso → seguir ese mismo job
+  const jobId: string | undefined =
+    response.status === 409 ? data?.detail?.job_id : data?.job_id;
+
+  if (!jobId) {
+    const detail = typeof data?.detail === 'string' ? data.detail : data?.detail?.message;
+    throw new Error(detail || 'Error procesando turno de IA');
   }
 
-  return data;
+  return streamTurnJob(jobId, onEvent);
 };
 
 export const getAgentsStatus = async () => {
@@ -110,6 +110,7 @@ export interface VictoryProgress {
 }
 
 export interface GameState {
+  game_id?: number | null;
   current_turn: number;
   nations: Nation[];
   recent_events: Event[];
@@ -150,3 +151,98 @@ export interface Turn {
   summary: string;
   created_at: string;
 }
+
+export interface AgentTurnResult {
+  nation_id: number;
+  nation_name: string;
+  action?: string | null;
+  reasoning?: string | null;
+  result?: Record<string, unknown>;
+  error?: string;
+  success: boolean;
+}
+
+export interface TurnResult {
+  message: string;
+  previous_turn: number;
+  current_turn: number;
+  total_agents: number;
+  successful_actions: number;
+  failed_actions: number;
+  agents_results: AgentTurnResult[];
+  timings?: {
+    phases_ms: Record<string, number>;
+    agents_ms: Record<string, Record<string, number>>;
+  };
+}
+
+export type TurnPhase = 'economy' | 'agents' | 'battles' | 'victory' | 'compaction' | 'next_turn';
+
+export interface TurnJob {
+  job_id: string;
+  game_id: number | null;
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  current_phase: TurnPhase | null;
+  phases: Record<TurnPhase, { status: 'pending' | 'running' | 'completed' | 'skipped'; duration_ms: number | null }>;
+  progress: {
+    phases_completed: number;
+    phases_total: number;
+    agents_completed: number;
+    agents_total: number;
+  };
+  agents_results: AgentTurnResult[];
+  result: TurnResult | null;
+  error: string | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+}
+
+export interface BattleResolvedEvent {
+  attacker_id: number;
+  attacker_name: string;
+  defender_id: number;
+  defender_name: string;
+  winner_id: number | null;
+  winner_name: string;
+  loser_name: string;
+  territories_gained: number;
+  gold_plundered: number;
+  attacker_casualties: number;
+  defender_casualties: number;
+  loser_eliminated: boolean;
+}
+
+export interface VictoryCheckedEvent {
+  game_over: boolean;
+  victory_type: string | null;
+  winner_id: number | null;
+  winner_name: string | null;
+  details: string | null;
+}
+
+// Eventos del stream SSE de /api/agents/jobs/{id}/events
+export type TurnStreamEvent =
+  | { type: 'turn_started'; data: { job_id: string } }
+  | { type: 'phase_started'; data: { phase: TurnPhase } }
+  | { type: 'phase_completed'; data: { phase: TurnPhase; duration_ms: number } }
+  | { type: 'phase_skipped'; data: { phase: TurnPhase } }
+  | { type: 'agents_planned'; data: { total: number; nations: string[] } }
+  | { type: 'agent_completed'; data: AgentTurnResult }
+  | { type: 'battle_resolved'; data: BattleResolvedEvent }
+  | { type: 'victory_checked'; data: VictoryCheckedEvent }
+  | { type: 'turn_completed'; data: TurnResult }
+  | { type: 'turn_failed'; data: { error: string } };
+
+export const TURN_STREAM_EVENTS: TurnStreamEvent['type'][] = [
+  'turn_started',
+  'phase_started',
+  'phase_completed',
+  'phase_skipped',
+  'agents_planned',
+  'agent_completed',
+  'battle_resolved',
+  'victory_checked',
+  'turn_completed',
+  'turn_failed',
+];